@@ -9,9 +9,18 @@ import sys
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterator, List, Optional, Tuple
-import urllib.error
-import urllib.request
+from typing import Iterator, List, Optional, Tuple
+
+# Общий клиент Ollama лежит в корне репозитория (ollama_http/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_http import (  # noqa: E402
+    OllamaError,
+    OllamaHTTPError,
+    OllamaUnavailableError,
+    format_stats,
+    get_client,
+)
 
 
 # ----------------------------
@@ -127,32 +136,21 @@ def chunk_text(text: str, chunk_size: int, overlap: int) -> List[Tuple[int, int,
 # ----------------------------
 # Ollama API
 # ----------------------------
-def _post_json(url: str, payload: Dict, timeout_sec: int = 60) -> Dict:
-    req = urllib.request.Request(
-        url=url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+def _ollama_call(ollama_url: str, call):
+    """
+    Вызов общего клиента Ollama (keep-alive пул, таймауты, повторы — см. ollama_http/client.py)
+    с переводом его ошибок в ошибки пайплайна.
+    """
     try:
-        with urllib.request.urlopen(req, timeout=timeout_sec) as resp:
-            raw = resp.read().decode("utf-8")
-            return json.loads(raw)
-    except urllib.error.HTTPError as ex:
-        # читаем тело ответа если есть
-        try:
-            body = ex.read().decode("utf-8")
-        except Exception:
-            body = ""
+        return call(get_client(ollama_url))
+    except OllamaHTTPError as ex:
         raise BuildIndexError(
-            f"Ollama вернула HTTP {ex.code} на {url}. Ответ: {body[:300]}"
-        )
-    except urllib.error.URLError as ex:
-        raise OllamaConnectionError(
-            f"Не удалось подключиться к Ollama по адресу {url}. Детали: {ex}"
+            f"Ollama вернула HTTP {ex.status} на {ex.url}. Ответ: {ex.body[:300]}"
         )
-    except json.JSONDecodeError:
-        raise BuildIndexError("Не удалось разобрать JSON-ответ от Ollama.")
+    except OllamaUnavailableError as ex:
+        raise OllamaConnectionError(str(ex))
+    except OllamaError as ex:
+        raise BuildIndexError(str(ex))
     except Exception as ex:
         raise BuildIndexError(f"Неожиданная ошибка при запросе к Ollama: {ex}")
 
@@ -160,9 +158,8 @@ def _post_json(url: str, payload: Dict, timeout_sec: int = 60) -> Dict:
 def check_ollama_running(ollama_url: str) -> None:
     # простой health-check: GET /
     try:
-        with urllib.request.urlopen(ollama_url, timeout=5) as resp:
-            _ = resp.read()
-    except Exception:
+        _ollama_call(ollama_url, lambda client: client.ping())
+    except BuildIndexError:
         raise OllamaConnectionError(
             f"Ollama не отвечает на {ollama_url}."
         )
@@ -170,68 +167,28 @@ def check_ollama_running(ollama_url: str) -> None:
 
 def check_model_available(ollama_url: str, model: str) -> None:
     """
-    Нормально проверить список моделей через API проще всего: /api/tags.
+    Нормально проверить список моделей через API проще всего: GET /api/tags.
     Если не получается — не валим всё, но при ошибке эмбеддинга дадим подсказку.
     """
     try:
-        data = _post_json(f"{ollama_url}/api/tags", payload={}, timeout_sec=10)
-        # форматы могут отличаться, но часто: {"models":[{"name":"..."}]}
-        names = set()
-        if isinstance(data, dict) and "models" in data and isinstance(data["models"], list):
-            for m in data["models"]:
-                if isinstance(m, dict) and "name" in m:
-                    names.add(str(m["name"]))
-        if names and not any(n == model or n.startswith(model + ":") for n in names):
-            raise OllamaModelError(
-                f"Модель '{model}' не найдена в Ollama."
-            )
+        names = _ollama_call(ollama_url, lambda client: client.list_models())
     except OllamaConnectionError:
         raise
-    except OllamaModelError:
-        raise
-    except Exception:
+    except BuildIndexError:
         # если /api/tags вдруг не поддерживается/меняется — просто пропускаем
         return
+    if names and not any(n == model or n.startswith(model + ":") for n in names):
+        raise OllamaModelError(
+            f"Модель '{model}' не найдена в Ollama."
+        )
 
 
 def ollama_embed(ollama_url: str, model: str, input_text: str) -> List[float]:
     """
     Пробуем сначала /api/embed (современный), затем /api/embeddings (старый).
+    Временные сбои (обрыв соединения, 429/5xx) клиент повторяет сам.
     """
-    # /api/embed
-    try:
-        data = _post_json(
-            f"{ollama_url}/api/embed",
-            payload={"model": model, "input": input_text},
-            timeout_sec=60,
-        )
-        if "embeddings" in data and isinstance(data["embeddings"], list) and data["embeddings"]:
-            emb = data["embeddings"][0]
-            if isinstance(emb, list) and emb and isinstance(emb[0], (int, float)):
-                return emb
-        # если формат не тот
-    except BuildIndexError:
-        # важно: если /api/embed есть, но дал осмысленную ошибку — пробросим её
-        # однако если это 404 или подобное, можно попробовать старый endpoint.
-        # (в _post_json 404 превращается в BuildIndexError — поэтому ниже аккуратно)
-        pass
-    except Exception:
-        pass
-
-    # /api/embeddings (старый)
-    data2 = _post_json(
-        f"{ollama_url}/api/embeddings",
-        payload={"model": model, "prompt": input_text},
-        timeout_sec=60,
-    )
-    if "embedding" in data2 and isinstance(data2["embedding"], list):
-        emb = data2["embedding"]
-        if emb and isinstance(emb[0], (int, float)):
-            return emb
-
-    raise BuildIndexError(
-        "Ollama вернула неожиданный формат ответа для embeddings."
-    )
+    return _ollama_call(ollama_url, lambda client: client.embed(model, input_text))
 
 
 # ----------------------------
@@ -340,6 +297,7 @@ def build_index(cfg: Config) -> None:
         "chunks_total": total_chunks,
         "embedding_dim": embedding_dim,
         "elapsed_sec": round(time.time() - t0, 3),
+        "ollama_stats": get_client(cfg.ollama_url).stats(),
         "format": "jsonl (one chunk per line)",
     }
     cfg.out_meta.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -415,6 +373,7 @@ def main() -> None:
     print("\n✅ Готово!")
     print(f"Index: {cfg.out_index.resolve()}")
     print(f"Meta:  {cfg.out_meta.resolve()}")
+    print(format_stats(get_client(cfg.ollama_url).stats()))
 
 
 if __name__ == "__main__":
@@ -4,9 +4,14 @@
 import argparse
 import json
 import math
+import sys
 from pathlib import Path
 from typing import List, Dict, Tuple
-import urllib.request
+
+# Общий клиент Ollama лежит в корне репозитория (ollama_http/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_http import format_stats, get_client  # noqa: E402
 
 DEFAULT_OLLAMA_URL = "http://localhost:11434"
 DEFAULT_EMBED_MODEL = "nomic-embed-text"
@@ -17,49 +22,17 @@ DEFAULT_INDEX_PATH = "index.jsonl"
 # -----------------------------
 # Ollama helpers
 # -----------------------------
-def post_json(url: str, payload: Dict, timeout: int = 120) -> Dict:
-    req = urllib.request.Request(
-        url=url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
+# Запросы идут через общий клиент (ollama_http/): одно keep-alive соединение
+# на эмбеддинг и обе генерации, свои таймауты и повторы для эмбеддингов.
 def ollama_embed(ollama_url: str, model: str, text: str) -> List[float]:
-    # /api/embed (новый)
-    try:
-        data = post_json(f"{ollama_url}/api/embed", {"model": model, "input": text}, timeout=120)
-        if "embeddings" in data and data["embeddings"]:
-            return data["embeddings"][0]
-    except Exception:
-        pass
-
-    # /api/embeddings (старый)
-    data2 = post_json(f"{ollama_url}/api/embeddings", {"model": model, "prompt": text}, timeout=120)
-    if "embedding" in data2:
-        return data2["embedding"]
-
-    raise RuntimeError("Неожиданный формат ответа Ollama embeddings.")
+    return get_client(ollama_url).embed(model, text)
 
 
 def ollama_generate(ollama_url: str, model: str, prompt: str) -> str:
     """
     Самый простой вариант: /api/generate.
     """
-    data = post_json(
-        f"{ollama_url}/api/generate",
-        {
-            "model": model,
-            "prompt": prompt,
-            "stream": False,
-        },
-        timeout=300,
-    )
-    # обычно: {"response": "..."}
-    return data.get("response", "").strip()
+    return get_client(ollama_url).generate(model, prompt).strip()
 
 
 # -----------------------------
@@ -144,6 +117,7 @@ def main():
     ap.add_argument("--llm-model", default=DEFAULT_LLM_MODEL, help="LLM model for generation")
     ap.add_argument("--top-k", type=int, default=4, help="How many chunks to retrieve")
     ap.add_argument("--question", required=True, help="Question to ask")
+    ap.add_argument("--stats", action="store_true", help="Print Ollama request statistics")
     args = ap.parse_args()
 
     index_path = Path(args.index)
@@ -186,6 +160,9 @@ def main():
 
     # print("\n" + "=" * 80)
 
+    if args.stats:
+        print("\n" + format_stats(get_client(args.ollama_url).stats()))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Benchmark of GitTools.get_status on a large synthetic repository.
+
+Compares the single ``git status --porcelain=v2`` pass with the previous
+implementation (``index.diff(None)``, ``index.diff("HEAD")``,
+``untracked_files`` and ``is_dirty()``). The result cache is bypassed.
+
+Usage:
+    python benchmark_git_status.py
+    python benchmark_git_status.py --files 50000 --repeat 10 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import git
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.mcp.git_tools import GitTools  # noqa: E402
+
+
+def create_repo(root: Path, files: int, changed: float) -> None:
+    """
+    Create a committed repository with modified, staged and untracked files.
+
+    Args:
+        root: Empty directory
+        files: Number of tracked files
+        changed: Fraction of files modified, staged and added untracked each
+    """
+    for i in range(files):
+        path = root / f"dir{i // 100:04d}" / f"file{i}.txt"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"file {i}\n")
+
+    env = {**os.environ, 'GIT_AUTHOR_NAME': 'bench', 'GIT_AUTHOR_EMAIL': 'bench@example.com',
+           'GIT_COMMITTER_NAME': 'bench', 'GIT_COMMITTER_EMAIL': 'bench@example.com'}
+
+    def run(*args):
+        subprocess.run(['git', *args], cwd=root, env=env, check=True, capture_output=True)
+
+    run('init', '-q')
+    run('add', '-A')
+    run('commit', '-q', '-m', 'initial')
+
+    step = max(1, round(1 / changed)) if changed > 0 else files + 1
+    staged = []
+    for i in range(0, files, step):
+        directory = root / f"dir{i // 100:04d}"
+        (directory / f"file{i}.txt").write_text("modified\n")
+        (directory / f"staged{i}.txt").write_text("staged\n")
+        staged.append(f"{directory.name}/staged{i}.txt")
+        (directory / f"untracked{i}.txt").write_text("untracked\n")
+    if staged:
+        run('add', *staged)
+
+
+def legacy_status(repo: git.Repo) -> dict:
+    """The previous implementation of ``GitTools.get_status``."""
+    return {
+        "branch": repo.active_branch.name,
+        "modified": [item.a_path for item in repo.index.diff(None)],
+        "staged": [item.a_path for item in repo.index.diff("HEAD")],
+        "untracked": repo.untracked_files,
+        "is_dirty": repo.is_dirty()
+    }
+
+
+def measure(fn, repeat: int) -> dict:
+    """Median and min of repeated runs after one warm-up run (seconds)."""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return {'median': statistics.median(samples), 'min': min(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=20000, help='Tracked files in the repository')
+    parser.add_argument('--changed', type=float, default=0.01, help='Fraction of changed files')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        start = time.perf_counter()
+        create_repo(root, args.files, args.changed)
+        setup = time.perf_counter() - start
+
+        tools = GitTools(root)
+        legacy = legacy_status(tools.repo)
+        current = tools._status()
+        for key in ('modified', 'staged', 'untracked'):
+            if sorted(legacy[key]) != sorted(current[key]):
+                raise SystemExit(f"Implementations disagree on {key}")
+
+        results = {
+            'files': args.files,
+            'changed': len(current['modified']),
+            'setup': setup,
+            'legacy': measure(lambda: legacy_status(tools.repo), args.repeat),
+            'porcelain': measure(tools._status, args.repeat),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"\nget_status on {results['files']} files, {results['changed']} changed "
+          f"(median / min of {args.repeat} runs, repository built in {setup:.1f}s)")
+    print("-" * 60)
+    for name in ('legacy', 'porcelain'):
+        row = results[name]
+        print(f"{name:32} {row['median'] * 1000:8.1f} ms {row['min'] * 1000:8.1f} ms")
+    print(f"{'speedup':32} {results['legacy']['median'] / results['porcelain']['median']:8.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for the assistant CLI.
+
+Measures, each in a fresh interpreter:
+- cumulative import time of the main modules (``python -X importtime``)
+- time to first output of CLI commands
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --repeat 10 --json
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+MODULES = [
+    'src.assistant.cli',
+    'src.assistant.assistant',
+    'src.mcp.server',
+    'src.rag.config',
+    'src.rag.retriever',
+    'src.rag.indexer',
+    'anthropic',
+    'voyageai',
+    'git',
+    'rich.console',
+    'rich.markdown',
+    'click',
+    'dotenv',
+    'numpy',
+]
+
+COMMANDS = [
+    ['--help'],
+    ['git'],
+    ['help'],
+    ['files', 'authentication'],
+    ['search', 'authentication'],
+]
+
+
+def import_time(module: str) -> float:
+    """Cumulative import time of a module in a fresh interpreter (seconds)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    for line in reversed(result.stderr.splitlines()):
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def first_output_time(args: list) -> float:
+    """Seconds until a CLI command writes its first byte to stdout."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.assistant.cli', *args],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    process.stdout.read(1)
+    elapsed = time.perf_counter() - start
+    process.stdout.close()
+    process.kill()
+    process.wait()
+    return elapsed
+
+
+def measure(fn, arg, repeat: int) -> dict:
+    """Median and min of repeated measurements (or the error)."""
+    try:
+        samples = [fn(arg) for _ in range(repeat)]
+    except Exception as e:
+        return {'error': str(e)}
+    return {'median': statistics.median(samples), 'min': min(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    results = {
+        'imports': {module: measure(import_time, module, args.repeat) for module in MODULES},
+        'commands': {' '.join(command): measure(first_output_time, command, args.repeat) for command in COMMANDS},
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    for title, rows in (('Import time', results['imports']), ('Time to first output', results['commands'])):
+        print(f"\n{title} (median / min of {args.repeat} runs)")
+        print("-" * 60)
+        for name, row in rows.items():
+            if 'error' in row:
+                print(f"{name:32} error: {row['error']}")
+            else:
+                print(f"{name:32} {row['median'] * 1000:8.1f} ms {row['min'] * 1000:8.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""Lazy package exports."""
+
+from importlib import import_module
+from typing import Callable, Dict
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Callable[[str], object]:
+    """
+    Build a module ``__getattr__`` that imports exports on first access.
+
+    Keeps ``import src.<package>`` cheap: submodules (and their heavy
+    dependencies) load only when one of their names is used.
+
+    Args:
+        package: Name of the package (``__name__``)
+        exports: Public name -> relative submodule
+
+    Returns:
+        Function to assign to the package's ``__getattr__``
+    """
+    def __getattr__(name):
+        if name in exports:
+            return getattr(import_module(exports[name], package), name)
+        raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+    return __getattr__
@@ -1,6 +1,10 @@
 """AI Assistant with RAG and MCP integration."""
 
-from .assistant import DevelopmentAssistant
-from .cli import cli
+from .._lazy import lazy_exports
 
 __all__ = ['DevelopmentAssistant', 'cli']
+
+__getattr__ = lazy_exports(__name__, {
+    'DevelopmentAssistant': '.assistant',
+    'cli': '.cli',
+})
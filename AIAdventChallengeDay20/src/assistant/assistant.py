@@ -1,16 +1,34 @@
 """Development Assistant with RAG and MCP."""
 
-from typing import Dict, Optional
+from typing import Dict, Iterator, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
-import anthropic
+import threading
+import time
 
 from ..rag.config import RAGConfig
-from ..rag.retriever import DocumentRetriever
-from ..mcp.server import MCPServer
+
+
+MODEL = "claude-opus-4-5-20251101"
+
+# Token counters reported in response usage
+USAGE_FIELDS = ('input_tokens', 'output_tokens', 'cache_creation_input_tokens', 'cache_read_input_tokens')
 
 
 class DevelopmentAssistant:
-    """AI Assistant for development help."""
+    """
+    AI Assistant for development help.
+
+    The Anthropic client, the RAG retriever and the MCP server are created
+    (and their modules imported) on first use, so commands that need only
+    one of them do not pay for the others.
+
+    Requests put the stable parts first, each ending in a prompt-caching
+    breakpoint: the system prompt, then the git context. The volatile
+    documentation context and the question come last, so repeated
+    questions reuse the cached prefix while the repository is unchanged.
+    """
 
     def __init__(
         self,
@@ -25,17 +43,11 @@ class DevelopmentAssistant:
             repo_path: Path to git repository
         """
         self.api_key = api_key or RAGConfig.ANTHROPIC_API_KEY
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.repo_path = repo_path
 
-        # Initialize RAG retriever
-        try:
-            self.retriever = DocumentRetriever()
-        except ValueError as e:
-            print(f"Warning: RAG not initialized: {e}")
-            self.retriever = None
-
-        # Initialize MCP server
-        self.mcp_server = MCPServer(repo_path)
+        # Token usage summed over all answers
+        self.usage_totals: Dict[str, int] = {'requests': 0, **{field: 0 for field in USAGE_FIELDS}}
+        self._usage_lock = threading.Lock()
 
         # System prompt
         self.system_prompt = """You are a helpful development assistant with access to:
@@ -51,6 +63,36 @@ Your role is to help developers by:
 
 Always cite sources when using documentation and provide specific file references."""
 
+    @cached_property
+    def client(self):
+        """Anthropic API client (offline stub with ``LLM_BACKEND=stub``)."""
+        if RAGConfig.LLM_BACKEND == 'stub':
+            from .stub_client import StubAnthropicClient
+
+            return StubAnthropicClient()
+
+        import anthropic
+
+        return anthropic.Anthropic(api_key=self.api_key)
+
+    @cached_property
+    def retriever(self):
+        """RAG retriever (None if the index does not exist yet)."""
+        from ..rag.retriever import DocumentRetriever
+
+        try:
+            return DocumentRetriever()
+        except ValueError as e:
+            print(f"Warning: RAG not initialized: {e}")
+            return None
+
+    @cached_property
+    def mcp_server(self):
+        """MCP server with git tools."""
+        from ..mcp.server import MCPServer
+
+        return MCPServer(self.repo_path)
+
     def get_git_context(self) -> str:
         """
         Get current git context as formatted string.
@@ -58,7 +100,7 @@ Always cite sources when using documentation and provide specific file reference
         Returns:
             Formatted git context
         """
-        context = self.mcp_server.get_context()
+        context = self.mcp_server.get_context(deadline=RAGConfig.GIT_CONTEXT_DEADLINE)
 
         # Format context
         parts = []
@@ -95,39 +137,142 @@ Always cite sources when using documentation and provide specific file reference
         Returns:
             Assistant's response
         """
+        return "".join(self.stream_help(query))
+
+    def stream_help(
+        self,
+        query: Optional[str] = None,
+        timings: Optional[Dict[str, float]] = None,
+        usage: Optional[Dict[str, int]] = None
+    ) -> Iterator[str]:
+        """
+        Answer a help query, yielding the response as it is generated.
+
+        Documentation and git context are gathered concurrently before the
+        request to Claude; the answer is then streamed token by token.
+
+        Args:
+            query: Question about the project (if None, yields general help)
+            timings: Optional dictionary filled with per-stage durations in
+                seconds: rag_context, git_context, context (both, in
+                parallel), first_token, answer and total
+            usage: Optional dictionary filled with the response token
+                usage: input_tokens, output_tokens,
+                cache_creation_input_tokens and cache_read_input_tokens
+
+        Yields:
+            Chunks of the response text
+        """
+        timings = timings if timings is not None else {}
+        start = time.perf_counter()
         if not query:
-            return self._general_help()
+            yield self._general_help()
+            timings['total'] = time.perf_counter() - start
+            return
 
-        # Get RAG context
-        rag_context = ""
-        if self.retriever:
-            rag_context = self.retriever.get_context_for_query(query)
+        rag_context, git_context = self._gather_context(query, timings)
 
-        # Get git context
-        git_context = self.get_git_context()
+        # Call Claude
+        answer_start = time.perf_counter()
+        with self.client.messages.stream(**self._build_request(query, rag_context, git_context)) as stream:
+            for text in stream.text_stream:
+                if 'first_token' not in timings:
+                    timings['first_token'] = time.perf_counter() - answer_start
+                yield text
+            self._record_usage(stream.get_final_message().usage, usage)
+
+        timings['answer'] = time.perf_counter() - answer_start
+        timings['total'] = time.perf_counter() - start
+
+    def _gather_context(self, query: str, timings: Dict[str, float]) -> Tuple[str, str]:
+        """
+        Fetch documentation and git context in parallel.
 
-        # Build prompt
-        user_message = f"""Question: {query}
+        Args:
+            query: Question about the project
+            timings: Dictionary receiving rag_context, git_context and context
 
-**Git Context:**
-{git_context}
+        Returns:
+            Tuple of (documentation context, git context)
+        """
+        def timed(name, fn):
+            stage_start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                timings[name] = time.perf_counter() - stage_start
+
+        def rag_context():
+            return self.retriever.get_context_for_query(query) if self.retriever else ""
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            rag = executor.submit(timed, 'rag_context', rag_context)
+            git = executor.submit(timed, 'git_context', self.get_git_context)
+            result = rag.result(), git.result()
+        timings['context'] = time.perf_counter() - start
+        return result
+
+    def _build_request(self, query: str, rag_context: str, git_context: str) -> Dict:
+        """
+        Build the Messages API request, stable content first.
+
+        Args:
+            query: Question about the project
+            rag_context: Documentation context (changes with every query)
+            git_context: Git context (stable while the repository is unchanged)
 
-**Relevant Documentation:**
+        Returns:
+            Keyword arguments for ``messages.create`` / ``messages.stream``
+        """
+        cache_control = {"type": "ephemeral"}
+        question = f"""**Relevant Documentation:**
 {rag_context}
 
+Question: {query}
+
 Please answer the question based on the provided context. If you reference documentation, mention the source file."""
 
-        # Call Claude
-        response = self.client.messages.create(
-            model="claude-opus-4-5-20251101",
-            max_tokens=2000,
-            system=self.system_prompt,
-            messages=[
-                {"role": "user", "content": user_message}
+        return {
+            "model": MODEL,
+            "max_tokens": 2000,
+            "system": [
+                {"type": "text", "text": self.system_prompt, "cache_control": cache_control}
+            ],
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": f"**Git Context:**\n{git_context}", "cache_control": cache_control},
+                        {"type": "text", "text": question}
+                    ]
+                }
             ]
-        )
+        }
+
+    def _record_usage(self, response_usage, usage: Optional[Dict[str, int]]) -> None:
+        """Add response token usage to the totals (and to ``usage``)."""
+        counts = {field: getattr(response_usage, field, None) or 0 for field in USAGE_FIELDS}
+        if usage is not None:
+            usage.update(counts)
+        with self._usage_lock:
+            self.usage_totals['requests'] += 1
+            for field, count in counts.items():
+                self.usage_totals[field] += count
+
+    def usage_stats(self) -> Dict:
+        """
+        Get token usage summed over all answers.
 
-        return response.content[0].text
+        Returns:
+            Dictionary with requests, the usage token counters and
+            cache_hit_rate (share of prompt tokens read from the cache)
+        """
+        with self._usage_lock:
+            stats = dict(self.usage_totals)
+        prompt_tokens = stats['input_tokens'] + stats['cache_creation_input_tokens'] + stats['cache_read_input_tokens']
+        stats['cache_hit_rate'] = stats['cache_read_input_tokens'] / prompt_tokens if prompt_tokens else 0.0
+        return stats
 
     def _general_help(self) -> str:
         """
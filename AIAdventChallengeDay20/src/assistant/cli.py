@@ -3,41 +3,159 @@
 import click
 from pathlib import Path
 from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
 
-from .assistant import DevelopmentAssistant
-from ..rag.indexer import DocumentIndexer
+# Commands import what they need (RAG stack, git, Anthropic SDK, rich
+# rendering) on demand, so e.g. `cli git` never loads the RAG modules
 from ..rag.config import RAGConfig
 
 console = Console()
 
 
 @click.group()
-def cli():
+@click.option('--no-daemon', is_flag=True, help='Run in this process even if a daemon is running')
+@click.pass_context
+def cli(ctx, no_daemon):
     """Development Assistant with RAG and MCP."""
-    pass
+    ctx.obj = {'use_daemon': not no_daemon}
+
+
+def _run(command, fallback, **args):
+    """
+    Run a command in the background daemon, or in this process.
+
+    Args:
+        command: Daemon command name
+        fallback: Callable computing the result in process
+        **args: Command arguments
+
+    Returns:
+        Command result
+    """
+    if _use_daemon():
+        from .daemon import DaemonUnavailable, request
+
+        try:
+            return request(command, **args)
+        except DaemonUnavailable:
+            pass
+    return fallback()
+
+
+def _use_daemon():
+    """Whether commands may be forwarded to the daemon (no --no-daemon)."""
+    return (click.get_current_context().find_root().obj or {}).get('use_daemon', True)
+
+
+def _assistant():
+    """Create an in-process assistant."""
+    from .assistant import DevelopmentAssistant
+
+    return DevelopmentAssistant()
+
+
+def _stream_help(query, timings, usage, assistant=None):
+    """
+    Stream a help answer from the daemon, or from an in-process assistant.
+
+    Args:
+        query: Question (None for general help)
+        timings: Dictionary receiving per-stage durations
+        usage: Dictionary receiving token usage
+        assistant: In-process assistant to use instead of the daemon
+
+    Yields:
+        Chunks of the response text
+    """
+    if assistant is None and _use_daemon():
+        from .daemon import DaemonUnavailable, request_stream
+
+        try:
+            profile = (yield from request_stream('help_stream', query=query, profile=True)) or {}
+            timings.update(profile.get('timings', {}))
+            usage.update(profile.get('usage', {}))
+            return
+        except DaemonUnavailable:
+            # Raised only before anything was streamed
+            pass
+    yield from (assistant or _assistant()).stream_help(query, timings, usage)
+
+
+def _print_streamed(chunks, panel_title=None):
+    """
+    Render streamed Markdown live, with a spinner until the first chunk.
+
+    Args:
+        chunks: Iterator of text chunks
+        panel_title: Wrap the answer in a panel with this title
+    """
+    from rich.live import Live
+    from rich.markdown import Markdown
+    from rich.panel import Panel
+
+    def render(text):
+        if panel_title:
+            return Panel(Markdown(text), title=panel_title, border_style="blue")
+        return Markdown(text)
+
+    with console.status("[bold green]Thinking..."):
+        text = next(chunks, "")
+    with Live(render(text), console=console, refresh_per_second=12, vertical_overflow="visible") as live:
+        for chunk in chunks:
+            text += chunk
+            live.update(render(text))
+    if not console.is_terminal:
+        # Live ends the output with a newline only on terminals
+        console.line()
+
+
+def _print_profile(timings, usage):
+    """Print per-stage timings and token usage of a help answer."""
+    stages = [
+        ('rag_context', 'RAG context'),
+        ('git_context', 'git context'),
+        ('context', 'context (parallel)'),
+        ('first_token', 'first token'),
+        ('answer', 'answer'),
+        ('total', 'total'),
+    ]
+    console.print("[dim]" + ", ".join(
+        f"{label} {timings[key]:.2f}s" for key, label in stages if key in timings
+    ) + "[/dim]")
+    if usage:
+        _print_usage(usage)
+
+
+def _print_usage(usage):
+    """Print token usage, including prompt cache reads and writes."""
+    console.print(
+        f"[dim]tokens: {usage['input_tokens']} input, "
+        f"{usage['cache_read_input_tokens']} cache read, "
+        f"{usage['cache_creation_input_tokens']} cache write, "
+        f"{usage['output_tokens']} output[/dim]"
+    )
 
 
 @cli.command()
 @click.argument('query', required=False)
-def help(query):
+@click.option('--profile', is_flag=True, help='Show time spent in each stage')
+def help(query, profile):
     """
     Get help about the project.
 
+    Documentation and git context are gathered in parallel and the answer
+    is streamed as it is generated.
+
     Usage:
         python -m src.assistant.cli help
         python -m src.assistant.cli help "How does authentication work?"
+        python -m src.assistant.cli help "How does authentication work?" --profile
     """
     try:
-        assistant = DevelopmentAssistant()
-
-        with console.status("[bold green]Thinking..."):
-            response = assistant.help(query)
-
-        # Display response
+        timings, usage = {}, {}
         console.print("\n")
-        console.print(Panel(Markdown(response), title="Assistant", border_style="blue"))
+        _print_streamed(_stream_help(query, timings, usage), panel_title="Assistant")
+        if profile:
+            _print_profile(timings, usage)
 
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
@@ -54,8 +172,9 @@ def search(query, limit):
         python -m src.assistant.cli search "authentication"
     """
     try:
-        assistant = DevelopmentAssistant()
-        results = assistant.search_docs(query, limit)
+        from rich.markdown import Markdown
+
+        results = _run('search', lambda: _assistant().search_docs(query, limit), query=query, limit=limit)
 
         console.print("\n")
         console.print(Markdown(results))
@@ -74,8 +193,9 @@ def files(query):
         python -m src.assistant.cli files "authentication"
     """
     try:
-        assistant = DevelopmentAssistant()
-        results = assistant.get_related_files(query)
+        from rich.markdown import Markdown
+
+        results = _run('files', lambda: _assistant().get_related_files(query), query=query)
 
         console.print("\n")
         console.print(Markdown(results))
@@ -84,45 +204,117 @@ def files(query):
         console.print(f"[bold red]Error:[/bold red] {e}")
 
 
+def _print_batch_progress(batch):
+    """Print per-batch embedding progress."""
+    total = f"/{batch['total']}" if batch['total'] else ""
+    console.print(
+        f"  [dim]batch {batch['index']}{total}:[/dim] "
+        f"{batch['end'] - batch['start']} chunks, ~{batch['tokens']} tokens "
+        f"in {batch['seconds']:.2f}s"
+        + (f" ({batch['attempts']} attempts)" if batch['attempts'] > 1 else "")
+        + f" [dim]| {batch['texts_per_second']:.1f} chunks/s, "
+        f"{batch['tokens_per_second']:.0f} tokens/s[/dim]"
+    )
+
+
+def _print_sync_stats(stats):
+    """Print incremental indexing summary."""
+    if not stats:
+        return
+    console.print(
+        f"  [dim]Files: {stats['added']} added, {stats['changed']} changed, "
+        f"{stats['unchanged']} unchanged, {stats['deleted']} deleted, "
+        f"{stats['renamed']} renamed; {stats['chunks_deleted']} stale chunks removed[/dim]"
+    )
+
+
+def _print_run_stats(stats):
+    """Print embedding throughput summary."""
+    if not stats or not stats['batches']:
+        return
+    console.print(
+        f"  [dim]Embedded {stats['texts']} chunks in {stats['batches']} batches, "
+        f"{stats['seconds']:.1f}s ({stats['texts_per_second']:.1f} chunks/s, "
+        f"{stats['tokens_per_second']:.0f} tokens/s), {stats['retries']} retries, "
+        f"{stats['rate_limited_seconds']:.1f}s rate-limited[/dim]"
+    )
+
+
 @cli.command()
 @click.option('--docs-path', default='./docs', help='Path to documentation directory')
 @click.option('--clear', is_flag=True, help='Clear existing index first')
-def index(docs_path, clear):
+@click.option('--concurrency', default=RAGConfig.EMBED_CONCURRENCY, help='Embedding batches in flight')
+@click.option('--since-last', is_flag=True, help='Only re-index files changed in git since the last index')
+def index(docs_path, clear, concurrency, since_last):
     """
     Index project documentation.
 
+    Indexing is incremental: only added or changed files are embedded and
+    chunks of deleted files are removed. Use --clear to rebuild from scratch.
+    The index records the git commit it was built from; --since-last skips
+    the directory scan and re-indexes only files git reports as changed
+    since that commit (renames are re-keyed without re-embedding).
+
     Usage:
         python -m src.assistant.cli index
         python -m src.assistant.cli index --docs-path ./docs --clear
+        python -m src.assistant.cli index --concurrency 8
+        python -m src.assistant.cli index --since-last
     """
     try:
+        from ..mcp.git_tools import GitTools
+        from ..rag.indexer import DocumentIndexer
+
         console.print("[bold blue]Starting indexing...[/bold blue]")
 
-        indexer = DocumentIndexer()
+        indexer = DocumentIndexer(concurrency=concurrency)
+        git_tools = GitTools()
+        head = git_tools.get_head_commit()
 
         if clear:
             console.print("[yellow]Clearing existing index...[/yellow]")
             indexer.clear_collection()
 
+        changes = None
+        if since_last and not clear:
+            last_commit = indexer.indexed_commit
+            if last_commit:
+                changes = git_tools.get_changed_files(last_commit)
+                if 'error' in changes:
+                    console.print(f"[yellow]Git diff failed ({changes['error']}), scanning all files[/yellow]")
+                    changes = None
+                else:
+                    console.print(f"[green]Changes since {last_commit[:8]}[/green]")
+            else:
+                console.print("[yellow]No indexed commit recorded yet, scanning all files[/yellow]")
+
         # Index docs directory
         docs_dir = Path(docs_path)
         if docs_dir.exists():
             console.print(f"[green]Indexing: {docs_dir}[/green]")
-            count = indexer.index_directory(docs_dir)
-            console.print(f"[bold green]Indexed {count} chunks from docs[/bold green]")
+            if changes is not None:
+                count = indexer.index_changes(docs_dir, changes, progress=_print_batch_progress)
+            else:
+                count = indexer.index_directory(docs_dir, progress=_print_batch_progress)
+            _print_sync_stats(indexer.last_sync_stats)
+            _print_run_stats(indexer.last_run_stats)
+            console.print(f"[bold green]Embedded {count} new chunks from docs[/bold green]")
         else:
             console.print(f"[yellow]Warning: {docs_dir} not found[/yellow]")
 
         # Also index README if exists
-        readme = Path('./README.md')
+        readme = Path('README.md')
         if readme.exists():
             console.print("[green]Indexing: README.md[/green]")
-            with open(readme) as f:
-                indexer.index_text(
-                    f.read(),
-                    metadata={'source': 'README.md', 'file_name': 'README.md'}
-                )
-            console.print("[bold green]Indexed README.md[/bold green]")
+            count = indexer.index_file(readme, progress=_print_batch_progress)
+            _print_sync_stats(indexer.last_sync_stats)
+            console.print(f"[bold green]Embedded {count} new chunks from README.md[/bold green]")
+
+        if head:
+            # Files indexed from uncommitted content are re-checked next time
+            worktree = git_tools.get_changed_files(head)
+            if 'error' not in worktree:
+                indexer.record_commit(head, indexer.uncommitted_files(docs_dir, worktree))
 
         # Show stats
         stats = indexer.get_stats()
@@ -130,6 +322,13 @@ def index(docs_path, clear):
         console.print(f"  Collection: {stats['collection_name']}")
         console.print(f"  Documents: {stats['document_count']}")
         console.print(f"  Location: {stats['persist_directory']}")
+        cache = stats['embedding_cache']
+        if cache:
+            console.print(
+                f"  Embedding cache: {cache['hits']} hits, {cache['misses']} misses "
+                f"({cache['hit_rate']:.0%}), {cache['entries']} entries, "
+                f"{cache['size_bytes'] / 1024 / 1024:.1f}/{cache['max_bytes'] / 1024 / 1024:.0f} MB"
+            )
 
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
@@ -143,11 +342,13 @@ def git():
     Usage:
         python -m src.assistant.cli git
     """
-    try:
+    def get_context():
         from ..mcp.server import MCPServer
 
-        mcp = MCPServer()
-        context = mcp.get_context()
+        return MCPServer().get_context()
+
+    try:
+        context = _run('git', get_context)
 
         console.print("\n[bold blue]Git Repository Context[/bold blue]\n")
 
@@ -180,15 +381,20 @@ def git():
 
 
 @cli.command()
-def interactive():
+@click.option('--profile', is_flag=True, help='Show time spent in each stage of every answer')
+def interactive(profile):
     """
     Start interactive assistant session.
 
     Usage:
         python -m src.assistant.cli interactive
+        python -m src.assistant.cli interactive --profile
     """
     try:
-        assistant = DevelopmentAssistant()
+        from rich.markdown import Markdown
+        from rich.panel import Panel
+
+        assistant = _assistant()
 
         console.print(Panel(
             "[bold blue]Development Assistant[/bold blue]\n\n"
@@ -215,19 +421,129 @@ def interactive():
                 if not query.strip():
                     continue
 
-                with console.status("[bold green]Thinking..."):
-                    response = assistant.help(query)
-
+                timings, usage = {}, {}
                 console.print("\n[bold green]Assistant:[/bold green]")
-                console.print(Markdown(response))
+                _print_streamed(_stream_help(query, timings, usage, assistant))
+                if profile:
+                    _print_profile(timings, usage)
 
             except KeyboardInterrupt:
                 console.print("\n[yellow]Goodbye![/yellow]")
                 break
 
+        stats = assistant.usage_stats()
+        if profile and stats['requests']:
+            console.print(
+                f"[dim]Session: {stats['requests']} answers, "
+                f"{stats['cache_hit_rate']:.0%} of prompt tokens read from cache[/dim]"
+            )
+
     except Exception as e:
         console.print(f"[bold red]Error:[/bold red] {e}")
 
 
+@cli.group()
+def daemon():
+    """
+    Manage the background assistant daemon.
+
+    While the daemon runs, help, search, files and git are forwarded to it
+    over a Unix socket, so the assistant, vector store and git repository
+    stay loaded between commands. It reopens the index after re-indexing.
+
+    Usage:
+        python -m src.assistant.cli daemon start
+        python -m src.assistant.cli daemon status
+        python -m src.assistant.cli daemon stop
+    """
+    pass
+
+
+@daemon.command('start')
+@click.option('--foreground', is_flag=True, help='Serve in this process instead of detaching')
+@click.option('--socket', 'socket_path', default=str(RAGConfig.ASSISTANT_SOCKET), help='Unix socket path')
+def daemon_start(foreground, socket_path):
+    """Start the daemon."""
+    from .daemon import AssistantDaemon, is_running, start_background
+
+    try:
+        if foreground:
+            AssistantDaemon(Path(socket_path)).serve()
+            return
+        if is_running(Path(socket_path)):
+            console.print(f"[yellow]Daemon already running on {socket_path}[/yellow]")
+            return
+        with console.status("[bold green]Starting daemon..."):
+            pid = start_background(Path(socket_path))
+        console.print(f"[bold green]Daemon started[/bold green] (pid {pid}, socket {socket_path})")
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+
+
+@daemon.command('stop')
+@click.option('--socket', 'socket_path', default=str(RAGConfig.ASSISTANT_SOCKET), help='Unix socket path')
+def daemon_stop(socket_path):
+    """Stop the daemon."""
+    from .daemon import DaemonUnavailable, request
+
+    try:
+        request('shutdown', Path(socket_path))
+        console.print("[bold green]Daemon stopped[/bold green]")
+    except DaemonUnavailable:
+        console.print("[yellow]Daemon is not running[/yellow]")
+    except Exception as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+
+
+@daemon.command('status')
+@click.option('--socket', 'socket_path', default=str(RAGConfig.ASSISTANT_SOCKET), help='Unix socket path')
+def daemon_status(socket_path):
+    """Show whether the daemon is running."""
+    from .daemon import is_running
+
+    if is_running(Path(socket_path)):
+        console.print(f"[bold green]Daemon running[/bold green] on {socket_path}")
+    else:
+        console.print("[yellow]Daemon is not running[/yellow]")
+
+
+@cli.command()
+@click.option('--http', 'use_http', is_flag=True, help='Serve over local HTTP instead of stdio')
+@click.option('--host', default='127.0.0.1', help='HTTP interface')
+@click.option('--port', default=RAGConfig.MCP_HTTP_PORT, help='HTTP port')
+@click.option('--workers', default=RAGConfig.MCP_WORKERS, help='Tool calls executed at the same time')
+@click.option('--timeout', default=RAGConfig.MCP_TOOL_TIMEOUT, help='Seconds a tool call may take')
+def mcp(use_http, host, port, workers, timeout):
+    """
+    Serve the git tools to MCP clients (JSON-RPC 2.0).
+
+    Over stdio (newline-delimited messages) by default, so MCP clients can
+    launch it as a subprocess; with --http one long-lived process serves
+    many clients at http://HOST:PORT (GET /metrics shows per-tool metrics).
+
+    Usage:
+        python -m src.assistant.cli mcp
+        python -m src.assistant.cli mcp --http --port 8765
+    """
+    from ..mcp.protocol import MCPProtocol, make_http_server, serve_stdio
+    from ..mcp.server import MCPServer
+
+    protocol = MCPProtocol(MCPServer(), workers=workers, tool_timeout=timeout)
+    try:
+        if not use_http:
+            serve_stdio(protocol)
+            return
+        server = make_http_server(protocol, host, port)
+        console.print(f"[bold green]MCP server listening on http://{host}:{server.server_port}[/bold green]")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    finally:
+        protocol.close()
+
+
 if __name__ == '__main__':
     cli()
@@ -0,0 +1,299 @@
+"""Background assistant daemon and its thin client (Unix socket)."""
+
+from typing import Any, Callable, Dict, Iterator, Optional
+from pathlib import Path
+import json
+import types
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+from ..rag.config import RAGConfig
+
+
+# Seconds to wait for a connection to the daemon
+CONNECT_TIMEOUT = 1.0
+# Seconds to wait for a response (help queries call the Claude API)
+RESPONSE_TIMEOUT = 300.0
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening on the socket."""
+
+
+class AssistantDaemon:
+    """
+    Keeps a ``DevelopmentAssistant`` warm between CLI invocations.
+
+    The assistant (API clients, vector store, git repository) is built
+    once and reused for every request. Before each request the index
+    version is checked; when the indexer has written since the retriever
+    was opened, the retriever is reopened so results reflect the new
+    index.
+
+    Requests are single JSON lines ``{"command": ..., "args": {...}}``
+    answered with ``{"ok": true, "result": ...}`` or
+    ``{"ok": false, "error": ...}``; streaming commands first send
+    ``{"delta": ...}`` lines. Each connection is served in its own
+    thread.
+    """
+
+    def __init__(self, socket_path: Path = RAGConfig.ASSISTANT_SOCKET):
+        """
+        Initialize daemon.
+
+        Args:
+            socket_path: Unix socket to listen on
+        """
+        from ..rag.query_cache import IndexVersion
+        from .assistant import DevelopmentAssistant
+
+        self.socket_path = Path(socket_path)
+        self.assistant = DevelopmentAssistant()
+        self.version = IndexVersion(
+            RAGConfig.index_version_path(RAGConfig.CHROMA_PERSIST_DIR, RAGConfig.COLLECTION_NAME)
+        )
+        self.loaded_version: Optional[int] = None
+        self.server: Optional[socketserver.ThreadingUnixStreamServer] = None
+        self._lock = threading.Lock()
+
+        self.commands = {
+            'ping': lambda: 'pong',
+            'help': lambda query=None: self.assistant.help(query),
+            'help_stream': self._help_stream,
+            'usage': lambda: self.assistant.usage_stats(),
+            'search': lambda query, limit=5: self.assistant.search_docs(query, limit),
+            'files': lambda query: self.assistant.get_related_files(query),
+            'git': lambda: self.assistant.mcp_server.get_context(),
+            'shutdown': self._shutdown,
+        }
+
+    def serve(self) -> None:
+        """Warm up the assistant and serve requests until shut down."""
+        if is_running(self.socket_path):
+            raise RuntimeError(f"Daemon already running on {self.socket_path}")
+        if self.socket_path.exists():
+            # Left behind by a daemon that did not shut down cleanly
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._reload_if_index_changed()
+        # Preload the MCP server (git imports) before the socket accepts clients
+        self.assistant.mcp_server
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    return
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    self.send({'ok': False, 'error': f"Malformed request: {e}"})
+                    return
+                if not isinstance(request, dict):
+                    self.send({'ok': False, 'error': "Malformed request: expected a JSON object"})
+                    return
+                daemon.handle(request, self.send)
+
+            def send(self, message):
+                self.wfile.write(json.dumps(message, default=str).encode('utf-8') + b"\n")
+                self.wfile.flush()
+
+        # The socket is created owner-only: no window where others can connect
+        umask = os.umask(0o077)
+        try:
+            self.server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), Handler)
+        finally:
+            os.umask(umask)
+        self.server.daemon_threads = True
+        print(f"Assistant daemon listening on {self.socket_path} (pid {os.getpid()})", flush=True)
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def handle(self, request: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Execute one request.
+
+        Args:
+            request: {"command": name, "args": keyword arguments}
+            send: Callback writing one response message
+        """
+        command = self.commands.get(request.get('command'))
+        if command is None:
+            send({'ok': False, 'error': f"Unknown command: {request.get('command')}"})
+            return
+        try:
+            self._reload_if_index_changed()
+            result = command(**request.get('args', {}))
+            if isinstance(result, types.GeneratorType):
+                # Stream deltas; the generator's return value is the result
+                try:
+                    while True:
+                        send({'delta': next(result)})
+                except StopIteration as stop:
+                    result = stop.value
+            send({'ok': True, 'result': result})
+        except Exception as e:
+            send({'ok': False, 'error': str(e)})
+
+    def _reload_if_index_changed(self) -> None:
+        """Reopen the retriever after the index was written."""
+        with self._lock:
+            version = self.version.read()
+            if version == self.loaded_version:
+                return
+            if self.loaded_version is not None:
+                print(f"Index changed (version {self.loaded_version} -> {version}), reloading", flush=True)
+            # cached_property: deleting it makes the next access reopen
+            stale = self.assistant.__dict__.pop('retriever', None)
+            if stale and hasattr(stale.client, 'release_collection'):
+                # SimpleVectorDB shares collection objects per process
+                stale.client.release_collection(stale.collection_name)
+            retriever = self.assistant.retriever
+            if retriever and hasattr(retriever.collection, 'snapshot'):
+                # SimpleVectorDB loads its data lazily: load it now
+                retriever.collection.snapshot()
+            self.loaded_version = version
+
+    def _help_stream(self, query: Optional[str] = None, profile: bool = False):
+        """Stream a help answer; returns stage timings and token usage if ``profile``."""
+        timings: Dict[str, float] = {}
+        usage: Dict[str, int] = {}
+        yield from self.assistant.stream_help(query, timings, usage)
+        return {'timings': timings, 'usage': usage} if profile else None
+
+    def _shutdown(self) -> str:
+        """Stop serving after the current response is sent."""
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+        return 'stopping'
+
+
+def request(
+    command: str,
+    socket_path: Path = RAGConfig.ASSISTANT_SOCKET,
+    **args
+) -> Any:
+    """
+    Send a command to the daemon.
+
+    Args:
+        command: Command name
+        socket_path: Daemon socket
+        **args: Command arguments
+
+    Returns:
+        Command result
+
+    Raises:
+        DaemonUnavailable: If no daemon is listening
+        RuntimeError: If the command failed in the daemon
+    """
+    stream = request_stream(command, socket_path, **args)
+    try:
+        while True:
+            next(stream)
+    except StopIteration as stop:
+        return stop.value
+
+
+def request_stream(
+    command: str,
+    socket_path: Path = RAGConfig.ASSISTANT_SOCKET,
+    **args
+) -> Iterator[Any]:
+    """
+    Send a command to the daemon and yield streamed deltas.
+
+    Args:
+        command: Command name
+        socket_path: Daemon socket
+        **args: Command arguments
+
+    Yields:
+        Deltas sent by streaming commands
+
+    Returns:
+        Command result (as the generator's return value)
+
+    Raises:
+        DaemonUnavailable: If no daemon is listening (before any delta)
+        RuntimeError: If the command failed in the daemon
+    """
+    if not hasattr(socket, 'AF_UNIX') or not Path(socket_path).exists():
+        raise DaemonUnavailable(str(socket_path))
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(str(socket_path))
+        except OSError as e:
+            raise DaemonUnavailable(str(e)) from e
+        sock.settimeout(RESPONSE_TIMEOUT)
+        sock.sendall(json.dumps({'command': command, 'args': args}).encode('utf-8') + b"\n")
+
+        streamed = False
+        with sock.makefile('rb') as reader:
+            for line in reader:
+                response = json.loads(line)
+                if 'delta' in response:
+                    streamed = True
+                    yield response['delta']
+                    continue
+                if not response['ok']:
+                    raise RuntimeError(response['error'])
+                return response['result']
+
+    if streamed:
+        raise RuntimeError("Daemon closed the connection mid-response")
+    raise DaemonUnavailable("daemon closed the connection")
+
+
+def is_running(socket_path: Path = RAGConfig.ASSISTANT_SOCKET) -> bool:
+    """Check whether a daemon answers on the socket."""
+    try:
+        return request('ping', socket_path) == 'pong'
+    except (DaemonUnavailable, RuntimeError, OSError, ValueError):
+        return False
+
+
+def start_background(socket_path: Path = RAGConfig.ASSISTANT_SOCKET, timeout: float = 30.0) -> int:
+    """
+    Start the daemon in a detached process and wait until it answers.
+
+    Args:
+        socket_path: Daemon socket
+        timeout: Seconds to wait for the daemon to come up
+
+    Returns:
+        PID of the daemon process
+    """
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    log_file = socket_path.with_suffix('.log')
+    with open(log_file, 'ab') as log:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'src.assistant.cli', 'daemon', 'start', '--foreground',
+             '--socket', str(socket_path)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_running(socket_path):
+            return process.pid
+        if process.poll() is not None:
+            raise RuntimeError(f"Daemon exited with code {process.returncode}, see {log_file}")
+        time.sleep(0.1)
+    raise RuntimeError(f"Daemon did not start within {timeout:.0f}s, see {log_file}")
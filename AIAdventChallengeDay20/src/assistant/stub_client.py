@@ -0,0 +1,176 @@
+"""Offline stand-in for the Anthropic client with prompt-caching accounting."""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+import hashlib
+import json
+import re
+import threading
+import time
+
+
+# Rough token estimate used by the stub
+CHARS_PER_TOKEN = 4
+
+
+class StubUsage:
+    """Token usage of a stub response (same fields as the API)."""
+
+    def __init__(self, input_tokens: int, output_tokens: int, cache_creation_input_tokens: int, cache_read_input_tokens: int):
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.cache_creation_input_tokens = cache_creation_input_tokens
+        self.cache_read_input_tokens = cache_read_input_tokens
+
+
+class StubTextBlock:
+    """Text content block."""
+
+    type = 'text'
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubMessage:
+    """Response message with ``content`` and ``usage``."""
+
+    def __init__(self, text: str, usage: StubUsage):
+        self.content = [StubTextBlock(text)]
+        self.usage = usage
+        self.stop_reason = 'end_turn'
+
+
+class StubStream:
+    """Streaming response: ``text_stream`` and ``get_final_message``."""
+
+    def __init__(self, message: StubMessage):
+        self._message = message
+
+    @property
+    def text_stream(self) -> Iterator[str]:
+        """Response text in word-sized chunks."""
+        yield from re.findall(r'\S+\s*|\s+', self._message.content[0].text)
+
+    def get_final_message(self) -> StubMessage:
+        """Complete response."""
+        return self._message
+
+
+class StubMessages:
+    """``client.messages`` of the stub."""
+
+    def __init__(self, client: 'StubAnthropicClient'):
+        self._client = client
+
+    def create(self, **request) -> StubMessage:
+        """Answer a request."""
+        return self._client.respond(request)
+
+    @contextmanager
+    def stream(self, **request):
+        """Answer a request as a stream."""
+        yield StubStream(self._client.respond(request))
+
+
+class StubAnthropicClient:
+    """
+    Deterministic local replacement for ``anthropic.Anthropic``.
+
+    Answers are canned, so no network or API key is needed. Prompt
+    caching is modelled on the API: content blocks (system, then message
+    blocks in order) up to a ``cache_control`` breakpoint form a prefix;
+    a request reads the longest prefix cached within ``ttl`` seconds and
+    writes the prefix up to its last breakpoint. Prefixes shorter than
+    ``min_cacheable_tokens`` are not cached. ``usage`` reports
+    ``cache_read_input_tokens``, ``cache_creation_input_tokens`` and the
+    remaining ``input_tokens`` accordingly.
+    """
+
+    def __init__(self, answer: Optional[str] = None, min_cacheable_tokens: int = 1024, ttl: float = 300.0):
+        """
+        Initialize stub client.
+
+        Args:
+            answer: Fixed answer text (default reports prompt token counts)
+            min_cacheable_tokens: Minimum prefix length that is cached
+            ttl: Seconds a cached prefix stays valid after its last use
+        """
+        self.answer = answer
+        self.min_cacheable_tokens = min_cacheable_tokens
+        self.ttl = ttl
+        self.messages = StubMessages(self)
+        self.requests: List[Dict[str, Any]] = []
+        self._cache: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def respond(self, request: Dict[str, Any]) -> StubMessage:
+        """
+        Build the response and usage for a request.
+
+        Args:
+            request: Keyword arguments of ``messages.create``
+
+        Returns:
+            Response message
+        """
+        self.requests.append(request)
+        blocks = _blocks(request)
+        total = sum(tokens for tokens, _, _ in blocks)
+
+        # Token count and key of the prefix ending at each breakpoint
+        # (caches are per model)
+        prefixes: List[Tuple[int, str]] = []
+        digest = hashlib.sha256(str(request.get('model')).encode('utf-8'))
+        prefix_tokens = 0
+        for tokens, block, cached in blocks:
+            digest.update(json.dumps(block, sort_keys=True).encode('utf-8'))
+            prefix_tokens += tokens
+            if cached:
+                prefixes.append((prefix_tokens, digest.copy().hexdigest()))
+
+        now = time.monotonic()
+        read = created = 0
+        with self._lock:
+            for tokens, key in reversed(prefixes):
+                if self._cache.get(key, 0) > now:
+                    read = tokens
+                    break
+            for tokens, key in prefixes:
+                if tokens >= self.min_cacheable_tokens:
+                    self._cache[key] = now + self.ttl
+            if prefixes and prefixes[-1][0] >= self.min_cacheable_tokens:
+                created = prefixes[-1][0] - read
+
+        text = self.answer if self.answer is not None else f"Stub answer ({total} prompt tokens, {read} read from cache)."
+        usage = StubUsage(
+            input_tokens=total - read - created,
+            output_tokens=_tokens(text),
+            cache_creation_input_tokens=created,
+            cache_read_input_tokens=read
+        )
+        return StubMessage(text, usage)
+
+
+def _tokens(text: str) -> int:
+    """Approximate token count."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _blocks(request: Dict[str, Any]) -> List[Tuple[int, Dict[str, Any], bool]]:
+    """(tokens, block without cache_control, is breakpoint) in prompt order."""
+    system = request.get('system') or []
+    if isinstance(system, str):
+        system = [{'type': 'text', 'text': system}]
+    contents = list(system)
+    for message in request.get('messages', []):
+        content = message['content']
+        if isinstance(content, str):
+            content = [{'type': 'text', 'text': content}]
+        contents.extend({**block, 'role': message['role']} for block in content)
+
+    blocks = []
+    for block in contents:
+        plain = {key: value for key, value in block.items() if key != 'cache_control'}
+        blocks.append((_tokens(block.get('text', '')), plain, 'cache_control' in block))
+    return blocks
@@ -1,6 +1,10 @@
 """MCP (Model Context Protocol) server for git integration."""
 
-from .git_tools import GitTools
-from .server import MCPServer
+from .._lazy import lazy_exports
 
 __all__ = ['GitTools', 'MCPServer']
+
+__getattr__ = lazy_exports(__name__, {
+    'GitTools': '.git_tools',
+    'MCPServer': '.server',
+})
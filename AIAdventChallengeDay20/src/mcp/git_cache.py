@@ -0,0 +1,196 @@
+"""Caches of git query results: by repository state and by commit."""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from pathlib import Path
+import copy
+import json
+import os
+import threading
+import time
+
+
+class GitStateCache:
+    """
+    Reuses git query results while the repository is unchanged.
+
+    The state is a cheap fingerprint read from files under ``.git``
+    (no git subprocess): HEAD and the ref it points to, the mtime and
+    size of the index, the HEAD reflog, the branch refs (loose and
+    packed) and the config. Any commit, checkout, reset, stage or
+    branch/remote edit changes it and invalidates every entry.
+
+    Edits in the working tree (modified or untracked files) do not touch
+    ``.git``, so ``volatile`` entries additionally expire after
+    ``volatile_ttl`` seconds.
+    """
+
+    def __init__(self, git_dir: Path, common_dir: Optional[Path] = None, volatile_ttl: float = 2.0):
+        """
+        Initialize cache.
+
+        Args:
+            git_dir: Git directory of the work tree (HEAD, index, reflog)
+            common_dir: Shared git directory (refs, config); defaults to git_dir
+            volatile_ttl: Seconds working-tree results stay valid
+        """
+        self.git_dir = Path(git_dir)
+        self.common_dir = Path(common_dir or git_dir)
+        self.volatile_ttl = volatile_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, Tuple[Tuple, float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def state(self) -> Tuple:
+        """
+        Fingerprint of the repository state.
+
+        Returns:
+            Tuple that changes whenever HEAD, the index, refs or config change
+        """
+        head = _read(self.git_dir / 'HEAD')
+        ref = None
+        if head and head.startswith('ref: '):
+            ref = _read(self.common_dir / head[5:])
+        return (
+            head,
+            ref,
+            _stat(self.git_dir / 'index'),
+            _stat(self.git_dir / 'logs' / 'HEAD'),
+            _stat(self.common_dir / 'refs' / 'heads'),
+            _stat(self.common_dir / 'packed-refs'),
+            _stat(self.common_dir / 'config'),
+        )
+
+    def get(self, key: Hashable, compute: Callable[[], Any], volatile: bool = False) -> Any:
+        """
+        Get a cached result or compute and store it.
+
+        Args:
+            key: Query name and arguments
+            compute: Function producing the result
+            volatile: Result depends on the working tree (expires after the TTL)
+
+        Returns:
+            Result (a copy, so callers may modify it)
+        """
+        state = self.state()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == state and (not volatile or now - entry[1] < self.volatile_ttl):
+                self.hits += 1
+                return copy.deepcopy(entry[2])
+            self.misses += 1
+
+        value = compute()
+        if volatile:
+            # Working-tree queries may refresh stat info in .git/index
+            # themselves; that is not a change (and the entry expires anyway)
+            state = self.state()
+        with self._lock:
+            self._entries[key] = (state, now, value)
+        return copy.deepcopy(value)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+
+def _read(path: Path) -> Optional[str]:
+    """File content, or None if it does not exist."""
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    """(mtime in ns, size) of a path, or None if it does not exist."""
+    try:
+        st = path.stat()
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+class CommitStatsCache:
+    """
+    Per-commit statistics stored in a JSON file, keyed by commit SHA.
+
+    A commit never changes, so entries never expire.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize cache.
+
+        Args:
+            path: JSON file
+        """
+        self.path = Path(path)
+        self._entries: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def get_many(self, shas: List[str]) -> Dict[str, Any]:
+        """
+        Get cached statistics.
+
+        Args:
+            shas: Full commit hashes
+
+        Returns:
+            Statistics of the cached commits by SHA
+        """
+        with self._lock:
+            entries = self._load()
+            return {sha: entries[sha] for sha in shas if sha in entries}
+
+    def put_many(self, stats: Dict[str, Any]) -> None:
+        """
+        Store statistics and save the file.
+
+        Args:
+            stats: Statistics by full commit hash
+        """
+        if not stats:
+            return
+        with self._lock:
+            self._load().update(stats)
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = self.path.with_suffix('.tmp')
+                with open(tmp_file, 'w') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_file, self.path)
+            except Exception as e:
+                print(f"Warning: Could not save commit stats cache: {e}")
+
+    def _load(self) -> Dict[str, Any]:
+        """Entries, read from the file on first use."""
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, 'r') as f:
+                        self._entries = json.load(f)
+                except Exception as e:
+                    print(f"Warning: Could not load commit stats cache: {e}")
+        return self._entries
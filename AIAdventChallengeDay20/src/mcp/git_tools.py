@@ -1,28 +1,93 @@
 """Git repository tools for MCP."""
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+from functools import cached_property
 from pathlib import Path
+import os
+import threading
 import git
 from datetime import datetime
 
+from .git_cache import CommitStatsCache, GitStateCache
+from .path_index import PathHistoryIndex
+from .porcelain import iter_records, parse_diff, parse_numstat, parse_status
+
+
+# Seconds results depending on the working tree (unstaged and untracked
+# files) are reused; everything else lives until the repository changes
+WORKTREE_TTL = 2.0
+# Commits per batched `git log --numstat` call
+STATS_BATCH_SIZE = 500
+# Default page limits of get_diff
+DIFF_MAX_FILES = 20
+DIFF_MAX_BYTES = 64 * 1024
+
 
 class GitTools:
-    """Git repository information tools."""
+    """
+    Git repository information tools.
+
+    Query results are cached (see ``GitStateCache``) and reused until
+    HEAD, the index, refs or config change, so repeated context requests
+    on an unchanged repository do not run git again.
+
+    Tools may be called from several threads: GitPython objects are not
+    thread-safe, so each thread gets its own ``repo`` (caches are shared).
+    """
 
-    def __init__(self, repo_path: Optional[Path] = None):
+    def __init__(self, repo_path: Optional[Path] = None, worktree_ttl: float = WORKTREE_TTL):
         """
         Initialize git tools.
 
         Args:
             repo_path: Path to git repository (defaults to current directory)
+            worktree_ttl: Seconds working-tree results are cached
         """
         self.repo_path = repo_path or Path.cwd()
+        self.cache: Optional[GitStateCache] = None
+        self.commit_stats: Optional[CommitStatsCache] = None
+        self._root: Optional[str] = None
+        self._local = threading.local()
         try:
-            self.repo = git.Repo(self.repo_path, search_parent_directories=True)
+            repo = self._open_repo(self.repo_path)
+            self._root = repo.working_tree_dir or repo.git_dir
+            self._local.repo = repo
+            self.cache = GitStateCache(repo.git_dir, repo.common_dir, worktree_ttl)
+            # Inside .git: stats are per repository and never go stale
+            self.commit_stats = CommitStatsCache(Path(repo.common_dir) / 'assistant_commit_stats.json')
         except git.InvalidGitRepositoryError:
-            self.repo = None
             print(f"Warning: {self.repo_path} is not a git repository")
 
+    @property
+    def repo(self) -> Optional[git.Repo]:
+        """Repository of the calling thread (None outside a git repository)."""
+        if self._root is None:
+            return None
+        repo = getattr(self._local, 'repo', None)
+        if repo is None:
+            repo = self._local.repo = self._open_repo(self._root)
+        return repo
+
+    @staticmethod
+    def _open_repo(path) -> git.Repo:
+        """Open a repository for read-only queries."""
+        repo = git.Repo(path, search_parent_directories=True)
+        # Keep `git status` from rewriting .git/index to refresh stat
+        # info: that would invalidate the cache
+        repo.git.update_environment(GIT_OPTIONAL_LOCKS='0')
+        return repo
+
+    def cache_stats(self) -> Dict:
+        """
+        Get result cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        if not self.cache:
+            return {"error": "Not a git repository"}
+        return self.cache.stats()
+
     def get_current_branch(self) -> Dict:
         """
         Get current git branch information.
@@ -32,7 +97,10 @@ class GitTools:
         """
         if not self.repo:
             return {"error": "Not a git repository"}
+        return self.cache.get(('branch',), self._current_branch)
 
+    def _current_branch(self) -> Dict:
+        """Uncached ``get_current_branch``."""
         try:
             branch = self.repo.active_branch
             return {
@@ -45,61 +113,196 @@ class GitTools:
         except Exception as e:
             return {"error": str(e)}
 
+    def get_head_commit(self) -> Optional[str]:
+        """
+        Get the full hash of HEAD.
+
+        Returns:
+            Commit hash, or None outside a repository or before the first commit
+        """
+        if not self.repo:
+            return None
+
+        try:
+            return self.repo.head.commit.hexsha
+        except Exception:
+            return None
+
+    def get_changed_files(self, since: str) -> Dict:
+        """
+        Get files changed between a commit and the working tree.
+
+        Combines ``git diff -M --name-status <since>`` (committed, staged
+        and unstaged changes, with rename detection) with untracked files.
+
+        Untracked files are listed separately: they show up on every call
+        whether or not they changed, so callers should compare them with
+        what they already processed.
+
+        Args:
+            since: Commit to compare against
+
+        Returns:
+            Dictionary with the repository root and lists of added,
+            modified, deleted and untracked paths and renamed [old, new]
+            pairs (paths relative to the root)
+        """
+        if not self.repo:
+            return {"error": "Not a git repository"}
+
+        try:
+            changes = {
+                "root": self.repo.working_tree_dir,
+                "added": [],
+                "modified": [],
+                "deleted": [],
+                "renamed": [],
+                "untracked": []
+            }
+            fields = self.repo.git.diff('-M', '--name-status', '-z', since).split('\0')
+            i = 0
+            while i < len(fields) and fields[i]:
+                status = fields[i][0]
+                if status in ('R', 'C'):
+                    old_path, new_path = fields[i + 1], fields[i + 2]
+                    if status == 'R':
+                        changes["renamed"].append([old_path, new_path])
+                    else:
+                        changes["added"].append(new_path)
+                    i += 3
+                    continue
+
+                path = fields[i + 1]
+                if status == 'A':
+                    changes["added"].append(path)
+                elif status == 'D':
+                    changes["deleted"].append(path)
+                else:
+                    # M, T (type change) and U (unmerged)
+                    changes["modified"].append(path)
+                i += 2
+
+            changes["untracked"] = self.repo.untracked_files
+            return changes
+        except Exception as e:
+            return {"error": str(e)}
+
     def get_status(self) -> Dict:
         """
         Get git status information.
 
+        Runs a single ``git status --porcelain=v2 -z --branch`` and parses
+        its output as it is read.
+
         Returns:
-            Dictionary with status info
+            Dictionary with branch, upstream, ahead/behind counts, lists of
+            modified, staged, conflicted and untracked files and is_dirty
         """
         if not self.repo:
             return {"error": "Not a git repository"}
 
         try:
-            status = {
-                "branch": self.repo.active_branch.name,
-                "modified": [item.a_path for item in self.repo.index.diff(None)],
-                "staged": [item.a_path for item in self.repo.index.diff("HEAD")],
-                "untracked": self.repo.untracked_files,
-                "is_dirty": self.repo.is_dirty()
-            }
-            return status
+            return self.cache.get(('status',), self._status, volatile=True)
         except Exception as e:
             return {"error": str(e)}
 
-    def get_recent_commits(self, limit: int = 5) -> List[Dict]:
+    def _status(self) -> Dict:
+        """Uncached ``get_status``."""
+        process = self.repo.git.status(
+            '--porcelain=v2', '-z', '--branch', '--untracked-files=all', as_process=True
+        )
+        status = parse_status(iter_records(process.stdout))
+        process.wait()
+        return status
+
+    def get_recent_commits(self, limit: int = 5, with_stats: bool = True) -> List[Dict]:
         """
         Get recent commits.
 
         Args:
             limit: Number of commits to retrieve
+            with_stats: Include the number of changed files (see ``get_commit_stats``)
 
         Returns:
             List of commit information
         """
         if not self.repo:
             return [{"error": "Not a git repository"}]
+        return self.cache.get(('recent_commits', limit, with_stats), lambda: self._recent_commits(limit, with_stats))
 
+    def _recent_commits(self, limit: int, with_stats: bool) -> List[Dict]:
+        """Uncached ``get_recent_commits``."""
         try:
-            commits = []
-            for commit in self.repo.iter_commits(max_count=limit):
-                commits.append({
+            commits = list(self.repo.iter_commits(max_count=limit))
+            stats = self.get_commit_stats([commit.hexsha for commit in commits]) if with_stats else {}
+            result = []
+            for commit in commits:
+                info = {
                     "hash": commit.hexsha[:8],
                     "message": commit.message.strip(),
                     "author": str(commit.author),
-                    "date": commit.committed_datetime.isoformat(),
-                    "files_changed": len(commit.stats.files)
-                })
-            return commits
+                    "date": commit.committed_datetime.isoformat()
+                }
+                if with_stats:
+                    info["files_changed"] = stats[commit.hexsha]["files"]
+                result.append(info)
+            return result
         except Exception as e:
             return [{"error": str(e)}]
 
+    def get_commit_stats(self, shas: List[str]) -> Dict[str, Dict]:
+        """
+        Get diff statistics of commits.
+
+        Statistics are read from the on-disk cache; the missing ones are
+        computed with one ``git log --numstat`` call per batch (merges are
+        compared with their first parent) and cached.
+
+        Args:
+            shas: Full commit hashes
+
+        Returns:
+            {sha: {"files", "insertions", "deletions"}}
+        """
+        if not self.repo:
+            return {}
+
+        stats = self.commit_stats.get_many(shas)
+        missing = [sha for sha in dict.fromkeys(shas) if sha not in stats]
+        computed = {}
+        for start in range(0, len(missing), STATS_BATCH_SIZE):
+            output = self.repo.git.log(
+                '--no-walk=unsorted', '--numstat', '--no-renames', '--diff-merges=first-parent',
+                '--format=%x00%H', *missing[start:start + STATS_BATCH_SIZE]
+            )
+            current = None
+            for line in output.splitlines():
+                if line.startswith('\0'):
+                    current = computed[line[1:]] = {"files": 0, "insertions": 0, "deletions": 0}
+                elif line and current is not None:
+                    added, deleted, _ = line.split('\t', 2)
+                    current["files"] += 1
+                    # "-" for binary files
+                    current["insertions"] += int(added) if added.isdigit() else 0
+                    current["deletions"] += int(deleted) if deleted.isdigit() else 0
+
+        self.commit_stats.put_many(computed)
+        return {**stats, **computed}
+
+    @cached_property
+    def path_index(self) -> PathHistoryIndex:
+        """Path -> commits index of the HEAD history (loaded on first use)."""
+        return PathHistoryIndex(self.repo, Path(self.repo.common_dir) / 'assistant_path_index.json')
+
     def get_file_history(self, file_path: str, limit: int = 5) -> List[Dict]:
         """
         Get commit history for a specific file.
 
+        Commits are looked up in ``path_index`` (updated with new commits
+        first), following renames.
+
         Args:
-            file_path: Path to file
+            file_path: Path to file or directory (relative to the repository root)
             limit: Number of commits
 
         Returns:
@@ -107,10 +310,17 @@ class GitTools:
         """
         if not self.repo:
             return [{"error": "Not a git repository"}]
+        return self.cache.get(('file_history', file_path, limit), lambda: self._file_history(file_path, limit))
 
+    def _file_history(self, file_path: str, limit: int) -> List[Dict]:
+        """Uncached ``get_file_history``."""
         try:
+            if os.path.isabs(file_path):
+                file_path = os.path.relpath(file_path, self.repo.working_tree_dir)
+            self.path_index.update()
             commits = []
-            for commit in self.repo.iter_commits(paths=file_path, max_count=limit):
+            for sha in self.path_index.history(Path(file_path).as_posix(), limit):
+                commit = self.repo.commit(sha)
                 commits.append({
                     "hash": commit.hexsha[:8],
                     "message": commit.message.strip(),
@@ -132,7 +342,7 @@ class GitTools:
             return ["error: Not a git repository"]
 
         try:
-            return [branch.name for branch in self.repo.branches]
+            return self.cache.get(('branches',), lambda: [branch.name for branch in self.repo.branches])
         except Exception as e:
             return [f"error: {e}"]
 
@@ -145,7 +355,10 @@ class GitTools:
         """
         if not self.repo:
             return {"error": "Not a git repository"}
+        return self.cache.get(('remotes',), self._remote_info)
 
+    def _remote_info(self) -> Dict:
+        """Uncached ``get_remote_info``."""
         try:
             remotes = {}
             for remote in self.repo.remotes:
@@ -157,23 +370,92 @@ class GitTools:
         except Exception as e:
             return {"error": str(e)}
 
-    def get_diff(self, cached: bool = False) -> str:
+    def get_diff(
+        self,
+        cached: bool = False,
+        paths: Optional[List[str]] = None,
+        cursor: int = 0,
+        max_files: int = DIFF_MAX_FILES,
+        max_bytes: int = DIFF_MAX_BYTES,
+        stat_only: bool = False
+    ) -> Dict:
         """
-        Get git diff.
+        Get one page of the git diff, split per file.
+
+        The diff is read from the git pipe only up to the end of the page;
+        pass the returned cursor to get the next one. A file larger than
+        ``max_bytes`` is returned alone, cut at a line boundary.
 
         Args:
             cached: If True, get staged diff
+            paths: Limit the diff to these paths
+            cursor: Index of the first file (from the previous page)
+            max_files: Maximum number of files per page
+            max_bytes: Maximum size of the diff text per page
+            stat_only: Only per-file line counts (like ``--stat``)
 
         Returns:
-            Diff text
+            Dictionary with "files" ({"path", "diff"} or, with stat_only,
+            {"path", "insertions", "deletions"}; cut diffs are marked
+            "truncated") and "cursor" of the next page (None on the last)
         """
         if not self.repo:
-            return "Error: Not a git repository"
+            return {"error": "Not a git repository"}
 
         try:
-            if cached:
-                return self.repo.git.diff('--cached')
-            else:
-                return self.repo.git.diff()
+            files = []
+            size = 0
+            next_cursor = None
+            diffs = self.iter_diff(cached, paths, stat_only)
+            try:
+                for index, entry in enumerate(diffs):
+                    if index < cursor:
+                        continue
+                    entry_bytes = 0 if stat_only else len(entry["diff"].encode('utf-8'))
+                    if len(files) >= max_files or (files and size + entry_bytes > max_bytes):
+                        next_cursor = index
+                        break
+                    if entry_bytes > max_bytes:
+                        text = entry["diff"].encode('utf-8')[:max_bytes].decode('utf-8', errors='ignore')
+                        cut = text.rfind("\n")
+                        entry["diff"] = text[:cut] if cut > 0 else text
+                        entry["truncated"] = True
+                        entry_bytes = max_bytes
+                    files.append(entry)
+                    size += entry_bytes
+            finally:
+                diffs.close()
+            return {"files": files, "cursor": next_cursor}
         except Exception as e:
-            return f"Error: {e}"
+            return {"error": str(e)}
+
+    def iter_diff(self, cached: bool = False, paths: Optional[List[str]] = None, stat_only: bool = False) -> Iterator[Dict]:
+        """
+        Stream the git diff per file as git produces it.
+
+        Closing the iterator early stops the git process.
+
+        Args:
+            cached: If True, get staged diff
+            paths: Limit the diff to these paths
+            stat_only: Yield per-file line counts instead of diff text
+
+        Yields:
+            {"path", "diff"} or {"path", "insertions", "deletions"}
+        """
+        args = ['--no-color', '--no-ext-diff']
+        if cached:
+            args.append('--cached')
+        if stat_only:
+            args += ['--numstat', '-z']
+        process = self.repo.git.diff(*args, '--', *(paths or []), as_process=True)
+        try:
+            if stat_only:
+                yield from parse_numstat(iter_records(process.stdout))
+            else:
+                yield from parse_diff(iter_records(process.stdout, b'\n'))
+            process.wait()
+        finally:
+            if process.proc.poll() is None:
+                process.proc.kill()
+                process.proc.wait()
@@ -0,0 +1,176 @@
+"""Persistent path -> commits index of the HEAD history."""
+
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import json
+import os
+import threading
+
+import git
+
+from .porcelain import iter_records
+
+
+class PathHistoryIndex:
+    """
+    Maps every path to the commits that touched it.
+
+    Built from one ``git log -M --name-status`` pass over the history of
+    HEAD and extended with only the new commits (``<indexed>..HEAD``)
+    when HEAD moves forward; when HEAD moves elsewhere (checkout of an
+    unrelated branch, rebase, reset) the index is rebuilt. Renames are
+    recorded, so history lookups follow a file across them like
+    ``git log --follow``. Merge commits are not indexed (``git log``
+    shows no changes for them).
+
+    Commits are numbered in history order (larger = newer); ``paths``
+    holds ascending commit numbers per path and ``renames`` the
+    ``(number, old path)`` pairs per new path.
+    """
+
+    def __init__(self, repo: git.Repo, path: Path):
+        """
+        Initialize index.
+
+        Args:
+            repo: Repository
+            path: JSON file the index is stored in
+        """
+        self.repo = repo
+        self.path = Path(path)
+        self.head: Optional[str] = None
+        self.shas: List[str] = []
+        self.paths: Dict[str, List[int]] = {}
+        self.renames: Dict[str, List[Tuple[int, str]]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def update(self) -> int:
+        """
+        Index commits added to the history of HEAD since the last update.
+
+        Returns:
+            Number of newly indexed commits
+        """
+        with self._lock:
+            try:
+                head = self.repo.head.commit.hexsha
+            except ValueError:
+                # No commits yet
+                return 0
+            if head == self.head:
+                return 0
+
+            revisions = [head]
+            if self.head and self._is_ancestor(self.head, head):
+                revisions.append(f"^{self.head}")
+            else:
+                self.shas, self.paths, self.renames = [], {}, {}
+
+            commits = self._read_log(revisions)
+            # The log is newest first; number commits oldest first
+            for sha, changes in reversed(commits):
+                number = len(self.shas)
+                self.shas.append(sha)
+                for path, old_path in changes:
+                    self.paths.setdefault(path, []).append(number)
+                    if old_path:
+                        self.renames.setdefault(path, []).append((number, old_path))
+
+            self.head = head
+            self._save()
+            return len(commits)
+
+    def history(self, file_path: str, limit: int = 5, follow: bool = True) -> List[str]:
+        """
+        Commits that touched a file or directory, newest first.
+
+        Args:
+            file_path: Path relative to the repository root
+            limit: Maximum number of commits
+            follow: Continue with the old name at renames
+
+        Returns:
+            Commit hashes
+        """
+        path = file_path.strip('/')
+        if path not in self.paths:
+            # A directory: commits touching any path below it
+            prefix = path + '/'
+            numbers = sorted({number for name, touched in self.paths.items()
+                              if name.startswith(prefix) for number in touched})
+            return [self.shas[number] for number in reversed(numbers[-limit:])]
+
+        result: List[str] = []
+        below = len(self.shas)
+        seen = set()
+        while path and len(result) < limit and path not in seen:
+            seen.add(path)
+            numbers = [number for number in self.paths.get(path, []) if number < below]
+            renamed = [(number, old) for number, old in self.renames.get(path, []) if number < below]
+            start, old_path = max(renamed) if follow and renamed else (-1, None)
+            for number in reversed(numbers):
+                if number < start or len(result) >= limit:
+                    break
+                result.append(self.shas[number])
+            path, below = old_path, start
+        return result
+
+    def _is_ancestor(self, ancestor: str, commit: str) -> bool:
+        """Whether ``ancestor`` is in the history of ``commit``."""
+        try:
+            return self.repo.is_ancestor(ancestor, commit)
+        except git.GitCommandError:
+            # Unknown commit (e.g. garbage collected after a rebase)
+            return False
+
+    def _read_log(self, revisions: List[str]) -> List[Tuple[str, List[Tuple[str, Optional[str]]]]]:
+        """
+        Stream ``git log -M --name-status`` for revisions.
+
+        Returns:
+            [(sha, [(path, old path or None), ...]), ...] newest first
+        """
+        process = self.repo.git.log(
+            '-M', '--name-status', '-z', '--format=%x01%H', *revisions, as_process=True
+        )
+        commits = []
+        records = iter_records(process.stdout)
+        for record in records:
+            record = record.lstrip('\n')
+            if record.startswith('\x01'):
+                changes: List[Tuple[str, Optional[str]]] = []
+                commits.append((record[1:], changes))
+            elif record[:1] in ('R', 'C'):
+                old_path, new_path = next(records), next(records)
+                changes.append((new_path, old_path if record[0] == 'R' else None))
+            elif record:
+                changes.append((next(records), None))
+        process.wait()
+        return commits
+
+    def _load(self) -> None:
+        """Load the stored index, if any."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.head = data['head']
+            self.shas = data['shas']
+            self.paths = data['paths']
+            self.renames = {path: [tuple(rename) for rename in renames] for path, renames in data['renames'].items()}
+        except Exception as e:
+            print(f"Warning: Could not load path history index: {e}")
+            self.head, self.shas, self.paths, self.renames = None, [], {}, {}
+
+    def _save(self) -> None:
+        """Atomically store the index."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.path.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({'head': self.head, 'shas': self.shas, 'paths': self.paths, 'renames': self.renames}, f)
+            os.replace(tmp_file, self.path)
+        except Exception as e:
+            print(f"Warning: Could not save path history index: {e}")
@@ -0,0 +1,162 @@
+"""Streaming parsers for machine-readable git output."""
+
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+
+
+# Bytes read from a git pipe at a time
+READ_CHUNK_SIZE = 65536
+
+
+def iter_records(stream: BinaryIO, separator: bytes = b'\0') -> Iterator[str]:
+    """
+    Split a byte stream into records as it is read.
+
+    Args:
+        stream: Binary stream (e.g. stdout of a git process)
+        separator: Record terminator
+
+    Yields:
+        Decoded records (a trailing unterminated record included)
+    """
+    buffer = b''
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer += chunk
+        *records, buffer = buffer.split(separator)
+        for record in records:
+            yield record.decode('utf-8', errors='replace')
+    if buffer:
+        yield buffer.decode('utf-8', errors='replace')
+
+
+def parse_status(records: Iterable[str]) -> Dict:
+    """
+    Parse ``git status --porcelain=v2 -z --branch`` records.
+
+    Args:
+        records: NUL-separated records (see ``iter_records``)
+
+    Returns:
+        Dictionary with branch (None when detached), commit, upstream,
+        ahead, behind and lists of modified (work tree vs index), staged
+        (index vs HEAD), conflicted and untracked paths, plus is_dirty
+    """
+    status = {
+        "branch": None,
+        "commit": None,
+        "upstream": None,
+        "ahead": 0,
+        "behind": 0,
+        "modified": [],
+        "staged": [],
+        "conflicted": [],
+        "untracked": [],
+    }
+
+    records = iter(records)
+    for record in records:
+        kind = record[:1]
+        if kind == '#':
+            _, key, value = record.split(' ', 2)
+            if key == 'branch.head':
+                status["branch"] = None if value == '(detached)' else value
+            elif key == 'branch.oid':
+                status["commit"] = None if value == '(initial)' else value
+            elif key == 'branch.upstream':
+                status["upstream"] = value
+            elif key == 'branch.ab':
+                ahead, behind = value.split(' ')
+                status["ahead"], status["behind"] = int(ahead), -int(behind)
+        elif kind in ('1', '2'):
+            # 1 XY sub mH mI mW hH hI path
+            # 2 XY sub mH mI mW hH hI Xscore path, then the original path
+            fields = record.split(' ', 8 if kind == '1' else 9)
+            xy, path = fields[1], fields[-1]
+            if kind == '2':
+                next(records, None)
+            if xy[0] != '.':
+                status["staged"].append(path)
+            if xy[1] != '.':
+                status["modified"].append(path)
+        elif kind == 'u':
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            status["conflicted"].append(record.split(' ', 10)[-1])
+        elif kind == '?':
+            status["untracked"].append(record[2:])
+
+    status["is_dirty"] = bool(status["modified"] or status["staged"] or status["conflicted"])
+    return status
+
+
+def parse_diff(lines: Iterable[str]) -> Iterator[Dict]:
+    """
+    Split ``git diff`` output into per-file chunks as it is read.
+
+    Args:
+        lines: Output lines without line terminators
+
+    Yields:
+        {"path": new path, "diff": text of the file's diff}
+    """
+    path = None
+    chunk: List[str] = []
+    in_header = False
+    for line in lines:
+        if line.startswith('diff --git '):
+            if chunk:
+                yield {"path": path, "diff": "\n".join(chunk)}
+            path, chunk, in_header = _header_path(line[11:]), [line], True
+            continue
+        if not chunk:
+            continue
+        if in_header:
+            # The header names the new path unambiguously in these lines
+            if line.startswith('rename to '):
+                path = line[10:]
+            elif line.startswith('+++ b/'):
+                path = line[6:]
+            elif line.startswith('@@'):
+                in_header = False
+        chunk.append(line)
+    if chunk:
+        yield {"path": path, "diff": "\n".join(chunk)}
+
+
+def parse_numstat(records: Iterable[str]) -> Iterator[Dict]:
+    """
+    Parse ``git diff --numstat -z`` records as they are read.
+
+    Args:
+        records: NUL-separated records (see ``iter_records``)
+
+    Yields:
+        {"path", "insertions", "deletions"} per file (line counts are
+        None for binary files; renames also have "old_path")
+    """
+    records = iter(records)
+    for record in records:
+        record = record.lstrip('\n')
+        if not record:
+            continue
+        added, deleted, path = record.split('\t', 2)
+        stat = {
+            "path": path,
+            "insertions": int(added) if added != '-' else None,
+            "deletions": int(deleted) if deleted != '-' else None,
+        }
+        if not path:
+            # Rename: old and new path follow as separate records
+            stat["old_path"], stat["path"] = next(records), next(records)
+        yield stat
+
+
+def _header_path(names: str) -> str:
+    """Path from the ``a/<path> b/<path>`` part of a ``diff --git`` line."""
+    length = (len(names) - 5) // 2
+    path = names[2:2 + length]
+    if names == f"a/{path} b/{path}":
+        return path
+    # Renamed (fixed by the "rename to" line later) or quoted
+    return names
@@ -0,0 +1,416 @@
+"""MCP over JSON-RPC 2.0: stdio and local HTTP transports."""
+
+from typing import Any, Callable, Dict, List, Optional, Union
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import contextlib
+import json
+import sys
+import threading
+import time
+import uuid
+
+from .server import MCPServer
+
+
+# Protocol revisions understood by the server, newest first (2025-03-26
+# is the latest one with JSON-RPC batching)
+PROTOCOL_VERSIONS = ['2025-03-26', '2024-11-05']
+
+# Tool calls executed at the same time
+WORKERS = 8
+# Seconds a tool call may take before it is answered with a timeout
+TOOL_TIMEOUT = 30.0
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+
+class ToolMetrics:
+    """Per-tool call counts by outcome and latency statistics."""
+
+    def __init__(self, window: int = 1000):
+        """
+        Initialize metrics.
+
+        Args:
+            window: Recent latencies kept per tool for percentiles
+        """
+        self.window = window
+        self._tools: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, tool: str, seconds: float, outcome: str) -> None:
+        """
+        Record a finished call.
+
+        Args:
+            tool: Tool name
+            seconds: Latency from request to response
+            outcome: ok | error | timeout | cancelled
+        """
+        with self._lock:
+            entry = self._tools.setdefault(tool, {
+                'calls': 0, 'ok': 0, 'error': 0, 'timeout': 0, 'cancelled': 0,
+                'total': 0.0, 'max': 0.0, 'recent': deque(maxlen=self.window)
+            })
+            entry['calls'] += 1
+            entry[outcome] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            entry['recent'].append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get metrics.
+
+        Returns:
+            {tool: {calls, ok, error, timeout, cancelled, mean_ms, p50_ms,
+            p95_ms, max_ms}}
+        """
+        with self._lock:
+            result = {}
+            for tool, entry in self._tools.items():
+                recent = sorted(entry['recent'])
+                result[tool] = {
+                    **{key: entry[key] for key in ('calls', 'ok', 'error', 'timeout', 'cancelled')},
+                    'mean_ms': entry['total'] / entry['calls'] * 1000,
+                    'p50_ms': recent[len(recent) // 2] * 1000,
+                    'p95_ms': recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000,
+                    'max_ms': entry['max'] * 1000,
+                }
+            return result
+
+
+class _Call:
+    """A ``tools/call`` request in flight."""
+
+    def __init__(self, key: tuple, request_id: Any, tool: str, future: Future, timeout: float):
+        self.key = key
+        self.request_id = request_id
+        self.tool = tool
+        self.future = future
+        self.started = time.monotonic()
+        self.deadline = self.started + timeout
+        self.cancelled = False
+        self.done = threading.Event()
+        future.add_done_callback(lambda _: self.done.set())
+
+
+class MCPProtocol:
+    """
+    JSON-RPC 2.0 endpoint exposing the tools of an ``MCPServer``.
+
+    Implements ``initialize``, ``ping``, ``tools/list``, ``tools/call``
+    and the ``notifications/initialized`` and ``notifications/cancelled``
+    notifications, plus ``server/metrics`` (per-tool metrics). Batches are
+    answered with one array; their tool calls run concurrently.
+
+    Tool calls run on a thread pool. A call that exceeds its timeout is
+    answered with a tool error and a cancelled one is not answered at all
+    (as the protocol requires); a call that already started cannot be
+    interrupted, so it finishes in the background and its result is
+    dropped. ``handle`` is thread-safe, so one instance can serve many
+    clients; request ids (for cancellation) are scoped by session.
+    """
+
+    def __init__(
+        self,
+        server: MCPServer,
+        workers: int = WORKERS,
+        tool_timeout: float = TOOL_TIMEOUT,
+        tool_timeouts: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize protocol endpoint.
+
+        Args:
+            server: MCP server with the tools
+            workers: Tool calls executed at the same time
+            tool_timeout: Default timeout of a tool call in seconds
+            tool_timeouts: Timeouts of individual tools
+        """
+        self.server = server
+        self.tool_timeout = tool_timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self.metrics = ToolMetrics()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mcp-tool')
+        self._in_flight: Dict[tuple, _Call] = {}
+        self._lock = threading.Lock()
+
+        self.methods: Dict[str, Callable[[Dict], Any]] = {
+            'initialize': self._initialize,
+            'ping': lambda params: {},
+            'tools/list': lambda params: {'tools': self._tool_schemas()},
+            'server/metrics': lambda params: self.metrics.snapshot(),
+            'notifications/initialized': lambda params: None,
+        }
+
+    def handle(self, message: Union[Dict, List], session: Optional[str] = None) -> Optional[Union[Dict, List]]:
+        """
+        Answer a JSON-RPC message or batch.
+
+        Args:
+            message: Parsed request, notification or batch
+            session: Client session (None for a single-client transport)
+
+        Returns:
+            Response (a list for batches), or None if nothing is to be sent
+        """
+        if isinstance(message, list):
+            if not message:
+                return _error(None, INVALID_REQUEST, "Empty batch")
+            # Start every call before waiting for any
+            pending = [self._start(item, session) for item in message]
+            responses = [response for response in map(self._finish, pending) if response is not None]
+            return responses or None
+        return self._finish(self._start(message, session))
+
+    def close(self) -> None:
+        """Stop the worker pool (calls in progress are abandoned)."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self, message: Any, session: Optional[str]) -> Union[_Call, Dict, None]:
+        """Execute a message or, for tool calls, submit it to the pool."""
+        if not isinstance(message, dict) or message.get('jsonrpc') != '2.0' or not isinstance(message.get('method'), str):
+            return _error(message.get('id') if isinstance(message, dict) else None, INVALID_REQUEST, "Invalid request")
+
+        request_id = message.get('id')
+        notification = 'id' not in message
+        if not notification and not _valid_id(request_id):
+            return _error(None, INVALID_REQUEST, "Request id must be a string or an integer")
+        method = message['method']
+        params = message.get('params') or {}
+        if not isinstance(params, dict):
+            return None if notification else _error(request_id, INVALID_PARAMS, "Params must be an object")
+
+        if method == 'notifications/cancelled':
+            if _valid_id(params.get('requestId')):
+                self._cancel((session, params['requestId']))
+            return None
+
+        if method == 'tools/call' and not notification:
+            name = params.get('name')
+            tool = self.server.tools.get(name)
+            if tool is None:
+                return _error(request_id, INVALID_PARAMS, f"Unknown tool: {name}")
+            future = self.pool.submit(tool, **(params.get('arguments') or {}))
+            call = _Call((session, request_id), request_id, name, future,
+                         self.tool_timeouts.get(name, self.tool_timeout))
+            with self._lock:
+                self._in_flight[call.key] = call
+            return call
+
+        handler = self.methods.get(method)
+        if handler is None:
+            return None if notification else _error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+        try:
+            result = handler(params)
+        except Exception as e:
+            return None if notification else _error(request_id, INTERNAL_ERROR, str(e))
+        return None if notification else {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    def _finish(self, pending: Union[_Call, Dict, None]) -> Optional[Dict]:
+        """Wait for a submitted tool call and build its response."""
+        if not isinstance(pending, _Call):
+            return pending
+
+        call = pending
+        call.done.wait(max(0.0, call.deadline - time.monotonic()))
+        with self._lock:
+            if self._in_flight.get(call.key) is call:
+                del self._in_flight[call.key]
+        elapsed = time.monotonic() - call.started
+
+        if call.cancelled:
+            call.future.cancel()
+            self.metrics.record(call.tool, elapsed, 'cancelled')
+            return None
+        if not call.future.done():
+            call.future.cancel()
+            self.metrics.record(call.tool, elapsed, 'timeout')
+            return _tool_result(call.request_id, f"Tool '{call.tool}' timed out after {elapsed:.1f}s", True)
+
+        try:
+            result = call.future.result()
+        except Exception as e:
+            self.metrics.record(call.tool, elapsed, 'error')
+            return _tool_result(call.request_id, f"{type(e).__name__}: {e}", True)
+        is_error = isinstance(result, dict) and 'error' in result
+        self.metrics.record(call.tool, elapsed, 'error' if is_error else 'ok')
+        return _tool_result(call.request_id, result, is_error)
+
+    def _initialize(self, params: Dict) -> Dict:
+        """Answer the handshake, agreeing on a protocol revision."""
+        requested = params.get('protocolVersion')
+        return {
+            'protocolVersion': requested if requested in PROTOCOL_VERSIONS else PROTOCOL_VERSIONS[0],
+            'capabilities': {'tools': {'listChanged': False}},
+            'serverInfo': {'name': MCPServer.NAME, 'version': MCPServer.VERSION},
+        }
+
+    def _cancel(self, key: tuple) -> None:
+        """Cancel a request in flight (``notifications/cancelled``)."""
+        with self._lock:
+            call = self._in_flight.get(key)
+        if call:
+            call.cancelled = True
+            call.future.cancel()
+            call.done.set()
+
+    def _tool_schemas(self) -> List[Dict]:
+        """Tool descriptions with JSON Schema inputs."""
+        return [
+            {
+                'name': tool['name'],
+                'description': tool['description'],
+                'inputSchema': {
+                    'type': 'object',
+                    'properties': tool['parameters'],
+                    'required': [name for name, spec in tool['parameters'].items() if 'default' not in spec],
+                },
+            }
+            for tool in self.server.list_tools()
+        ]
+
+
+def serve_stdio(protocol: MCPProtocol, input_stream=None, output_stream=None) -> None:
+    """
+    Serve newline-delimited JSON-RPC messages until the input ends.
+
+    Requests are handled concurrently, so responses may arrive out of
+    order; notifications (cancellations) are handled as soon as they are
+    read. While serving, ``print`` output goes to stderr to keep stdout
+    clean for the protocol.
+
+    Args:
+        protocol: Protocol endpoint
+        input_stream: Text stream with messages (default stdin)
+        output_stream: Text stream for responses (default stdout)
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    write_lock = threading.Lock()
+
+    def respond(response):
+        if response is not None:
+            with write_lock:
+                output_stream.write(json.dumps(response, ensure_ascii=False, default=str) + "\n")
+                output_stream.flush()
+
+    def handle(message):
+        try:
+            respond(protocol.handle(message))
+        except Exception as e:
+            respond(_error(None, INTERNAL_ERROR, str(e)))
+
+    with contextlib.redirect_stdout(sys.stderr), ThreadPoolExecutor(thread_name_prefix='mcp-request') as requests:
+        for line in input_stream:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                respond(_error(None, PARSE_ERROR, "Parse error"))
+                continue
+            if isinstance(message, dict) and 'id' not in message:
+                handle(message)
+            else:
+                requests.submit(handle, message)
+
+
+def make_http_server(protocol: MCPProtocol, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server for the protocol.
+
+    ``POST`` any path with a JSON-RPC message or batch; responses are
+    JSON (``202 Accepted`` without a body for notifications only).
+    ``initialize`` assigns an ``Mcp-Session-Id`` that the client sends
+    with later requests. ``GET /metrics`` returns per-tool metrics.
+    Requests from browser pages of other origins are rejected.
+
+    Args:
+        protocol: Protocol endpoint
+        host: Interface to listen on (local by default)
+        port: Port (0 picks a free one)
+
+    Returns:
+        Server; call ``serve_forever()`` to run it
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if not _local_origin(self.headers.get('Origin')):
+                self.send_error(403, "Origin not allowed")
+                return
+            try:
+                message = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            except ValueError:
+                self._send_json(_error(None, PARSE_ERROR, "Parse error"))
+                return
+
+            headers = {}
+            session = self.headers.get('Mcp-Session-Id')
+            if isinstance(message, dict) and message.get('method') == 'initialize':
+                session = headers['Mcp-Session-Id'] = uuid.uuid4().hex
+            response = protocol.handle(message, session)
+            if response is None:
+                self.send_response(202)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self._send_json(response, headers)
+
+        def do_GET(self):
+            if urlparse(self.path).path != '/metrics':
+                self.send_error(405, "Use POST for JSON-RPC messages")
+                return
+            self._send_json(protocol.metrics.snapshot())
+
+        def _send_json(self, data, headers=None):
+            body = json.dumps(data, ensure_ascii=False, default=str).encode('utf-8')
+            self.send_response(200)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            print(f"{self.address_string()} {format % args}", file=sys.stderr)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict:
+    """JSON-RPC error response."""
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+
+def _tool_result(request_id: Any, result: Any, is_error: bool) -> Dict:
+    """``tools/call`` response with the result as JSON text content."""
+    text = result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, indent=2, default=str)
+    return {
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'result': {'content': [{'type': 'text', 'text': text}], 'isError': is_error},
+    }
+
+
+def _valid_id(request_id: Any) -> bool:
+    """Whether a value is a valid JSON-RPC request id."""
+    return isinstance(request_id, (str, int)) and not isinstance(request_id, bool)
+
+
+def _local_origin(origin: Optional[str]) -> bool:
+    """Whether a request may come from this Origin (none or localhost)."""
+    return not origin or urlparse(origin).hostname in ('localhost', '127.0.0.1', '::1')
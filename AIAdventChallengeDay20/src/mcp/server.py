@@ -1,6 +1,7 @@
 """MCP Server implementation."""
 
-from typing import Dict, Any, List, Callable
+from typing import Dict, Any, List, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 import json
 from .git_tools import GitTools
@@ -11,9 +12,13 @@ class MCPServer:
     MCP Server for providing tools to AI assistant.
 
     This is a simplified MCP implementation that provides tools
-    for git integration and project context.
+    for git integration and project context. ``protocol.MCPProtocol``
+    serves them to external MCP clients over stdio or HTTP.
     """
 
+    NAME = "git-repo-mcp"
+    VERSION = "1.0.0"
+
     def __init__(self, repo_path: Optional[Path] = None):
         """
         Initialize MCP server.
@@ -22,6 +27,8 @@ class MCPServer:
             repo_path: Path to git repository
         """
         self.git_tools = GitTools(repo_path)
+        # One thread per get_context part
+        self._context_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='git-context')
         self.tools: Dict[str, Callable] = {
             'get_current_branch': self.git_tools.get_current_branch,
             'get_git_status': self.git_tools.get_status,
@@ -58,6 +65,11 @@ class MCPServer:
                         "type": "integer",
                         "description": "Number of commits to retrieve",
                         "default": 5
+                    },
+                    "with_stats": {
+                        "type": "boolean",
+                        "description": "Include the number of changed files",
+                        "default": True
                     }
                 }
             },
@@ -88,12 +100,38 @@ class MCPServer:
             },
             {
                 "name": "get_diff",
-                "description": "Get git diff",
+                "description": "Get one page of the git diff, split per file",
                 "parameters": {
                     "cached": {
                         "type": "boolean",
                         "description": "If true, get staged diff",
                         "default": False
+                    },
+                    "paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Limit the diff to these paths",
+                        "default": None
+                    },
+                    "cursor": {
+                        "type": "integer",
+                        "description": "Cursor returned by the previous page",
+                        "default": 0
+                    },
+                    "max_files": {
+                        "type": "integer",
+                        "description": "Maximum number of files per page",
+                        "default": 20
+                    },
+                    "max_bytes": {
+                        "type": "integer",
+                        "description": "Maximum size of the diff text per page",
+                        "default": 65536
+                    },
+                    "stat_only": {
+                        "type": "boolean",
+                        "description": "Only per-file insertions and deletions",
+                        "default": False
                     }
                 }
             }
@@ -122,19 +160,48 @@ class MCPServer:
         except Exception as e:
             return {"error": str(e)}
 
-    def get_context(self) -> Dict[str, Any]:
+    def get_context(self, deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Get full context for AI assistant.
 
+        Branch, status, recent commits and remotes are fetched in
+        parallel. With a ``deadline``, parts not finished in time are
+        reported as errors marked ``timed_out`` and listed under
+        "timed_out"; parts already running keep going in the background
+        (warming the git caches for next time), parts still queued are
+        cancelled.
+
+        Args:
+            deadline: Seconds to wait for all parts (None = no limit)
+
         Returns:
             Dictionary with git context
         """
-        return {
-            "branch": self.git_tools.get_current_branch(),
-            "status": self.git_tools.get_status(),
-            "recent_commits": self.git_tools.get_recent_commits(limit=3),
-            "remotes": self.git_tools.get_remote_info()
+        parts = {
+            "branch": self.git_tools.get_current_branch,
+            "status": self.git_tools.get_status,
+            "recent_commits": lambda: self.git_tools.get_recent_commits(limit=3, with_stats=False),
+            "remotes": self.git_tools.get_remote_info
         }
+        futures = {name: self._context_pool.submit(part) for name, part in parts.items()}
+        wait(futures.values(), timeout=deadline)
+
+        context: Dict[str, Any] = {}
+        timed_out = []
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                timed_out.append(name)
+                error = {"error": f"Timed out after {deadline}s", "timed_out": True}
+                # Commit lists report errors as a one-item list
+                context[name] = [error] if name == "recent_commits" else error
+                continue
+            try:
+                context[name] = future.result()
+            except Exception as e:
+                context[name] = {"error": str(e)}
+        context["timed_out"] = timed_out
+        return context
 
     def to_json(self) -> str:
         """
@@ -144,11 +211,8 @@ class MCPServer:
             JSON string
         """
         return json.dumps({
-            "name": "git-repo-mcp",
-            "version": "1.0.0",
+            "name": self.NAME,
+            "version": self.VERSION,
             "tools": self.list_tools()
         }, indent=2)
 
-
-# Fix import
-from typing import Optional
@@ -1,7 +1,11 @@
 """RAG (Retrieval-Augmented Generation) module."""
 
-from .indexer import DocumentIndexer
-from .retriever import DocumentRetriever
-from .embeddings import EmbeddingGenerator
+from .._lazy import lazy_exports
 
 __all__ = ['DocumentIndexer', 'DocumentRetriever', 'EmbeddingGenerator']
+
+__getattr__ = lazy_exports(__name__, {
+    'DocumentIndexer': '.indexer',
+    'DocumentRetriever': '.retriever',
+    'EmbeddingGenerator': '.embeddings',
+})
@@ -1,13 +1,19 @@
 """Document chunking utilities."""
 
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import hashlib
 from .config import RAGConfig
 
 
 class DocumentChunker:
     """Split documents into chunks for embedding."""
 
+    # File extensions indexed by default
+    DEFAULT_EXTENSIONS = ['.md', '.txt', '.py', '.js', '.json']
+
     def __init__(
         self,
         chunk_size: int = RAGConfig.CHUNK_SIZE,
@@ -68,37 +74,168 @@ class DocumentChunker:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
 
-            metadata = {
-                'source': str(file_path),
-                'file_name': file_path.name,
-                'file_type': file_path.suffix,
-            }
-
-            return self.chunk_text(content, metadata)
+            return self.chunk_text(content, self.file_metadata(file_path))
 
         except Exception as e:
             print(f"Error reading file {file_path}: {e}")
             return []
 
-    def chunk_directory(self, directory: Path, extensions: List[str] = None) -> List[Dict]:
+    @staticmethod
+    def file_metadata(file_path: Path) -> Dict:
         """
-        Chunk all files in a directory.
+        Metadata attached to chunks of a file.
+
+        Args:
+            file_path: Path to file
+
+        Returns:
+            Dictionary with source, file name and file type
+        """
+        return {
+            'source': str(file_path),
+            'file_name': file_path.name,
+            'file_type': file_path.suffix,
+        }
+
+    def list_files(self, directory: Path, extensions: List[str] = None) -> List[Path]:
+        """
+        List files in a directory that would be chunked.
 
         Args:
             directory: Directory path
             extensions: File extensions to include (e.g., ['.md', '.py'])
 
         Returns:
-            List of all chunks from all files
+            Sorted list of file paths
         """
         if extensions is None:
-            extensions = ['.md', '.txt', '.py', '.js', '.json']
+            extensions = self.DEFAULT_EXTENSIONS
+
+        return sorted(
+            file_path for file_path in directory.rglob('*')
+            if file_path.is_file() and file_path.suffix in extensions
+        )
 
-        all_chunks = []
+    def iter_file_chunks(
+        self,
+        files: Iterable[Path],
+        known_hashes: Optional[Dict[str, str]] = None,
+        workers: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        Lazily read, hash and chunk files, one result per file in order.
 
-        for file_path in directory.rglob('*'):
-            if file_path.is_file() and file_path.suffix in extensions:
-                chunks = self.chunk_file(file_path)
-                all_chunks.extend(chunks)
+        Trees of at least ``RAGConfig.CHUNK_PARALLEL_MIN_FILES`` files are
+        processed in a process pool with a bounded number of files in
+        flight, so memory does not grow with the size of the tree.
 
-        return all_chunks
+        Args:
+            files: Files to chunk
+            known_hashes: Content hashes by source path; files whose hash
+                matches are not chunked
+            workers: Process count (defaults to ``RAGConfig.CHUNK_WORKERS``)
+
+        Yields:
+            Dicts with ``path``, ``sha256``, ``chunks`` (None when the hash
+            matched) and ``error`` (None on success)
+        """
+        files = list(files)
+        known_hashes = known_hashes or {}
+        workers = RAGConfig.CHUNK_WORKERS if workers is None else workers
+        jobs = [
+            (path, self.chunk_size, self.chunk_overlap, known_hashes.get(str(path)))
+            for path in files
+        ]
+
+        if workers <= 1 or len(jobs) < RAGConfig.CHUNK_PARALLEL_MIN_FILES:
+            for job in jobs:
+                yield _read_and_chunk(*job)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            try:
+                for job in jobs:
+                    pending.append(executor.submit(_read_and_chunk, *job))
+                    if len(pending) >= 4 * workers:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def iter_chunks(
+        self,
+        directory: Path,
+        extensions: List[str] = None,
+        batch_size: int = RAGConfig.CHUNK_BATCH_SIZE,
+        workers: Optional[int] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Lazily chunk all files in a directory, in batches across files.
+
+        Args:
+            directory: Directory path
+            extensions: File extensions to include (e.g., ['.md', '.py'])
+            batch_size: Chunks per yielded batch
+            workers: Process count (defaults to ``RAGConfig.CHUNK_WORKERS``)
+
+        Yields:
+            Lists of up to ``batch_size`` chunks
+        """
+        batch = []
+        for result in self.iter_file_chunks(self.list_files(directory, extensions), workers=workers):
+            if result['error']:
+                print(f"Error reading file {result['path']}: {result['error']}")
+                continue
+            for chunk in result['chunks']:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def chunk_directory(self, directory: Path, extensions: List[str] = None) -> List[Dict]:
+        """
+        Chunk all files in a directory.
+
+        Args:
+            directory: Directory path
+            extensions: File extensions to include (e.g., ['.md', '.py'])
+
+        Returns:
+            List of all chunks from all files
+        """
+        return [chunk for batch in self.iter_chunks(directory, extensions) for chunk in batch]
+
+
+def _read_and_chunk(
+    file_path: Path,
+    chunk_size: int,
+    chunk_overlap: int,
+    known_hash: Optional[str] = None
+) -> Dict:
+    """
+    Read, hash and chunk one file (runs in worker processes).
+
+    Args:
+        file_path: Path to file
+        chunk_size: Maximum tokens per chunk
+        chunk_overlap: Overlap between chunks
+        known_hash: Skip chunking if the content hash equals this
+
+    Returns:
+        Dict with ``path``, ``sha256``, ``chunks`` and ``error``
+    """
+    result = {'path': file_path, 'sha256': None, 'chunks': None, 'error': None}
+    try:
+        data = Path(file_path).read_bytes()
+        result['sha256'] = hashlib.sha256(data).hexdigest()
+        if result['sha256'] != known_hash:
+            chunker = DocumentChunker(chunk_size, chunk_overlap)
+            result['chunks'] = chunker.chunk_text(data.decode('utf-8'), chunker.file_metadata(Path(file_path)))
+    except (OSError, UnicodeDecodeError) as e:
+        result['error'] = str(e)
+    return result
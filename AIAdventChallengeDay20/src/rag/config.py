@@ -14,27 +14,111 @@ class RAGConfig:
     VOYAGE_API_KEY: str = os.getenv('VOYAGE_API_KEY', '')
     ANTHROPIC_API_KEY: str = os.getenv('ANTHROPIC_API_KEY', '')
 
+    # Answer backend: anthropic (Claude API) | stub (offline, see stub_client)
+    LLM_BACKEND: str = os.getenv('LLM_BACKEND', 'anthropic')
+
     # Chunking settings
     CHUNK_SIZE: int = int(os.getenv('CHUNK_SIZE', '500'))
     CHUNK_OVERLAP: int = int(os.getenv('CHUNK_OVERLAP', '50'))
+    CHUNK_BATCH_SIZE: int = int(os.getenv('CHUNK_BATCH_SIZE', '256'))
+    # Files are read and chunked in a process pool for trees of at least
+    # CHUNK_PARALLEL_MIN_FILES files
+    CHUNK_WORKERS: int = int(os.getenv('CHUNK_WORKERS', str(os.cpu_count() or 1)))
+    CHUNK_PARALLEL_MIN_FILES: int = int(os.getenv('CHUNK_PARALLEL_MIN_FILES', '64'))
+    # Chunked files buffered between the chunker and the embedding pipeline
+    INDEX_QUEUE_SIZE: int = int(os.getenv('INDEX_QUEUE_SIZE', '32'))
+
+    # Embedding backend: voyage (Voyage AI) | local (offline hashing TF-IDF)
+    EMBEDDING_BACKEND: str = os.getenv('EMBEDDING_BACKEND', 'voyage')
+    LOCAL_EMBED_DIM: int = int(os.getenv('LOCAL_EMBED_DIM', '1024'))
+
+    # Embedding pipeline settings
+    EMBED_BATCH_SIZE: int = int(os.getenv('EMBED_BATCH_SIZE', '128'))
+    EMBED_BATCH_MAX_TOKENS: int = int(os.getenv('EMBED_BATCH_MAX_TOKENS', '100000'))
+    EMBED_CONCURRENCY: int = int(os.getenv('EMBED_CONCURRENCY', '4'))
+    EMBED_REQUESTS_PER_MINUTE: int = int(os.getenv('EMBED_REQUESTS_PER_MINUTE', '300'))
+    EMBED_TOKENS_PER_MINUTE: int = int(os.getenv('EMBED_TOKENS_PER_MINUTE', '1000000'))
+    EMBED_MAX_RETRIES: int = int(os.getenv('EMBED_MAX_RETRIES', '5'))
+
+    # Embedding cache (Voyage AI only; 0 MB disables it)
+    EMBED_CACHE_PATH: Path = Path(os.getenv('EMBED_CACHE_PATH', './data/embedding_cache.sqlite3'))
+    EMBED_CACHE_MAX_MB: int = int(os.getenv('EMBED_CACHE_MAX_MB', '512'))
 
     # Retrieval settings
     TOP_K_RESULTS: int = int(os.getenv('TOP_K_RESULTS', '5'))
+    # Query result cache (0 disables it); persisted across CLI runs if enabled
+    QUERY_CACHE_SIZE: int = int(os.getenv('QUERY_CACHE_SIZE', '256'))
+    QUERY_CACHE_PERSIST: bool = os.getenv('QUERY_CACHE_PERSIST', 'false').lower() == 'true'
+    # Related files: pooling of file vectors (mean | max | hybrid) and
+    # whether to re-rank candidate files by their best chunk
+    RELATED_FILES_POOLING: str = os.getenv('RELATED_FILES_POOLING', 'hybrid')
+    RELATED_FILES_REFINE: bool = os.getenv('RELATED_FILES_REFINE', 'false').lower() == 'true'
 
     # ChromaDB settings
     CHROMA_PERSIST_DIR: Path = Path(os.getenv('CHROMA_PERSIST_DIR', './data/chromadb'))
     COLLECTION_NAME: str = os.getenv('COLLECTION_NAME', 'project_docs')
 
+    # Simple vector DB settings (used when ChromaDB is unavailable)
+    VECTOR_STORAGE: str = os.getenv('VECTOR_STORAGE', 'memory')  # memory | mmap
+    VECTOR_BLOCK_SIZE: int = int(os.getenv('VECTOR_BLOCK_SIZE', '8192'))
+    VECTOR_INDEX: str = os.getenv('VECTOR_INDEX', 'flat')  # flat | ivf
+    IVF_NPROBE: int = int(os.getenv('IVF_NPROBE', '8'))
+
+    # Assistant daemon
+    # Unix socket of the background assistant daemon (`cli daemon start`)
+    ASSISTANT_SOCKET: Path = Path(os.getenv('ASSISTANT_SOCKET', './data/assistant.sock'))
+
+    # MCP / git context
+    # MCP server for external clients (`cli mcp`): HTTP port, tool calls
+    # executed at the same time and seconds a tool call may take
+    MCP_HTTP_PORT: int = int(os.getenv('MCP_HTTP_PORT', '8765'))
+    MCP_WORKERS: int = int(os.getenv('MCP_WORKERS', '8'))
+    MCP_TOOL_TIMEOUT: float = float(os.getenv('MCP_TOOL_TIMEOUT', '30'))
+    # Seconds the assistant waits for git context before answering without
+    # the parts still running
+    GIT_CONTEXT_DEADLINE: float = float(os.getenv('GIT_CONTEXT_DEADLINE', '2'))
+
     # Paths
     DOCS_PATH: Path = Path(os.getenv('DOCS_PATH', './docs'))
     PROJECT_ROOT: Path = Path(os.getenv('PROJECT_ROOT', '.'))
 
+    @classmethod
+    def collection_metadata(cls) -> dict:
+        """Metadata passed when creating the vector DB collection."""
+        return {
+            "description": "Project documentation and code",
+            "storage": cls.VECTOR_STORAGE,
+            "block_size": cls.VECTOR_BLOCK_SIZE,
+            "index": cls.VECTOR_INDEX,
+            "nprobe": cls.IVF_NPROBE,
+        }
+
+    @classmethod
+    def local_embedding_stats_path(cls, persist_directory: Path, collection_name: str) -> Path:
+        """File with document frequencies of the local embedding backend."""
+        return Path(persist_directory) / f"{collection_name}.local_df.npy"
+
+    @classmethod
+    def index_version_path(cls, persist_directory: Path, collection_name: str) -> Path:
+        """File with the version counter bumped on every index write."""
+        return Path(persist_directory) / f"{collection_name}.version.txt"
+
+    @classmethod
+    def query_cache_path(cls, persist_directory: Path, collection_name: str) -> Path:
+        """File with persisted query results."""
+        return Path(persist_directory) / f"{collection_name}.query_cache.json"
+
+    @classmethod
+    def file_index_path(cls, persist_directory: Path, collection_name: str) -> Path:
+        """File with per-file pooled vectors."""
+        return Path(persist_directory) / f"{collection_name}.file_vectors.npz"
+
     @classmethod
     def validate(cls) -> None:
         """Validate configuration."""
-        if not cls.VOYAGE_API_KEY:
-            print("Warning: VOYAGE_API_KEY not set, embeddings will not work")
-        if not cls.ANTHROPIC_API_KEY:
+        if not cls.VOYAGE_API_KEY and cls.EMBEDDING_BACKEND != 'local':
+            print("Warning: VOYAGE_API_KEY not set, using local embeddings")
+        if not cls.ANTHROPIC_API_KEY and cls.LLM_BACKEND != 'stub':
             raise ValueError("ANTHROPIC_API_KEY must be set")
 
         # Create directories
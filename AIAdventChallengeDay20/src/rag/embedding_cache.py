@@ -0,0 +1,193 @@
+"""Disk-backed embedding cache."""
+
+from typing import Dict, List, Optional, Sequence
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+import time
+import numpy as np
+
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK = 500
+
+# Evict down to this fraction of the size limit, so eviction is not run
+# on every insert once the cache is full
+_EVICT_TARGET = 0.9
+
+
+class EmbeddingCache:
+    """
+    SQLite cache of embeddings keyed by (model, input_type, sha256(text)).
+
+    Lookups are done in bulk, so a batch costs one query per 500 texts.
+    Vectors are stored as float32 blobs. When the stored vectors exceed
+    ``max_bytes``, the least recently used entries are evicted.
+
+    Safe to share between threads; several processes may use the same
+    file (SQLite WAL mode).
+    """
+
+    def __init__(self, path: Path, max_bytes: int):
+        """
+        Initialize embedding cache.
+
+        Args:
+            path: SQLite database file
+            max_bytes: Size limit of stored vectors
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                input_type TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, input_type, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._stored_bytes()
+
+    def get_many(self, model: str, input_type: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up embeddings for a batch of texts.
+
+        Args:
+            model: Embedding model name
+            input_type: "document" or "query"
+            texts: Texts to look up
+
+        Returns:
+            Embedding for each text, or None on a miss
+        """
+        keys = [_text_hash(text) for text in texts]
+        found: Dict[bytes, bytes] = {}
+        with self._lock:
+            for start in range(0, len(keys), _LOOKUP_CHUNK):
+                chunk = list(set(keys[start:start + _LOOKUP_CHUNK]))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND input_type = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, input_type, *chunk]
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND input_type = ? AND text_hash = ?",
+                    [(now, model, input_type, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [
+                np.frombuffer(found[key], dtype=np.float32).tolist() if key in found else None
+                for key in keys
+            ]
+            hits = sum(result is not None for result in results)
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(
+        self,
+        model: str,
+        input_type: str,
+        texts: Sequence[str],
+        embeddings: Sequence[Sequence[float]]
+    ) -> None:
+        """
+        Store embeddings, evicting least recently used entries if needed.
+
+        Args:
+            model: Embedding model name
+            input_type: "document" or "query"
+            texts: Embedded texts
+            embeddings: Their embeddings
+        """
+        now = time.time()
+        rows = [
+            (model, input_type, _text_hash(text), np.asarray(embedding, dtype=np.float32).tobytes(), now)
+            for text, embedding in zip(texts, embeddings)
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+            self._size += sum(len(row[3]) for row in rows)
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries, size_bytes,
+            max_bytes and path
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': entries,
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'path': str(self.path)
+            }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _stored_bytes(self) -> int:
+        """Total size of stored vectors."""
+        return self._conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()[0]
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under the target size."""
+        # Other processes may have written too: start from the real size
+        self._size = self._stored_bytes()
+        target = int(self.max_bytes * _EVICT_TARGET)
+        while self._size > target:
+            rows = self._conn.execute(
+                "SELECT model, input_type, text_hash, LENGTH(vector) FROM embeddings "
+                "ORDER BY last_used LIMIT ?",
+                (_LOOKUP_CHUNK,)
+            ).fetchall()
+            if not rows:
+                break
+            evicted = []
+            for model, input_type, text_hash, size in rows:
+                evicted.append((model, input_type, text_hash))
+                self._size -= size
+                if self._size <= target:
+                    break
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND input_type = ? AND text_hash = ?",
+                evicted
+            )
+        self._conn.commit()
+
+
+def _text_hash(text: str) -> bytes:
+    """SHA-256 digest of a text."""
+    return hashlib.sha256(text.encode('utf-8')).digest()
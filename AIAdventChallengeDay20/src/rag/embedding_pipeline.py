@@ -0,0 +1,328 @@
+"""Batched, rate-limited, concurrent embedding pipeline."""
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import random
+import threading
+import time
+
+from .config import RAGConfig
+from .embeddings import EmbeddingGenerator
+
+
+class EmbeddingError(Exception):
+    """Raised when a batch still fails after all retries."""
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token estimate used for batching and rate limiting.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Approximate token count (about 4 characters per token)
+    """
+    return max(1, len(text) // 4)
+
+
+class RateLimiter:
+    """Thread-safe token bucket for requests and tokens per minute."""
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        """
+        Initialize rate limiter.
+
+        Args:
+            requests_per_minute: Request budget (0 = unlimited)
+            tokens_per_minute: Token budget (0 = unlimited)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = float(requests_per_minute)
+        self._tokens = float(tokens_per_minute)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Block until one request with ``tokens`` tokens fits the budget.
+
+        Args:
+            tokens: Tokens the request will consume
+
+        Returns:
+            Seconds spent waiting
+        """
+        if tokens > self.tokens_per_minute > 0:
+            # A request larger than the whole budget waits for a full bucket
+            tokens = self.tokens_per_minute
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                requests_ok = not self.requests_per_minute or self._requests >= 1
+                tokens_ok = not self.tokens_per_minute or self._tokens >= tokens
+                if requests_ok and tokens_ok:
+                    if self.requests_per_minute:
+                        self._requests -= 1
+                    if self.tokens_per_minute:
+                        self._tokens -= tokens
+                    return waited
+
+                wait = 0.0
+                if not requests_ok:
+                    wait = (1 - self._requests) * 60.0 / self.requests_per_minute
+                if not tokens_ok:
+                    wait = max(wait, (tokens - self._tokens) * 60.0 / self.tokens_per_minute)
+
+            time.sleep(wait)
+            waited += wait
+
+    def _refill(self) -> None:
+        """Refill buckets for the time elapsed since the last call."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(
+                float(self.requests_per_minute),
+                self._requests + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self._tokens = min(
+                float(self.tokens_per_minute),
+                self._tokens + elapsed * self.tokens_per_minute / 60.0
+            )
+
+
+class EmbeddingPipeline:
+    """
+    Embed many texts in provider-sized batches.
+
+    Batches run concurrently on a small thread pool, share one rate
+    limiter, and are retried independently with exponential backoff, so a
+    transient error costs one batch rather than the whole run.
+
+    ``run_stream`` accepts a lazily produced stream: batches are cut as
+    items arrive and at most ``2 * concurrency`` batches are in flight,
+    so the producer is consumed only as fast as embedding proceeds.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingGenerator] = None,
+        batch_size: int = RAGConfig.EMBED_BATCH_SIZE,
+        max_batch_tokens: int = RAGConfig.EMBED_BATCH_MAX_TOKENS,
+        concurrency: int = RAGConfig.EMBED_CONCURRENCY,
+        requests_per_minute: int = RAGConfig.EMBED_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = RAGConfig.EMBED_TOKENS_PER_MINUTE,
+        max_retries: int = RAGConfig.EMBED_MAX_RETRIES,
+        backoff_seconds: float = 1.0
+    ):
+        """
+        Initialize embedding pipeline.
+
+        Args:
+            embedder: Embedding generator (created if None)
+            batch_size: Maximum texts per request
+            max_batch_tokens: Maximum estimated tokens per request
+            concurrency: Number of batches in flight
+            requests_per_minute: Request rate limit (0 = unlimited)
+            tokens_per_minute: Token rate limit (0 = unlimited)
+            max_retries: Retries per batch after the first attempt
+            backoff_seconds: Base delay for exponential backoff
+        """
+        self.embedder = embedder or EmbeddingGenerator()
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.concurrency = max(1, concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+    def make_batches(self, texts: List[str]) -> List[Dict]:
+        """
+        Split texts into batches bounded by count and estimated tokens.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            List of dicts with ``start``, ``end`` and ``tokens``
+        """
+        return [
+            {'start': batch['start'], 'end': batch['end'], 'tokens': batch['tokens']}
+            for batch in self._iter_batches((text, None) for text in texts)
+        ]
+
+    def run(
+        self,
+        texts: List[str],
+        on_batch: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Embed texts batch by batch.
+
+        ``on_batch`` is called from the calling thread as each batch
+        completes (in completion order) with a dict holding ``start``,
+        ``end``, ``embeddings`` and per-batch and cumulative metrics.
+
+        Args:
+            texts: Texts to embed
+            on_batch: Callback for completed batches
+
+        Returns:
+            Run statistics (batches, texts, tokens, retries, seconds,
+            texts_per_second, tokens_per_second)
+
+        Raises:
+            EmbeddingError: If a batch fails after all retries
+        """
+        batches = list(self._iter_batches((text, None) for text in texts))
+        return self._run(iter(batches), len(batches), on_batch)
+
+    def run_stream(
+        self,
+        items: Iterable[Tuple[str, Any]],
+        on_batch: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Embed a lazily produced stream of ``(text, payload)`` items.
+
+        Same as ``run``, except that the batch dict passed to ``on_batch``
+        also holds the batch ``texts`` and ``payloads`` and its ``total``
+        is None. ``items`` is consumed from the calling thread.
+
+        Args:
+            items: Texts to embed, each with an opaque payload
+            on_batch: Callback for completed batches
+
+        Returns:
+            Run statistics (see ``run``)
+
+        Raises:
+            EmbeddingError: If a batch fails after all retries
+        """
+        return self._run(self._iter_batches(items), None, on_batch)
+
+    def _iter_batches(self, items: Iterable[Tuple[str, Any]]) -> Iterator[Dict]:
+        """Cut batches bounded by count and estimated tokens as items arrive."""
+        batch = None
+        position = 0
+        for text, payload in items:
+            text_tokens = estimate_tokens(text)
+            if batch and (
+                len(batch['texts']) >= self.batch_size
+                or batch['tokens'] + text_tokens > self.max_batch_tokens
+            ):
+                batch['end'] = position
+                yield batch
+                batch = None
+            if batch is None:
+                batch = {'start': position, 'end': position, 'tokens': 0, 'texts': [], 'payloads': []}
+            batch['texts'].append(text)
+            batch['payloads'].append(payload)
+            batch['tokens'] += text_tokens
+            position += 1
+        if batch:
+            batch['end'] = position
+            yield batch
+
+    def _run(
+        self,
+        batches: Iterator[Dict],
+        total: Optional[int],
+        on_batch: Optional[Callable[[Dict], None]]
+    ) -> Dict:
+        """Embed batches with a bounded number in flight."""
+        stats = {
+            'batches': 0,
+            'texts': 0,
+            'tokens': 0,
+            'retries': 0,
+            'rate_limited_seconds': 0.0,
+            'seconds': 0.0,
+            'texts_per_second': 0.0,
+            'tokens_per_second': 0.0
+        }
+        started = time.monotonic()
+        in_flight = {}
+
+        def finish(future) -> None:
+            batch = in_flight.pop(future)
+            result = future.result()
+
+            elapsed = time.monotonic() - started
+            stats['texts'] += batch['end'] - batch['start']
+            stats['tokens'] += batch['tokens']
+            stats['retries'] += result['attempts'] - 1
+            stats['rate_limited_seconds'] += result['waited']
+            stats['seconds'] = elapsed
+            stats['texts_per_second'] = stats['texts'] / elapsed if elapsed else 0.0
+            stats['tokens_per_second'] = stats['tokens'] / elapsed if elapsed else 0.0
+
+            if on_batch:
+                on_batch({
+                    'index': stats['batches'] - len(in_flight),
+                    'total': total,
+                    'start': batch['start'],
+                    'end': batch['end'],
+                    'texts': batch['texts'],
+                    'payloads': batch['payloads'],
+                    'embeddings': result['embeddings'],
+                    'tokens': batch['tokens'],
+                    'attempts': result['attempts'],
+                    'seconds': result['seconds'],
+                    'texts_per_second': stats['texts_per_second'],
+                    'tokens_per_second': stats['tokens_per_second']
+                })
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            try:
+                for batch in batches:
+                    in_flight[executor.submit(self._embed_batch, batch['texts'], batch['tokens'])] = batch
+                    stats['batches'] += 1
+                    while len(in_flight) >= 2 * self.concurrency:
+                        for future in wait(in_flight, return_when=FIRST_COMPLETED).done:
+                            finish(future)
+                while in_flight:
+                    for future in wait(in_flight, return_when=FIRST_COMPLETED).done:
+                        finish(future)
+            except BaseException:
+                for future in in_flight:
+                    future.cancel()
+                raise
+
+        return stats
+
+    def _embed_batch(self, texts: List[str], tokens: int) -> Dict:
+        """
+        Embed one batch with rate limiting and retries.
+
+        Returns:
+            Dict with ``embeddings``, ``attempts``, ``waited`` and ``seconds``
+        """
+        started = time.monotonic()
+        waited = 0.0
+        for attempt in range(self.max_retries + 1):
+            waited += self.rate_limiter.acquire(tokens)
+            try:
+                embeddings = self.embedder.embed_batch(texts)
+                return {
+                    'embeddings': embeddings,
+                    'attempts': attempt + 1,
+                    'waited': waited,
+                    'seconds': time.monotonic() - started
+                }
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise EmbeddingError(
+                        f"Embedding batch of {len(texts)} texts failed after "
+                        f"{attempt + 1} attempts: {e}"
+                    ) from e
+                delay = self.backoff_seconds * (2 ** attempt)
+                time.sleep(delay + random.uniform(0, delay))
@@ -1,30 +1,67 @@
 """Embedding generation for documents."""
 
-from typing import List, Optional
-import voyageai
+from typing import Dict, List, Optional
+from pathlib import Path
 from .config import RAGConfig
+from .embedding_cache import EmbeddingCache
+from .local_embeddings import LocalEmbedder
 
 
 class EmbeddingGenerator:
-    """Generate embeddings for text using Voyage AI."""
+    """
+    Generate embeddings for text using Voyage AI.
 
-    def __init__(self, api_key: Optional[str] = None):
+    With ``backend="local"`` (or without an API key) embeddings come from
+    the offline ``LocalEmbedder``, which is deterministic across runs.
+
+    Voyage AI embeddings are cached on disk (see ``EmbeddingCache``), so
+    only texts not seen before are sent to the API.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        backend: Optional[str] = None,
+        stats_path: Optional[Path] = None,
+        cache_path: Optional[Path] = None
+    ):
         """
         Initialize embedding generator.
 
         Args:
             api_key: Voyage AI API key. If None, uses config.
+            backend: "voyage" or "local". If None, uses config.
+            stats_path: Document frequency file of the local backend
+            cache_path: Embedding cache file. If None, uses config.
         """
+        self.backend = backend or RAGConfig.EMBEDDING_BACKEND
+        if self.backend not in ('voyage', 'local'):
+            raise ValueError(f"Unknown embedding backend: {self.backend}")
+
         self.api_key = api_key or RAGConfig.VOYAGE_API_KEY
-        if self.api_key:
+        self.local = LocalEmbedder(RAGConfig.LOCAL_EMBED_DIM, stats_path)
+        self.cache: Optional[EmbeddingCache] = None
+        if self.backend == 'voyage' and self.api_key:
+            # Imported on demand: the SDK is slow to import
+            import voyageai
+
             self.client = voyageai.Client(api_key=self.api_key)
+            if RAGConfig.EMBED_CACHE_MAX_MB > 0:
+                self.cache = EmbeddingCache(
+                    cache_path or RAGConfig.EMBED_CACHE_PATH,
+                    RAGConfig.EMBED_CACHE_MAX_MB * 1024 * 1024
+                )
         else:
             self.client = None
-            print("Warning: No Voyage API key provided. Using fallback embeddings.")
+            if self.backend == 'voyage':
+                print("Warning: No Voyage API key provided. Using local embeddings.")
 
     def generate(self, texts: List[str], model: str = "voyage-2") -> List[List[float]]:
         """
-        Generate embeddings for a list of texts.
+        Generate embeddings for a list of documents.
+
+        API errors are raised: local embeddings would not be comparable
+        with the Voyage AI vectors stored in the collection.
 
         Args:
             texts: List of text strings to embed
@@ -33,20 +70,32 @@ class EmbeddingGenerator:
         Returns:
             List of embedding vectors
         """
-        if self.client:
-            try:
-                result = self.client.embed(
-                    texts=texts,
-                    model=model,
-                    input_type="document"
-                )
-                return result.embeddings
-            except Exception as e:
-                print(f"Error generating embeddings: {e}")
-                return self._fallback_embeddings(texts)
-        else:
+        return self.embed_batch(texts, model)
+
+    def embed_batch(
+        self,
+        texts: List[str],
+        model: str = "voyage-2",
+        input_type: str = "document"
+    ) -> List[List[float]]:
+        """
+        Embed one batch, raising on API errors.
+
+        Args:
+            texts: Texts in the batch
+            model: Voyage AI model name
+            input_type: "document" or "query"
+
+        Returns:
+            List of embedding vectors
+        """
+        if not self.client:
+            if input_type == "query":
+                return [self.local.embed_query(text) for text in texts]
             return self._fallback_embeddings(texts)
 
+        return self._embed_remote(texts, model, input_type)
+
     def generate_query_embedding(
         self,
         query: str,
@@ -55,6 +104,9 @@ class EmbeddingGenerator:
         """
         Generate embedding for a search query.
 
+        API errors are raised: a local embedding would not be comparable
+        with the Voyage AI vectors stored in the collection.
+
         Args:
             query: Query text
             model: Voyage AI model name
@@ -62,39 +114,54 @@ class EmbeddingGenerator:
         Returns:
             Embedding vector
         """
-        if self.client:
-            try:
-                result = self.client.embed(
-                    texts=[query],
-                    model=model,
-                    input_type="query"
-                )
-                return result.embeddings[0]
-            except Exception as e:
-                print(f"Error generating query embedding: {e}")
-                return self._fallback_embeddings([query])[0]
-        else:
-            return self._fallback_embeddings([query])[0]
+        if not self.client:
+            return self.local.embed_query(query)
+
+        return self._embed_remote([query], model, "query")[0]
+
+    def cache_stats(self) -> Optional[Dict]:
+        """
+        Get embedding cache statistics.
 
-    @staticmethod
-    def _fallback_embeddings(texts: List[str]) -> List[List[float]]:
+        Returns:
+            Cache statistics, or None when no cache is used
+        """
+        return self.cache.stats() if self.cache else None
+
+    def _embed_remote(self, texts: List[str], model: str, input_type: str) -> List[List[float]]:
         """
-        Fallback simple embeddings when API is unavailable.
+        Embed texts with Voyage AI, sending only cache misses.
 
         Args:
-            texts: List of texts
+            texts: Texts to embed
+            model: Voyage AI model name
+            input_type: "document" or "query"
 
         Returns:
-            Simple hash-based embeddings
+            List of embedding vectors
         """
-        # Simple hash-based fallback (not for production!)
-        embeddings = []
-        for text in texts:
-            # Create a simple 384-dimensional embedding based on text hash
-            hash_val = hash(text)
-            embedding = [
-                float((hash_val + i) % 1000) / 1000.0
-                for i in range(384)
-            ]
-            embeddings.append(embedding)
+        if self.cache is None:
+            return self.client.embed(texts=texts, model=model, input_type=input_type).embeddings
+
+        embeddings = self.cache.get_many(model, input_type, texts)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            result = self.client.embed(texts=unique, model=model, input_type=input_type).embeddings
+            self.cache.put_many(model, input_type, unique, result)
+            by_text = dict(zip(unique, result))
+            for i in missing:
+                embeddings[i] = by_text[texts[i]]
         return embeddings
+
+    def _fallback_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Local embeddings when the API is unavailable.
+
+        Args:
+            texts: List of texts
+
+        Returns:
+            Hashing TF-IDF document embeddings
+        """
+        return self.local.embed_documents(texts)
@@ -0,0 +1,201 @@
+"""File-level aggregate vectors for fast related-file lookups."""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from pathlib import Path
+import os
+import threading
+import numpy as np
+
+from .vector_utils import normalize
+
+
+POOLING_MODES = ('mean', 'max', 'hybrid')
+
+
+class FileVectorIndex:
+    """
+    One mean-pooled and one max-pooled vector per indexed file.
+
+    The mean of a file's normalized chunk vectors (its centroid) scores
+    what the file is about as a whole; the element-wise max keeps strong
+    signals of individual chunks. A lookup is one (files x dim) matrix
+    product instead of a scan over all chunks, and every file appears at
+    most once, so ``limit`` files are returned even when one file has
+    many matching chunks.
+
+    The indexer updates only the files it touched and saves the index
+    atomically to an ``.npz`` file; readers reload it when it changes.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize file vector index.
+
+        Args:
+            path: Index file (.npz)
+        """
+        self.path = Path(path)
+        self.sources: List[str] = []
+        self.mean = np.zeros((0, 0), dtype=np.float32)
+        self.max = np.zeros((0, 0), dtype=np.float32)
+        self.chunk_counts = np.zeros(0, dtype=np.int64)
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        """Number of indexed files."""
+        self._load()
+        return len(self.sources)
+
+    def update(self, file_embeddings: Dict[str, Optional[Sequence[Sequence[float]]]], save: bool = True) -> None:
+        """
+        Replace the vectors of the given files.
+
+        Args:
+            file_embeddings: Source -> embeddings of all its chunks
+                (None or empty to remove the file)
+            save: Write the index file (pass False for all but the last
+                of several updates, then call ``save``)
+        """
+        if not file_embeddings:
+            return
+        pooled = {}
+        for source, embeddings in file_embeddings.items():
+            if embeddings is not None and len(embeddings):
+                vectors = normalize(np.asarray(embeddings, dtype=np.float32))
+                pooled[source] = (vectors.mean(axis=0), vectors.max(axis=0), len(vectors))
+
+        with self._lock:
+            self._load()
+            kept = [i for i, source in enumerate(self.sources) if source not in file_embeddings]
+            if pooled and kept and self.mean.shape[1] != len(next(iter(pooled.values()))[0]):
+                # Embedding dimension changed: drop the old vectors
+                kept = []
+
+            means, maxes = [self.mean[kept]], [self.max[kept]]
+            if pooled:
+                means.append(normalize(np.array([mean for mean, _, _ in pooled.values()], dtype=np.float32)))
+                maxes.append(normalize(np.array([maxed for _, maxed, _ in pooled.values()], dtype=np.float32)))
+            self._set(
+                [self.sources[i] for i in kept] + list(pooled),
+                _stack(means),
+                _stack(maxes),
+                np.concatenate([self.chunk_counts[kept], [count for _, _, count in pooled.values()]]).astype(np.int64)
+            )
+            if save:
+                self._save()
+
+    def rename(self, moves: Iterable[Tuple[str, str]]) -> None:
+        """
+        Move vectors of renamed files to their new source.
+
+        Args:
+            moves: (old source, new source) pairs
+        """
+        with self._lock:
+            self._load()
+            sources = list(self.sources)
+            positions = {source: i for i, source in enumerate(sources)}
+            changed = False
+            for old_source, new_source in moves:
+                if old_source in positions and new_source not in positions:
+                    index = positions.pop(old_source)
+                    sources[index] = new_source
+                    positions[new_source] = index
+                    changed = True
+            if changed:
+                self._set(sources, self.mean, self.max, self.chunk_counts)
+                self._save()
+
+    def search(
+        self,
+        query: Sequence[float],
+        limit: int,
+        pooling: str = 'hybrid'
+    ) -> List[Tuple[str, float]]:
+        """
+        Find files closest to a query vector.
+
+        Args:
+            query: Query embedding
+            limit: Maximum number of files
+            pooling: "mean", "max" or "hybrid" (average of both scores)
+
+        Returns:
+            List of (source, cosine similarity), best first
+        """
+        if pooling not in POOLING_MODES:
+            raise ValueError(f"Unknown pooling: {pooling} (expected one of {', '.join(POOLING_MODES)})")
+        self._load()
+        # Local references: a concurrent reload replaces, never mutates
+        sources, mean, maxed = self.sources, self.mean, self.max
+        if not sources or limit <= 0:
+            return []
+
+        query = normalize(np.asarray(query, dtype=np.float32)[None, :])[0]
+        if pooling == 'mean':
+            scores = mean @ query
+        elif pooling == 'max':
+            scores = maxed @ query
+        else:
+            scores = (mean @ query + maxed @ query) / 2
+
+        if len(scores) > limit:
+            best = np.argpartition(scores, -limit)[-limit:]
+        else:
+            best = np.arange(len(scores))
+        order = best[np.argsort(-scores[best], kind='stable')]
+        return [(sources[i], float(scores[i])) for i in order]
+
+    def save(self) -> None:
+        """Write the index file."""
+        with self._lock:
+            self._save()
+
+    def clear(self) -> None:
+        """Remove all files and the index file."""
+        with self._lock:
+            self._set([], np.zeros((0, 0), dtype=np.float32), np.zeros((0, 0), dtype=np.float32), np.zeros(0, dtype=np.int64))
+            if self.path.exists():
+                self.path.unlink()
+            self._mtime = None
+
+    def _set(self, sources: List[str], mean: np.ndarray, maxed: np.ndarray, counts: np.ndarray) -> None:
+        """Replace the in-memory index."""
+        self.sources, self.mean, self.max, self.chunk_counts = sources, mean, maxed, counts
+
+    def _load(self) -> None:
+        """Reload the index if the file changed."""
+        if not self.path.exists():
+            return
+        try:
+            mtime = self.path.stat().st_mtime_ns
+            if mtime == self._mtime:
+                return
+            with np.load(self.path) as data:
+                self._set(data['sources'].tolist(), data['mean'], data['max'], data['chunk_counts'])
+            self._mtime = mtime
+        except Exception as e:
+            print(f"Warning: Could not load file index: {e}")
+
+    def _save(self) -> None:
+        """Atomically write the index."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            np.savez(
+                f,
+                sources=np.array(self.sources, dtype=str),
+                mean=self.mean,
+                max=self.max,
+                chunk_counts=self.chunk_counts
+            )
+        os.replace(tmp_file, self.path)
+        self._mtime = self.path.stat().st_mtime_ns
+
+
+def _stack(blocks: List[np.ndarray]) -> np.ndarray:
+    """Concatenate row blocks, skipping empty ones."""
+    blocks = [block for block in blocks if block.size]
+    return np.concatenate(blocks).astype(np.float32) if blocks else np.zeros((0, 0), dtype=np.float32)
@@ -1,30 +1,57 @@
 """Document indexing with vector database."""
 
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Sequence, Set, Tuple
+from contextlib import contextmanager
 from pathlib import Path
-
-# Try to import ChromaDB, fallback to simple implementation
-try:
-    import chromadb
-    from chromadb.config import Settings
-    USE_CHROMADB = True
-except Exception as e:
-    print(f"ChromaDB not available ({e}), using simple fallback vector DB")
-    from .simple_vectordb import PersistentClient
-    USE_CHROMADB = False
+import hashlib
+import json
+import os
+import queue
+import threading
 
 from .config import RAGConfig
 from .embeddings import EmbeddingGenerator
+from .embedding_pipeline import EmbeddingPipeline
 from .chunker import DocumentChunker
+from .query_cache import IndexVersion
+from .file_index import FileVectorIndex
+from .vectordb import get_client
+
+
+# Files whose stored embeddings are fetched at once to refresh the file index
+FILE_INDEX_BATCH_SIZE = 1024
 
 
 class DocumentIndexer:
-    """Index documents into vector database."""
+    """
+    Index documents into vector database.
+
+    Indexing is incremental. Chunk IDs are derived from the source path,
+    chunk index and chunk content, and a per-file manifest
+    (``<collection>.files.json`` in the persist directory) records the
+    content hash, mtime, size and chunk IDs of every indexed file. A
+    re-run embeds only chunks of added or changed files that are not
+    already stored, and removes chunks of changed and deleted files that
+    are no longer produced.
+
+    Every write bumps the collection's ``IndexVersion``, which
+    invalidates cached query results in any process. After each sync the
+    pooled vectors of touched files are refreshed in the
+    ``FileVectorIndex`` used for related-file lookups.
+
+    The manifest also records the git commit the index was built from, so
+    ``index_changes`` can limit a re-index to the files git reports as
+    changed since then; renamed files are re-keyed without re-embedding.
+    Files that were uncommitted when the commit was recorded are listed
+    too and re-checked by the next ``index_changes``, since reverting them
+    to the committed version does not show up in the diff.
+    """
 
     def __init__(
         self,
         collection_name: str = RAGConfig.COLLECTION_NAME,
-        persist_directory: Path = RAGConfig.CHROMA_PERSIST_DIR
+        persist_directory: Path = RAGConfig.CHROMA_PERSIST_DIR,
+        concurrency: int = RAGConfig.EMBED_CONCURRENCY
     ):
         """
         Initialize document indexer.
@@ -32,74 +59,203 @@ class DocumentIndexer:
         Args:
             collection_name: Name of the collection
             persist_directory: Directory to persist data
+            concurrency: Number of embedding batches in flight
         """
         self.collection_name = collection_name
         self.persist_directory = persist_directory
+        self.files_manifest_path = Path(persist_directory) / f"{collection_name}.files.json"
+        self.version = IndexVersion(RAGConfig.index_version_path(persist_directory, collection_name))
+        self.file_index = FileVectorIndex(RAGConfig.file_index_path(persist_directory, collection_name))
 
         # Initialize vector DB (ChromaDB or fallback)
-        if USE_CHROMADB:
-            self.client = chromadb.PersistentClient(
-                path=str(persist_directory),
-                settings=Settings(anonymized_telemetry=False)
-            )
-        else:
-            self.client = PersistentClient(
-                path=str(persist_directory)
-            )
+        self.client = get_client(persist_directory)
 
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"description": "Project documentation and code"}
+            metadata=RAGConfig.collection_metadata()
         )
 
         # Initialize components
-        self.embedder = EmbeddingGenerator()
+        self.embedder = EmbeddingGenerator(
+            stats_path=RAGConfig.local_embedding_stats_path(persist_directory, collection_name)
+        )
+        self.pipeline = EmbeddingPipeline(self.embedder, concurrency=concurrency)
         self.chunker = DocumentChunker()
 
+        # Statistics of the last embedding run and the last file sync
+        self.last_run_stats: Optional[Dict] = None
+        self.last_sync_stats: Optional[Dict] = None
+
     def index_directory(
         self,
         directory: Path,
-        extensions: Optional[List[str]] = None
+        extensions: Optional[List[str]] = None,
+        progress: Optional[Callable[[Dict], None]] = None
     ) -> int:
         """
-        Index all documents in a directory.
+        Index all documents in a directory incrementally.
+
+        Files under ``directory`` that are in the manifest but no longer
+        on disk have their chunks removed.
 
         Args:
             directory: Directory to index
             extensions: File extensions to include
+            progress: Optional callback receiving per-batch metrics
 
         Returns:
-            Number of chunks indexed
+            Number of chunks embedded
         """
         print(f"Indexing directory: {directory}")
+        files = self.chunker.list_files(directory, extensions)
+        return self._sync_files(files, directory, progress)
 
-        # Chunk all files
-        chunks = self.chunker.chunk_directory(directory, extensions)
-        print(f"Created {len(chunks)} chunks")
+    def index_changes(
+        self,
+        directory: Path,
+        changes: Dict,
+        extensions: Optional[List[str]] = None,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> int:
+        """
+        Re-index only files changed in git since the indexed commit.
 
-        if not chunks:
-            print("No chunks to index")
-            return 0
+        Besides the diff, files that were uncommitted at the last run are
+        re-checked, and manifest entries under ``directory`` whose files
+        no longer exist are removed. Untracked and re-checked files go
+        through the usual mtime/size check, so unchanged ones are not read.
 
-        # Generate embeddings
-        texts = [chunk['text'] for chunk in chunks]
-        embeddings = self.embedder.generate(texts)
+        Args:
+            directory: Indexed directory
+            changes: Changes from ``GitTools.get_changed_files``
+            extensions: File extensions to include
+            progress: Optional callback receiving per-batch metrics
 
-        # Prepare data for vector DB
-        ids = [f"chunk_{i}" for i in range(len(chunks))]
-        metadatas = [chunk['metadata'] for chunk in chunks]
+        Returns:
+            Number of chunks embedded
+        """
+        local = self._local_paths(directory, changes, extensions)
+
+        files, deleted, renamed = [], [], []
+        for path in changes['added'] + changes['modified']:
+            if local(path) is not None:
+                files.append(local(path))
+        for path in changes['deleted']:
+            if local(path) is not None:
+                deleted.append(local(path))
+        untracked = [local(path) for path in changes.get('untracked', []) if local(path) is not None]
+        for old_path, new_path in changes['renamed']:
+            old_file, new_file = local(old_path), local(new_path)
+            if old_file is not None and new_file is not None:
+                renamed.append((old_file, new_file))
+            elif old_file is not None:
+                deleted.append(old_file)
+            if new_file is not None:
+                # Picks up edits made together with the rename
+                files.append(new_file)
+
+        files_manifest = self._load_files_manifest()
+        recheck = [Path(source) for source in files_manifest['uncommitted']]
+        # Indexed files removed without git noticing (e.g. untracked ones)
+        deleted.extend(
+            Path(source) for source in files_manifest['files']
+            if Path(source).is_relative_to(directory) and not Path(source).exists()
+        )
+        # Each file once; rename sources are re-keyed, not deleted
+        moved = {old_file for old_file, _ in renamed}
+        deleted = [path for path in dict.fromkeys(deleted) if path not in moved]
 
-        # Add to collection
-        self.collection.add(
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids
+        print(
+            f"Indexing git changes in {directory}: {len(files)} changed, "
+            f"{len(deleted)} deleted, {len(renamed)} renamed, "
+            f"{len(untracked) + len(recheck)} untracked or uncommitted to check"
         )
+        return self._sync_files(
+            [path for path in dict.fromkeys(files + untracked + recheck) if path.is_file()], None, progress,
+            deleted=deleted, renamed=renamed
+        )
+
+    def uncommitted_files(
+        self,
+        directory: Path,
+        changes: Dict,
+        extensions: Optional[List[str]] = None
+    ) -> List[Path]:
+        """
+        Indexable files under ``directory`` that differ from a commit.
+
+        Args:
+            directory: Indexed directory
+            changes: Changes from ``GitTools.get_changed_files`` against
+                the commit about to be recorded
+            extensions: File extensions to include
+
+        Returns:
+            Paths as produced by ``list_files(directory)``
+        """
+        local = self._local_paths(directory, changes, extensions)
+        paths = changes['added'] + changes['modified'] + changes['deleted'] + changes.get('untracked', [])
+        paths += [path for pair in changes['renamed'] for path in pair]
+        return [local(path) for path in dict.fromkeys(paths) if local(path) is not None]
+
+    def _local_paths(
+        self,
+        directory: Path,
+        changes: Dict,
+        extensions: Optional[List[str]]
+    ) -> Callable[[str], Optional[Path]]:
+        """Map repository paths to paths under ``directory`` (None if out of scope)."""
+        extensions = extensions if extensions is not None else self.chunker.DEFAULT_EXTENSIONS
+        root = Path(changes['root']).resolve()
+        scope = Path(directory).resolve()
+
+        def local(path: str) -> Optional[Path]:
+            # Repository path -> path as produced by list_files(directory)
+            try:
+                relative = (root / path).relative_to(scope)
+            except ValueError:
+                return None
+            return Path(directory) / relative if relative.suffix in extensions else None
+
+        return local
 
-        print(f"Indexed {len(chunks)} chunks successfully")
-        return len(chunks)
+    @property
+    def indexed_commit(self) -> Optional[str]:
+        """Git commit recorded by the last successful index run."""
+        return self._load_files_manifest().get('commit')
+
+    def record_commit(self, commit: Optional[str], uncommitted: Sequence[Path] = ()) -> None:
+        """
+        Record the git commit the index now reflects.
+
+        Args:
+            commit: Commit hash
+            uncommitted: Indexed paths whose working tree content differs
+                from the commit (see ``uncommitted_files``); re-checked by
+                the next ``index_changes``
+        """
+        manifest = self._load_files_manifest()
+        manifest['commit'] = commit
+        manifest['uncommitted'] = sorted(str(path) for path in uncommitted)
+        self._save_files_manifest(manifest)
+
+    def index_file(
+        self,
+        file_path: Path,
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> int:
+        """
+        Index a single file incrementally.
+
+        Args:
+            file_path: File to index
+            progress: Optional callback receiving per-batch metrics
+
+        Returns:
+            Number of chunks embedded
+        """
+        return self._sync_files([file_path], None, progress)
 
     def index_text(
         self,
@@ -110,6 +266,8 @@ class DocumentIndexer:
         """
         Index a single text document.
 
+        Re-indexing the same text with the same ID replaces its chunks.
+
         Args:
             text: Text to index
             metadata: Optional metadata
@@ -124,32 +282,389 @@ class DocumentIndexer:
         if not chunks:
             raise ValueError("No chunks created from text")
 
-        # Generate embeddings
-        texts = [chunk['text'] for chunk in chunks]
-        embeddings = self.embedder.generate(texts)
-
         # Generate IDs
-        base_id = doc_id or f"doc_{hash(text)}"
+        texts = [chunk['text'] for chunk in chunks]
+        base_id = doc_id or f"doc_{_sha256(text.encode('utf-8'))[:16]}"
         ids = [f"{base_id}_chunk_{i}" for i in range(len(chunks))]
         metadatas = [chunk['metadata'] for chunk in chunks]
 
-        # Add to collection
-        self.collection.add(
-            embeddings=embeddings,
-            documents=texts,
-            metadatas=metadatas,
-            ids=ids
-        )
+        self._delete(ids=ids)
+        self._embed_and_store(texts, metadatas, ids)
 
         return base_id
 
+    def _sync_files(
+        self,
+        files: List[Path],
+        scope: Optional[Path],
+        progress: Optional[Callable[[Dict], None]] = None,
+        deleted: Sequence[Path] = (),
+        renamed: Sequence[Tuple[Path, Path]] = ()
+    ) -> int:
+        """
+        Bring the collection in line with the given files.
+
+        Unchanged files (same mtime and size, or same content hash) are
+        skipped without chunking. For added and changed files only chunks
+        whose IDs are not stored yet are embedded. Chunks are streamed
+        from the chunker into the embedding pipeline, so embedding starts
+        with the first batch and memory does not grow with the tree.
+
+        Every stored chunk ID is listed either under its file in the
+        manifest or in its ``orphans`` (deleted after embedding); a file
+        whose chunks are not all stored yet has no content hash, so an
+        interrupted run is completed by the next one. The collection is
+        saved once, before the manifest, rather than after every batch.
+
+        Args:
+            files: Files to index
+            scope: Directory whose manifest entries missing from ``files``
+                are treated as deleted (None to skip deletion)
+            progress: Optional callback receiving per-batch metrics
+            deleted: Files known to be deleted
+            renamed: Known (old, new) renames, re-keyed before syncing
+
+        Returns:
+            Number of chunks embedded
+        """
+        files_manifest = self._load_files_manifest()
+        manifest = files_manifest['files']
+        # Stored chunk IDs no longer owned by any file, deleted in bulk
+        orphans = files_manifest['orphans']
+        legacy = not self.files_manifest_path.exists() and self.collection.count() > 0
+        stats = {
+            'added': 0,
+            'changed': 0,
+            'unchanged': 0,
+            'deleted': 0,
+            'renamed': 0,
+            'chunks_embedded': 0,
+            'chunks_deleted': 0
+        }
+
+        # Source -> (finished manifest entry, chunks still to be stored)
+        pending: Dict[str, List] = {}
+        # Files whose chunks changed
+        touched = set()
+
+        def chunks_to_embed():
+            # Chunking runs ahead in a background thread (and a process
+            # pool for large trees) through a bounded queue
+            results = _prefetch(
+                self.chunker.iter_file_chunks([Path(source) for source in candidates], known_hashes),
+                RAGConfig.INDEX_QUEUE_SIZE
+            )
+            for result in results:
+                source = str(result['path'])
+                stat = candidates[source]
+                entry = manifest.get(source)
+                if result['error']:
+                    print(f"Error reading file {source}: {result['error']}")
+                    continue
+                if result['chunks'] is None:
+                    # Touched but same content
+                    entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                    stats['unchanged'] += 1
+                    continue
+
+                stats['changed' if entry else 'added'] += 1
+                touched.add(source)
+                chunks = result['chunks']
+                new_ids = [self._chunk_id(source, chunk) for chunk in chunks]
+                stored = set(entry['ids']) if entry else set()
+                new_id_set = set(new_ids)
+                orphans.extend(chunk_id for chunk_id in stored if chunk_id not in new_id_set)
+
+                finished = {'sha256': result['sha256'], 'mtime': stat.st_mtime, 'size': stat.st_size, 'ids': new_ids}
+                missing = [(chunk, chunk_id) for chunk, chunk_id in zip(chunks, new_ids) if chunk_id not in stored]
+                if not missing:
+                    manifest[source] = finished
+                    continue
+
+                manifest[source] = {
+                    'sha256': None,
+                    'mtime': None,
+                    'size': None,
+                    'ids': [chunk_id for chunk_id in new_ids if chunk_id in stored]
+                }
+                pending[source] = [finished, len(missing)]
+                for chunk, chunk_id in missing:
+                    metadata = {**chunk['metadata'], 'chunk_index': chunk['chunk_index']}
+                    yield chunk['text'], (source, chunk_id, metadata)
+
+        def store(batch: Dict) -> None:
+            payloads = batch['payloads']
+            self._add(
+                embeddings=batch['embeddings'],
+                documents=batch['texts'],
+                metadatas=[metadata for _, _, metadata in payloads],
+                ids=[chunk_id for _, chunk_id, _ in payloads]
+            )
+            for source, chunk_id, _ in payloads:
+                manifest[source]['ids'].append(chunk_id)
+                pending[source][1] -= 1
+                if pending[source][1] == 0:
+                    manifest[source] = pending.pop(source)[0]
+            if progress:
+                progress(batch)
+
+        def delete_orphans() -> None:
+            if orphans:
+                self._delete(ids=list(orphans))
+                stats['chunks_deleted'] += len(orphans)
+                orphans.clear()
+
+        try:
+            with self._batch_writes():
+                if renamed:
+                    stats['renamed'] = self._rekey_files(manifest, renamed)
+
+                # Files with the recorded mtime and size are not even read
+                candidates: Dict[str, os.stat_result] = {}
+                known_hashes = {}
+                seen = set()
+                for file_path in files:
+                    source = str(file_path)
+                    seen.add(source)
+                    entry = manifest.get(source)
+                    try:
+                        stat = file_path.stat()
+                    except OSError as e:
+                        print(f"Error reading file {file_path}: {e}")
+                        continue
+                    if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                        stats['unchanged'] += 1
+                        continue
+                    candidates[source] = stat
+                    if entry and entry['sha256']:
+                        known_hashes[source] = entry['sha256']
+
+                gone = [str(path) for path in deleted if str(path) in manifest]
+                if scope is not None:
+                    gone.extend(
+                        source for source in manifest
+                        if source not in seen and Path(source).is_relative_to(scope)
+                    )
+                for source in gone:
+                    orphans.extend(manifest.pop(source)['ids'])
+                    stats['deleted'] += 1
+
+                if legacy and seen:
+                    # Index built before the manifest existed: IDs are unknown
+                    print("Replacing chunks indexed without a file manifest")
+                    self._delete(where={'source': {'$in': sorted(seen)}})
+                delete_orphans()
+
+                stream = chunks_to_embed()
+                try:
+                    self.last_run_stats = self.pipeline.run_stream(stream, on_batch=store)
+                finally:
+                    stream.close()
+                stats['chunks_embedded'] = self.last_run_stats['texts']
+
+                # Chunks replaced in changed files
+                delete_orphans()
+        finally:
+            self._save_files_manifest(files_manifest)
+            self.last_sync_stats = stats
+
+        self._update_file_index(manifest, touched)
+        return stats['chunks_embedded']
+
+    def _rekey_files(self, manifest: Dict[str, Dict], renamed: Sequence[Tuple[Path, Path]]) -> int:
+        """
+        Move stored chunks of renamed files to IDs under their new path.
+
+        Embeddings are copied from the collection, so nothing is
+        re-embedded. Renames whose old path is not indexed, or whose new
+        path already is, are left to the regular sync.
+
+        Returns:
+            Number of files re-keyed
+        """
+        moves = [
+            (str(old_path), str(new_path)) for old_path, new_path in renamed
+            if str(old_path) in manifest and str(new_path) not in manifest
+        ]
+        if not moves:
+            return 0
+        old_ids = [chunk_id for old_source, _ in moves for chunk_id in manifest[old_source]['ids']]
+
+        stored = {}
+        if old_ids:
+            rows = self.collection.get(ids=old_ids, include=['embeddings', 'documents', 'metadatas'])
+            stored = {
+                chunk_id: (embedding, document, metadata)
+                for chunk_id, embedding, document, metadata in zip(
+                    rows['ids'], rows['embeddings'], rows['documents'], rows['metadatas']
+                )
+            }
+
+        embeddings, documents, metadatas, ids = [], [], [], []
+        for old_source, new_source in moves:
+            entry = manifest.pop(old_source)
+            file_metadata = self.chunker.file_metadata(Path(new_source))
+            new_ids = []
+            for chunk_id in entry['ids']:
+                if chunk_id not in stored:
+                    continue
+                embedding, document, metadata = stored[chunk_id]
+                new_ids.append(new_source + chunk_id[len(old_source):])
+                embeddings.append(embedding)
+                documents.append(document)
+                metadatas.append({**metadata, **file_metadata})
+            ids.extend(new_ids)
+            if len(new_ids) != len(entry['ids']):
+                # Some chunks were missing: let the sync re-embed them
+                entry = {**entry, 'sha256': None}
+            manifest[new_source] = {**entry, 'ids': new_ids}
+
+        if ids:
+            self._add(embeddings=embeddings, documents=documents, metadatas=metadatas, ids=ids)
+        if old_ids:
+            self._delete(forget=False, ids=old_ids)
+        self.file_index.rename(moves)
+        return len(moves)
+
+    def _update_file_index(self, manifest: Dict[str, Dict], touched: Set[str]) -> None:
+        """
+        Refresh pooled vectors of touched files from stored embeddings.
+
+        Files missing from the file index (e.g. after an interrupted run
+        or on an index built before it existed) are added, and files no
+        longer in the manifest are removed.
+
+        Args:
+            manifest: Source -> manifest entry
+            touched: Sources whose chunks changed
+        """
+        indexed = set(self.file_index.sources)
+        removed = {source: None for source in indexed if source not in manifest}
+        refresh = sorted(source for source in manifest if source in touched or source not in indexed)
+        if not removed and not refresh:
+            return
+
+        self.file_index.update(removed, save=False)
+        for start in range(0, len(refresh), FILE_INDEX_BATCH_SIZE):
+            batch = refresh[start:start + FILE_INDEX_BATCH_SIZE]
+            ids = [chunk_id for source in batch for chunk_id in manifest[source]['ids']]
+            rows = self.collection.get(ids=ids, include=['embeddings']) if ids else {'ids': [], 'embeddings': []}
+            stored = dict(zip(rows['ids'], rows['embeddings']))
+            self.file_index.update(
+                {source: [stored[chunk_id] for chunk_id in manifest[source]['ids'] if chunk_id in stored] for source in batch},
+                save=False
+            )
+        self.file_index.save()
+
+    @staticmethod
+    def _chunk_id(source: str, chunk: Dict) -> str:
+        """Stable chunk ID from source path, chunk index and content hash."""
+        return f"{source}#{chunk['chunk_index']}:{_sha256(chunk['text'].encode('utf-8'))[:16]}"
+
+    def _load_files_manifest(self) -> Dict:
+        """Load the per-file manifest (``files``: source -> entry, ``orphans``, ``commit`` and ``uncommitted``)."""
+        manifest = {'commit': None, 'uncommitted': [], 'files': {}, 'orphans': []}
+        if self.files_manifest_path.exists():
+            try:
+                with open(self.files_manifest_path, 'r') as f:
+                    manifest.update(json.load(f))
+            except Exception as e:
+                print(f"Warning: Could not read file manifest: {e}")
+        return manifest
+
+    def _save_files_manifest(self, manifest: Dict) -> None:
+        """Atomically write the per-file manifest."""
+        self.files_manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.files_manifest_path.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_file, self.files_manifest_path)
+
+    def _embed_and_store(
+        self,
+        texts: List[str],
+        metadatas: List[Dict],
+        ids: List[str],
+        progress: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Embed texts through the pipeline and add each batch to the collection.
+
+        Args:
+            texts: Chunk texts
+            metadatas: Chunk metadata
+            ids: Chunk IDs
+            progress: Optional callback receiving per-batch metrics
+
+        Returns:
+            Pipeline run statistics
+        """
+        def store(batch: Dict) -> None:
+            start, end = batch['start'], batch['end']
+            self._add(
+                embeddings=batch['embeddings'],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
+            if progress:
+                progress(batch)
+
+        with self._batch_writes():
+            self.last_run_stats = self.pipeline.run(texts, on_batch=store)
+        return self.last_run_stats
+
+    @contextmanager
+    def _batch_writes(self):
+        """
+        Save the collection once for all writes made inside the block.
+
+        Uses ``SimpleVectorDB.batch_writes``; ChromaDB persists on its own.
+        The index version is bumped again once the data is on disk, so
+        other processes reload the saved collection.
+        """
+        batch_writes = getattr(self.collection, 'batch_writes', None)
+        if batch_writes is None:
+            yield
+            return
+        try:
+            with batch_writes():
+                yield
+        finally:
+            self.version.bump()
+
+    def _add(self, **kwargs) -> None:
+        """Add rows to the collection and bump the index version."""
+        self.collection.add(**kwargs)
+        self.version.bump()
+
+    def _delete(self, forget: bool = True, **kwargs) -> None:
+        """
+        Delete rows from the collection and bump the index version.
+
+        Args:
+            forget: Also remove the rows from the local document
+                frequencies (False when they are re-added under new IDs)
+            **kwargs: ``ids`` and/or ``where`` of the rows to delete
+        """
+        if forget and self.embedder.client is None:
+            rows = self.collection.get(include=['documents'], **kwargs)
+            self.embedder.local.remove_documents(rows['documents'])
+        self.collection.delete(**kwargs)
+        self.version.bump()
+
     def clear_collection(self) -> None:
         """Clear all documents from the collection."""
         # Delete and recreate collection
         self.client.delete_collection(name=self.collection_name)
+        if self.files_manifest_path.exists():
+            self.files_manifest_path.unlink()
+        self.embedder.local.reset_statistics()
+        self.version.bump()
+        self.file_index.clear()
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
-            metadata={"description": "Project documentation and code"}
+            metadata=RAGConfig.collection_metadata()
         )
         print(f"Cleared collection: {self.collection_name}")
 
@@ -164,5 +679,63 @@ class DocumentIndexer:
         return {
             'collection_name': self.collection_name,
             'document_count': count,
-            'persist_directory': str(self.persist_directory)
+            'persist_directory': str(self.persist_directory),
+            'index_version': self.version.read(),
+            'indexed_files': len(self.file_index),
+            'embedding_cache': self.embedder.cache_stats()
         }
+
+
+def _sha256(data: bytes) -> str:
+    """Hex SHA-256 digest."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _prefetch(items: Iterable, maxsize: int) -> Iterator:
+    """
+    Iterate ``items`` in a background thread through a bounded queue.
+
+    The producer blocks once ``maxsize`` items are waiting, so it runs at
+    most that far ahead of the consumer. Errors are re-raised in the
+    consumer; closing the returned generator stops the producer.
+    """
+    handoff = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    done = object()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    break
+            else:
+                put((done, None))
+        except Exception as e:
+            put((done, e))
+        finally:
+            close = getattr(items, 'close', None)
+            if close:
+                close()
+
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = handoff.get()
+            if item is done:
+                if error:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        producer.join()
@@ -0,0 +1,377 @@
+"""Inverted file (IVF) index for SimpleVectorDB."""
+
+from typing import List, NamedTuple, Optional, Tuple
+import os
+from pathlib import Path
+import numpy as np
+
+from .vector_utils import normalize
+
+
+# Rows assigned to centroids per block while (re)building the index
+ASSIGN_BLOCK_SIZE = 8192
+
+
+class IVFState(NamedTuple):
+    """
+    Immutable view of a trained index.
+
+    Writers never modify a state in place; they publish a new one, so a
+    reader holding a state always sees consistent centroids and cells.
+    """
+
+    centroids: np.ndarray
+    # Per-cell contiguous blocks (views of the lists file, or in-memory
+    # copies for cells grown by ``add``); None until gathered on first search
+    list_vectors: Optional[Tuple[np.ndarray, ...]] = None
+    list_rows: Optional[Tuple[np.ndarray, ...]] = None
+
+    @property
+    def n_lists(self) -> int:
+        """Number of cells."""
+        return len(self.centroids)
+
+    @property
+    def has_lists(self) -> bool:
+        """Whether per-cell blocks have been gathered."""
+        return self.list_vectors is not None
+
+
+class IVFIndex:
+    """
+    Partitioned approximate nearest neighbour index.
+
+    Vectors are clustered with spherical k-means into ``n_lists`` coarse
+    cells. Each cell keeps its (normalized) vectors in one contiguous
+    block, so a query scores only the ``nprobe`` cells closest to it.
+
+    Only the centroids and the per-row cell assignments are persisted;
+    the per-cell blocks are gathered from the collection vectors on the
+    first query, block by block, into a memory-mapped lists file.
+
+    Clustered data can leave cells unbalanced right after training, so
+    an unbalanced index is retrained only once the collection has grown
+    by ``retrain_growth`` since the last training.
+
+    ``train``, ``add``, ``build_lists`` and ``reconcile`` must be called
+    by one writer at a time; ``search`` only reads the ``IVFState`` it is
+    given and is safe to call concurrently.
+    """
+
+    def __init__(
+        self,
+        centroids_file: Path,
+        assignments_file: Path,
+        lists_file: Path,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        sample_size: int = 65536,
+        imbalance_factor: float = 4.0,
+        retrain_growth: float = 0.5,
+        min_train_size: int = 4096,
+        iterations: int = 20,
+        seed: int = 0
+    ):
+        """
+        Initialize IVF index.
+
+        Args:
+            centroids_file: File with trained centroids (.npy)
+            assignments_file: Append-only file with the cell of every row (int32)
+            lists_file: File the per-cell blocks are gathered into (float32)
+            n_lists: Number of cells (defaults to sqrt of the row count at training)
+            nprobe: Default number of cells scored per query
+            sample_size: Rows sampled for k-means training
+            imbalance_factor: Retrain when the largest cell exceeds this
+                multiple of the mean cell size
+            retrain_growth: Fraction the collection must grow by since the
+                last training before an unbalanced index is retrained
+            min_train_size: Rows required before the index is trained
+            iterations: k-means iterations
+            seed: Random seed for sampling and initialization
+        """
+        self.centroids_file = Path(centroids_file)
+        self.assignments_file = Path(assignments_file)
+        self.lists_file = Path(lists_file)
+        self.requested_lists = n_lists
+        self.nprobe = nprobe
+        self.sample_size = sample_size
+        self.imbalance_factor = imbalance_factor
+        self.retrain_growth = retrain_growth
+        self.min_train_size = min_train_size
+        self.iterations = iterations
+        self.seed = seed
+
+        self.state: Optional[IVFState] = None
+        self.sizes = np.zeros(0, dtype=np.int64)
+        # Row count at the last training (or load)
+        self.trained_size = 0
+
+        self._load()
+
+    @property
+    def trained(self) -> bool:
+        """Whether centroids are available."""
+        return self.state is not None
+
+    @property
+    def n_lists(self) -> int:
+        """Number of cells in the trained index."""
+        return 0 if self.state is None else self.state.n_lists
+
+    @property
+    def centroids(self) -> Optional[np.ndarray]:
+        """Trained centroids."""
+        return None if self.state is None else self.state.centroids
+
+    def train(self, vectors: np.ndarray) -> None:
+        """
+        Train centroids on a sample and assign every row.
+
+        Args:
+            vectors: All collection vectors (array or memmap)
+        """
+        count = vectors.shape[0]
+        rng = np.random.default_rng(self.seed)
+
+        sample_rows = np.arange(count)
+        if count > self.sample_size:
+            sample_rows = np.sort(rng.choice(count, self.sample_size, replace=False))
+        sample = normalize(np.asarray(vectors[sample_rows], dtype=np.float32))
+
+        n_lists = self.requested_lists or int(np.sqrt(count))
+        n_lists = max(1, min(n_lists, len(sample)))
+        centroids = _kmeans(sample, n_lists, self.iterations, rng)
+
+        # Reassign all rows against the new centroids
+        tmp_file = self.assignments_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            for start in range(0, count, ASSIGN_BLOCK_SIZE):
+                block = np.asarray(vectors[start:start + ASSIGN_BLOCK_SIZE], dtype=np.float32)
+                f.write(_assign(block, centroids).astype(np.int32).tobytes())
+        os.replace(tmp_file, self.assignments_file)
+        np.save(self.centroids_file, centroids)
+
+        self.state = IVFState(centroids)
+        self.sizes = np.bincount(self._read_assignments(), minlength=n_lists)
+        self.trained_size = count
+
+    def add(self, vectors: np.ndarray, start_row: int) -> None:
+        """
+        Assign new rows to their nearest cells.
+
+        Args:
+            vectors: New vectors
+            start_row: Row index of the first new vector
+        """
+        state = self.state
+        assignments = _assign(vectors, state.centroids)
+        with open(self.assignments_file, 'ab') as f:
+            f.write(assignments.astype(np.int32).tobytes())
+        self.sizes = self.sizes + np.bincount(assignments, minlength=self.n_lists)
+
+        if state.has_lists:
+            # Copy-on-write: only the touched cells get new blocks
+            list_vectors = list(state.list_vectors)
+            list_rows = list(state.list_rows)
+            normalized = normalize(np.asarray(vectors, dtype=np.float32))
+            rows = np.arange(start_row, start_row + len(vectors))
+            for cell in np.unique(assignments):
+                members = assignments == cell
+                list_vectors[cell] = np.concatenate([list_vectors[cell], normalized[members]])
+                list_rows[cell] = np.concatenate([list_rows[cell], rows[members]])
+            self.state = IVFState(state.centroids, tuple(list_vectors), tuple(list_rows))
+
+    def remove_rows(self, keep: np.ndarray, vectors: Optional[np.ndarray]) -> None:
+        """
+        Drop assignments of deleted rows after the collection was compacted.
+
+        Args:
+            keep: Boolean mask over the rows before compaction
+            vectors: Collection vectors after compaction (None if empty)
+        """
+        if vectors is None:
+            # Nothing left to index; train again once rows come back
+            self.delete_files()
+            self.state = None
+            self.sizes = np.zeros(0, dtype=np.int64)
+            self.trained_size = 0
+            return
+
+        assignments = self._read_assignments()[keep]
+        tmp_file = self.assignments_file.with_suffix('.tmp')
+        assignments.astype(np.int32).tofile(tmp_file)
+        os.replace(tmp_file, self.assignments_file)
+        self.sizes = np.bincount(assignments, minlength=self.n_lists)
+
+        if self.state.has_lists:
+            # Row numbers shifted: regather cells before publishing
+            self.build_lists(vectors)
+
+    def needs_retrain(self) -> bool:
+        """
+        Check whether the index should be retrained.
+
+        Cells that are unbalanced right after training stay unbalanced,
+        so imbalance alone only triggers a retrain after the collection
+        has grown by ``retrain_growth`` since the last one.
+        """
+        if not self.trained:
+            return False
+        total = int(self.sizes.sum())
+        if self.requested_lists is None and int(np.sqrt(total)) > 2 * self.n_lists:
+            # Collection outgrew an automatically sized index
+            return True
+        if total < self.trained_size * (1.0 + self.retrain_growth):
+            return False
+        mean = total / self.n_lists
+        return self.n_lists > 1 and self.sizes.max() > self.imbalance_factor * max(mean, 1.0)
+
+    def build_lists(self, vectors: np.ndarray) -> None:
+        """
+        Gather per-cell contiguous blocks from collection vectors.
+
+        Rows are written in cell order to a new lists file, one block at
+        a time, and swapped in with ``os.replace``; cells are views of
+        its memory map, so states held by readers keep the old file.
+
+        Args:
+            vectors: All collection vectors
+        """
+        assignments = self._read_assignments()
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+
+        tmp_file = self.lists_file.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            for start in range(0, len(order), ASSIGN_BLOCK_SIZE):
+                rows = order[start:start + ASSIGN_BLOCK_SIZE]
+                # Read rows in file order, then put them back in cell order
+                sorted_rows = np.sort(rows)
+                block = np.asarray(vectors[sorted_rows], dtype=np.float32)
+                f.write(normalize(block[np.searchsorted(sorted_rows, rows)]).tobytes())
+        os.replace(tmp_file, self.lists_file)
+        gathered = np.memmap(self.lists_file, dtype=np.float32, mode='r', shape=(len(order), vectors.shape[1]))
+
+        list_vectors = []
+        list_rows = []
+        for cell in range(self.n_lists):
+            list_rows.append(order[bounds[cell]:bounds[cell + 1]])
+            list_vectors.append(gathered[bounds[cell]:bounds[cell + 1]])
+        self.state = IVFState(self.state.centroids, tuple(list_vectors), tuple(list_rows))
+
+    def search(
+        self,
+        state: IVFState,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Search the closest cells.
+
+        Args:
+            state: Index state with gathered cell blocks
+            query: Query vector
+            k: Number of results
+            nprobe: Number of cells to score (overrides default)
+
+        Returns:
+            List of (row index, cosine similarity), best first
+        """
+        query = normalize(np.asarray(query, dtype=np.float32)[None, :])[0]
+        nprobe = min(nprobe or self.nprobe, state.n_lists)
+
+        centroid_scores = state.centroids @ query
+        probe = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+
+        scores = np.concatenate([state.list_vectors[cell] @ query for cell in probe])
+        rows = np.concatenate([state.list_rows[cell] for cell in probe])
+        if len(scores) > k:
+            best = np.argpartition(scores, -k)[-k:]
+            scores, rows = scores[best], rows[best]
+
+        order = np.argsort(-scores, kind='stable')
+        return [(int(rows[i]), float(scores[i])) for i in order]
+
+    def _read_assignments(self) -> np.ndarray:
+        """Read per-row cell assignments."""
+        return np.fromfile(self.assignments_file, dtype=np.int32).astype(np.int64)
+
+    def _load(self) -> None:
+        """Load trained centroids and cell sizes from disk."""
+        if self.centroids_file.exists() and self.assignments_file.exists():
+            try:
+                self.state = IVFState(np.load(self.centroids_file))
+                self.sizes = np.bincount(self._read_assignments(), minlength=self.n_lists)
+                self.trained_size = int(self.sizes.sum())
+            except Exception as e:
+                print(f"Warning: Could not load IVF index: {e}")
+                self.state = None
+
+    def reconcile(self, vectors: np.ndarray) -> None:
+        """
+        Match assignments to the collection rows after an interrupted add.
+
+        Args:
+            vectors: All collection vectors
+        """
+        if not self.trained:
+            return
+        assigned = self.assignments_file.stat().st_size // 4
+        if assigned > vectors.shape[0]:
+            with open(self.assignments_file, 'r+b') as f:
+                f.truncate(vectors.shape[0] * 4)
+            self.sizes = np.bincount(self._read_assignments(), minlength=self.n_lists)
+        elif assigned < vectors.shape[0]:
+            self.add(np.asarray(vectors[assigned:], dtype=np.float32), assigned)
+
+    def delete_files(self) -> None:
+        """Remove persisted index files."""
+        for path in (self.centroids_file, self.assignments_file, self.lists_file):
+            if path.exists():
+                path.unlink()
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid for each vector."""
+    return np.argmax(normalize(np.asarray(vectors, dtype=np.float32)) @ centroids.T, axis=1)
+
+
+def _kmeans(sample: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Spherical k-means over normalized vectors.
+
+    Args:
+        sample: Normalized training vectors
+        k: Number of centroids
+        iterations: Number of Lloyd iterations
+        rng: Random generator
+
+    Returns:
+        Normalized centroids (k, dim)
+    """
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.empty(len(sample), dtype=np.int64)
+        for start in range(0, len(sample), ASSIGN_BLOCK_SIZE):
+            block = sample[start:start + ASSIGN_BLOCK_SIZE]
+            assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+        # Sum members of each cell via a sort + reduceat
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=k)
+        sums = np.zeros_like(centroids)
+        present = np.flatnonzero(counts)
+        starts = np.concatenate([[0], np.cumsum(counts[present])[:-1]])
+        sums[present] = np.add.reduceat(sample[order], starts, axis=0)
+
+        # Reseed empty cells with random sample points
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = sample[rng.choice(len(sample), len(empty))]
+
+        centroids = normalize(sums)
+
+    return centroids
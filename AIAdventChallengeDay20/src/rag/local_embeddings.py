@@ -0,0 +1,225 @@
+"""Deterministic offline embeddings (hashing trick + TF-IDF)."""
+
+from typing import List, Optional
+from pathlib import Path
+import os
+import re
+import threading
+import zlib
+import numpy as np
+
+from .vector_utils import normalize
+
+
+# Feature families and their weights
+WORD_WEIGHT = 1.0
+BIGRAM_WEIGHT = 1.0
+CHAR_WEIGHT = 0.5
+CHAR_NGRAM_SIZES = (3, 4, 5)
+
+# Per-family seeds so equal strings in different families hash apart
+_WORD_SEED = np.uint64(0x9E3779B97F4A7C15)
+_BIGRAM_SEED = np.uint64(0xC2B2AE3D27D4EB4F)
+_CHAR_SEEDS = {n: np.uint64(0x165667B19E3779F9 * n & 0xFFFFFFFFFFFFFFFF) for n in CHAR_NGRAM_SIZES}
+
+# Multiplier of the polynomial rolling hash over bytes
+_BASE = np.uint64(0x100000001B3)
+_POWERS = _BASE ** np.arange(max(CHAR_NGRAM_SIZES), dtype=np.uint64)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+class LocalEmbedder:
+    """
+    Offline embedding backend that needs no network and no model files.
+
+    Each text becomes a bag of word unigrams, word bigrams and character
+    3-5 grams. Features are hashed (with a random sign) into ``dimension``
+    buckets with a fixed 64-bit hash, so vectors are identical across
+    processes and machines. A whole batch is projected from sparse
+    (row, bucket, weight) triples to a dense matrix in one ``bincount``.
+
+    Document vectors hold sublinear term frequencies only, so they never
+    depend on the rest of the corpus. IDF is applied on the query side:
+    weighting the query by ``idf ** 2`` makes its dot product with a TF
+    document vector equal the TF-IDF dot product. Document frequencies
+    are accumulated from embedded documents, reduced again when documents
+    are removed from the index, and persisted to ``stats_path`` so later
+    processes see the same IDF.
+    """
+
+    def __init__(self, dimension: int = 1024, stats_path: Optional[Path] = None):
+        """
+        Initialize local embedder.
+
+        Args:
+            dimension: Number of hash buckets (embedding dimension)
+            stats_path: File with document frequencies (None = in memory only)
+        """
+        self.dimension = dimension
+        self.stats_path = Path(stats_path) if stats_path else None
+        self.document_frequencies = np.zeros(dimension, dtype=np.float64)
+        self.document_count = 0
+        self._stats_mtime = None
+        self._lock = threading.Lock()
+        self._load_statistics()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents and add them to the document frequencies.
+
+        Args:
+            texts: Document texts
+
+        Returns:
+            L2-normalized TF vectors
+        """
+        vectors = self._term_frequencies(texts)
+        with self._lock:
+            self._load_statistics()
+            self.document_frequencies += (vectors != 0).sum(axis=0)
+            self.document_count += len(texts)
+            self._save_statistics()
+        return normalize(vectors).tolist()
+
+    def remove_documents(self, texts: List[str]) -> None:
+        """
+        Subtract removed documents from the document frequencies.
+
+        Args:
+            texts: Texts of documents deleted from the index
+        """
+        if not texts:
+            return
+        vectors = self._term_frequencies(texts)
+        with self._lock:
+            self._load_statistics()
+            # Clamped: the documents may predate the statistics
+            self.document_frequencies = np.maximum(
+                self.document_frequencies - (vectors != 0).sum(axis=0), 0.0
+            )
+            self.document_count = max(self.document_count - len(texts), 0)
+            self._save_statistics()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a search query with IDF weighting.
+
+        Args:
+            text: Query text
+
+        Returns:
+            L2-normalized query vector
+        """
+        with self._lock:
+            self._load_statistics()
+            idf = self.idf()
+        return normalize(self._term_frequencies([text]) * idf ** 2)[0].tolist()
+
+    def idf(self) -> np.ndarray:
+        """Smoothed inverse document frequency per bucket."""
+        return np.log((1.0 + self.document_count) / (1.0 + self.document_frequencies)) + 1.0
+
+    def reset_statistics(self) -> None:
+        """Forget document frequencies (e.g. when the index is cleared)."""
+        with self._lock:
+            self.document_frequencies = np.zeros(self.dimension, dtype=np.float64)
+            self.document_count = 0
+            if self.stats_path and self.stats_path.exists():
+                self.stats_path.unlink()
+            self._stats_mtime = None
+
+    def _term_frequencies(self, texts: List[str]) -> np.ndarray:
+        """Project hashed features of a batch into a dense (len(texts), dimension) matrix."""
+        rows, hashes, weights = [], [], []
+        for row, text in enumerate(texts):
+            text_hashes, text_weights = _features(text)
+            rows.append(np.full(len(text_hashes), row, dtype=np.int64))
+            hashes.append(text_hashes)
+            weights.append(text_weights)
+
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        hashes = np.concatenate(hashes)
+        buckets = (hashes % np.uint64(self.dimension)).astype(np.int64)
+        signs = 1.0 - 2.0 * (hashes >> np.uint64(63)).astype(np.float64)
+        flat = np.concatenate(rows) * self.dimension + buckets
+        counts = np.bincount(
+            flat,
+            weights=np.concatenate(weights) * signs,
+            minlength=len(texts) * self.dimension
+        ).reshape(len(texts), self.dimension)
+
+        # Sublinear TF, keeping the sign of the bucket
+        return (np.sign(counts) * np.log1p(np.abs(counts))).astype(np.float32)
+
+    def _load_statistics(self) -> None:
+        """Reload document frequencies if the stats file changed."""
+        if not self.stats_path or not self.stats_path.exists():
+            return
+        try:
+            mtime = self.stats_path.stat().st_mtime_ns
+            if mtime == self._stats_mtime:
+                return
+            with open(self.stats_path, 'rb') as f:
+                stats = np.load(f)
+            if len(stats) != self.dimension + 1:
+                print(f"Warning: Ignoring local embedding stats of another dimension: {self.stats_path}")
+                return
+            self.document_frequencies = stats[:-1].copy()
+            self.document_count = int(stats[-1])
+            self._stats_mtime = mtime
+        except Exception as e:
+            print(f"Warning: Could not load local embedding stats: {e}")
+
+    def _save_statistics(self) -> None:
+        """Atomically persist document frequencies."""
+        if not self.stats_path:
+            return
+        self.stats_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.stats_path.with_suffix('.tmp')
+        with open(tmp_file, 'wb') as f:
+            np.save(f, np.append(self.document_frequencies, self.document_count))
+        os.replace(tmp_file, self.stats_path)
+        self._stats_mtime = self.stats_path.stat().st_mtime_ns
+
+
+def _features(text: str):
+    """
+    Hashes and weights of all features of one text.
+
+    Returns:
+        Tuple of uint64 hashes and float64 weights
+    """
+    words = _WORD_RE.findall(text.lower())
+    word_hashes = np.fromiter(
+        (zlib.crc32(word.encode('utf-8')) for word in words),
+        dtype=np.uint64,
+        count=len(words)
+    )
+    parts = [_mix(word_hashes ^ _WORD_SEED)]
+    part_weights = [WORD_WEIGHT]
+    if len(words) > 1:
+        parts.append(_mix((word_hashes[:-1] << np.uint64(32)) ^ word_hashes[1:] ^ _BIGRAM_SEED))
+        part_weights.append(BIGRAM_WEIGHT)
+
+    # Character n-grams over the normalized word sequence
+    data = np.frombuffer(f" {' '.join(words)} ".encode('utf-8'), dtype=np.uint8).astype(np.uint64)
+    for n in CHAR_NGRAM_SIZES:
+        if len(data) >= n:
+            windows = np.lib.stride_tricks.sliding_window_view(data, n)
+            parts.append(_mix((windows * _POWERS[:n]).sum(axis=1, dtype=np.uint64) ^ _CHAR_SEEDS[n]))
+            part_weights.append(CHAR_WEIGHT)
+
+    hashes = np.concatenate(parts)
+    weights = np.concatenate([np.full(len(part), w) for part, w in zip(parts, part_weights)])
+    return hashes, weights
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer: spread bits of uint64 values."""
+    with np.errstate(over='ignore'):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return values ^ (values >> np.uint64(31))
@@ -0,0 +1,171 @@
+"""Query result cache invalidated by an index version counter."""
+
+from typing import Any, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from pathlib import Path
+import json
+import os
+import threading
+
+
+class IndexVersion:
+    """
+    Version counter of a collection, stored in a small file.
+
+    The indexer bumps it after every write, so any process can tell
+    whether results computed earlier may be stale.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize version counter.
+
+        Args:
+            path: Version file
+        """
+        self.path = Path(path)
+
+    def read(self) -> int:
+        """Current version (0 if the collection was never written)."""
+        try:
+            return int(self.path.read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        """
+        Increment the version.
+
+        Returns:
+            New version
+        """
+        version = self.read() + 1
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.path.with_suffix('.tmp')
+        tmp_file.write_text(str(version))
+        os.replace(tmp_file, self.path)
+        return version
+
+
+class QueryCache:
+    """
+    LRU cache of search results keyed by (normalized query, top_k, filter).
+
+    Every entry records the index version it was computed at and is only
+    served while that version is current, so results never outlive an
+    index write. With ``persist_path`` set, entries are saved to a JSON
+    file and reused by later processes (e.g. separate CLI invocations).
+    """
+
+    def __init__(self, max_entries: int = 256, persist_path: Optional[Path] = None):
+        """
+        Initialize query cache.
+
+        Args:
+            max_entries: Maximum number of cached queries
+            persist_path: JSON file for persistence (None = in memory only)
+        """
+        self.max_entries = max_entries
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, Tuple[int, List[Dict]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def make_key(query: str, top_k: int, where: Optional[Dict] = None) -> str:
+        """
+        Cache key for a search.
+
+        Args:
+            query: Search query (case and whitespace are normalized)
+            top_k: Number of results
+            where: Metadata filter
+
+        Returns:
+            Key string
+        """
+        normalized = ' '.join(query.lower().split())
+        return json.dumps([normalized, top_k, where], sort_keys=True)
+
+    def get(self, key: str, version: int) -> Optional[List[Dict]]:
+        """
+        Get cached results computed at ``version``.
+
+        Args:
+            key: Cache key
+            version: Current index version
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    # Computed against an older index
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, version: int, results: List[Dict]) -> None:
+        """
+        Store results computed at ``version``.
+
+        Args:
+            key: Cache key
+            version: Index version the results were computed at
+            results: Search results
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate and entries
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries)
+            }
+
+    def _load(self) -> None:
+        """Load persisted entries, if any."""
+        if not self.persist_path or not self.persist_path.exists():
+            return
+        try:
+            with open(self.persist_path, 'r') as f:
+                for key, version, results in json.load(f)['entries'][-self.max_entries:]:
+                    self._entries[key] = (version, results)
+        except Exception as e:
+            print(f"Warning: Could not load query cache: {e}")
+
+    def _save(self) -> None:
+        """Atomically persist entries (oldest first)."""
+        if not self.persist_path:
+            return
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.persist_path.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({'entries': [[key, version, results] for key, (version, results) in self._entries.items()]}, f)
+            os.replace(tmp_file, self.persist_path)
+        except Exception as e:
+            print(f"Warning: Could not save query cache: {e}")
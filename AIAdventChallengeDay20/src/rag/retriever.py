@@ -3,27 +3,34 @@
 from typing import List, Dict, Optional
 from pathlib import Path
 
-# Try to import ChromaDB, fallback to simple implementation
-try:
-    import chromadb
-    from chromadb.config import Settings
-    USE_CHROMADB = True
-except Exception as e:
-    from .simple_vectordb import PersistentClient
-    USE_CHROMADB = False
-
 from .config import RAGConfig
 from .embeddings import EmbeddingGenerator
+from .query_cache import IndexVersion, QueryCache
+from .file_index import FileVectorIndex
+from .vectordb import get_client
+
+
+# Candidate files per requested file when refining by chunk
+REFINE_CANDIDATES = 3
 
 
 class DocumentRetriever:
-    """Retrieve relevant documents from vector database."""
+    """
+    Retrieve relevant documents from vector database.
+
+    Search results are cached per (normalized query, top_k, filter) and
+    tied to the collection's ``IndexVersion``; any index write makes the
+    cached results stale. Related files are looked up in the per-file
+    ``FileVectorIndex`` maintained by the indexer.
+    """
 
     def __init__(
         self,
         collection_name: str = RAGConfig.COLLECTION_NAME,
         persist_directory: Path = RAGConfig.CHROMA_PERSIST_DIR,
-        top_k: int = RAGConfig.TOP_K_RESULTS
+        top_k: int = RAGConfig.TOP_K_RESULTS,
+        cache_size: int = RAGConfig.QUERY_CACHE_SIZE,
+        persist_cache: bool = RAGConfig.QUERY_CACHE_PERSIST
     ):
         """
         Initialize document retriever.
@@ -32,21 +39,15 @@ class DocumentRetriever:
             collection_name: Name of the collection
             persist_directory: Directory with data
             top_k: Number of results to return
+            cache_size: Maximum cached queries (0 disables the cache)
+            persist_cache: Keep cached results on disk across runs
         """
         self.collection_name = collection_name
         self.persist_directory = persist_directory
         self.top_k = top_k
 
         # Initialize vector DB
-        if USE_CHROMADB:
-            self.client = chromadb.PersistentClient(
-                path=str(persist_directory),
-                settings=Settings(anonymized_telemetry=False)
-            )
-        else:
-            self.client = PersistentClient(
-                path=str(persist_directory)
-            )
+        self.client = get_client(persist_directory)
 
         # Get collection
         try:
@@ -58,7 +59,18 @@ class DocumentRetriever:
             )
 
         # Initialize embedder
-        self.embedder = EmbeddingGenerator()
+        self.embedder = EmbeddingGenerator(
+            stats_path=RAGConfig.local_embedding_stats_path(persist_directory, collection_name)
+        )
+
+        self.file_index = FileVectorIndex(RAGConfig.file_index_path(persist_directory, collection_name))
+
+        # Query result cache
+        self.version = IndexVersion(RAGConfig.index_version_path(persist_directory, collection_name))
+        self.cache = QueryCache(
+            max_entries=cache_size,
+            persist_path=RAGConfig.query_cache_path(persist_directory, collection_name) if persist_cache else None
+        )
 
     def search(
         self,
@@ -79,6 +91,12 @@ class DocumentRetriever:
         """
         k = top_k or self.top_k
 
+        cache_key = QueryCache.make_key(query, k, filter_metadata)
+        version = self.version.read()
+        cached = self.cache.get(cache_key, version)
+        if cached is not None:
+            return cached
+
         # Generate query embedding
         query_embedding = self.embedder.generate_query_embedding(query)
 
@@ -101,8 +119,19 @@ class DocumentRetriever:
                 }
                 formatted_results.append(result)
 
+        self.cache.put(cache_key, version, formatted_results)
         return formatted_results
 
+    def cache_stats(self) -> Dict:
+        """
+        Get query cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, hit_rate, entries and the
+            current index version
+        """
+        return {**self.cache.stats(), 'index_version': self.version.read()}
+
     def search_by_file(self, query: str, file_name: str, top_k: Optional[int] = None) -> List[Dict]:
         """
         Search within a specific file.
@@ -153,17 +182,59 @@ class DocumentRetriever:
 
         return "\n".join(context_parts)
 
-    def get_related_files(self, query: str, limit: int = 5) -> List[str]:
+    def get_related_files(
+        self,
+        query: str,
+        limit: int = 5,
+        pooling: str = RAGConfig.RELATED_FILES_POOLING,
+        refine: bool = RAGConfig.RELATED_FILES_REFINE
+    ) -> List[str]:
         """
         Get list of files related to a query.
 
+        Files are ranked by their pooled vectors, so up to ``limit``
+        distinct files are returned even when one file has many matching
+        chunks. Falls back to a chunk search if the collection has no
+        file index yet.
+
         Args:
             query: Search query
             limit: Maximum number of files
+            pooling: File vectors to score ("mean", "max" or "hybrid")
+            refine: Re-rank the top candidate files by their best chunk
 
         Returns:
             List of unique file paths
         """
+        if not len(self.file_index):
+            return self._related_files_from_chunks(query, limit)
+
+        query_embedding = self.embedder.generate_query_embedding(query)
+        candidates = [
+            source for source, _ in
+            self.file_index.search(query_embedding, limit * REFINE_CANDIDATES if refine else limit, pooling)
+        ]
+        if not refine or len(candidates) <= 1:
+            return candidates[:limit]
+
+        # Best chunk per candidate file; files without a returned chunk
+        # keep their file-level order after the others
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=len(candidates) * REFINE_CANDIDATES,
+            where={'source': {'$in': candidates}}
+        )
+        best: Dict[str, float] = {}
+        if results['metadatas'] and results['metadatas'][0]:
+            for metadata, distance in zip(results['metadatas'][0], results['distances'][0]):
+                source = metadata.get('source')
+                if source not in best:
+                    best[source] = distance
+        ranked = sorted(best, key=best.get) + [source for source in candidates if source not in best]
+        return ranked[:limit]
+
+    def _related_files_from_chunks(self, query: str, limit: int) -> List[str]:
+        """Related files from a chunk search, deduplicated by source."""
         results = self.search(query, top_k=limit * 2)
 
         # Extract unique file sources
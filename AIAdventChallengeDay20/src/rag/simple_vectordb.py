@@ -1,40 +1,212 @@
 """Simple in-memory vector database fallback for ChromaDB."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Callable, Tuple, NamedTuple
+from contextlib import contextmanager
+import heapq
 import json
-import pickle
+import os
+import threading
 from pathlib import Path
 import numpy as np
 
+from .ivf_index import IVFIndex, IVFState
+
+
+# Storage modes
+STORAGE_MEMORY = "memory"
+STORAGE_MMAP = "mmap"
+
+# Index types
+INDEX_FLAT = "flat"
+INDEX_IVF = "ivf"
+
+# Rows scored per block; bounds peak memory of a query to block_size * dim floats
+DEFAULT_BLOCK_SIZE = 8192
+
+# Collection metadata keys forwarded to IVFIndex
+IVF_PARAMS = ('n_lists', 'nprobe', 'sample_size', 'imbalance_factor', 'retrain_growth', 'min_train_size')
+
+# Metadata filter operators supported in ``where``
+WHERE_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '$eq': lambda value, operand: value == operand,
+    '$ne': lambda value, operand: value != operand,
+    '$in': lambda value, operand: value in operand,
+    '$nin': lambda value, operand: value not in operand,
+}
+
+# File suffixes that make up a collection
+COLLECTION_FILES = (
+    '.json', '.manifest.json', '.vectors.f32', '.records.jsonl', '.offsets.i64',
+    '.ivf.centroids.npy', '.ivf.assign.i32', '.ivf.lists.f32'
+)
+
+# Collections shared by all clients of a process, keyed by (directory, name)
+_shared_collections: Dict[Tuple[Path, str], 'SimpleVectorDB'] = {}
+_shared_lock = threading.Lock()
+
+
+class Snapshot(NamedTuple):
+    """
+    Immutable view of a collection.
+
+    Rows at index >= ``count`` in the shared lists or files belong to
+    later snapshots and are never read through this one.
+    """
+
+    count: int
+    # (count, dim) view of the in-memory buffer, or a memmap of the vectors file
+    vectors: np.ndarray
+    # Append-only row lists (memory mode)
+    documents: List[str]
+    metadatas: List[Dict]
+    ids: List[str]
+    # count + 1 record offsets and a byte map of the records file (mmap mode)
+    offsets: Optional[np.ndarray]
+    records: Optional[np.ndarray]
+    # Rows of each ID; rows >= ``count`` belong to later snapshots. None
+    # until the first lookup by ID in mmap mode
+    id_rows: Optional[Dict[str, List[int]]]
+    # IVF state covering exactly the first ``count`` rows
+    ivf: Optional[IVFState]
+
 
 class SimpleVectorDB:
     """
-    Simple in-memory vector database.
+    Simple vector database.
     Fallback when ChromaDB doesn't work (Python 3.14+).
+
+    Two storage modes are supported:
+
+    - ``memory``: everything is loaded from a single JSON file (default).
+    - ``mmap``: out-of-core mode for collections larger than RAM. Vectors
+      live in a memory-mapped float32 file and are scored block by block;
+      documents and metadata stay on disk and are read only for the
+      final top-k.
+
+    Queries are an exact blocked scan by default. With ``index="ivf"`` an
+    inverted file index (see ``IVFIndex``) is trained once the collection
+    is large enough and unfiltered queries score only the closest cells.
+
+    Concurrency: writers (``add``, ``delete``) are serialized by a lock.
+    ``add`` writes new rows past the end of the current snapshot and
+    ``delete`` compacts the remaining rows into a new buffer or new files;
+    either then publishes a new ``Snapshot`` with a single attribute
+    assignment. Queries take the current snapshot once, without locking,
+    and read only through it, so a query sees either all rows of a batch
+    or none of them.
+
+    In memory mode every write re-serializes the whole JSON file; wrap a
+    run of writes in ``batch_writes()`` to save once at the end.
+
+    Data is loaded lazily on first ``add``/``query``; ``count()`` and
+    ``info()`` are answered from the collection manifest.
     """
 
-    def __init__(self, persist_directory: Path, collection_name: str):
+    def __init__(
+        self,
+        persist_directory: Path,
+        collection_name: str,
+        storage: Optional[str] = None,
+        block_size: Optional[int] = None,
+        index: Optional[str] = None,
+        index_params: Optional[Dict[str, Any]] = None
+    ):
         """
         Initialize simple vector DB.
 
         Args:
             persist_directory: Directory to save data
             collection_name: Collection name
+            storage: Storage mode ("memory" or "mmap"). Defaults to the mode
+                recorded in the collection manifest, or "memory".
+            block_size: Rows scored per block during queries
+            index: Index type ("flat" or "ivf"). Defaults to the type recorded
+                in the collection manifest, or "flat".
+            index_params: IVF parameters (n_lists, nprobe, sample_size,
+                imbalance_factor, retrain_growth, min_train_size)
         """
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
 
         self.collection_name = collection_name
         self.db_file = self.persist_directory / f"{collection_name}.json"
+        self.manifest_file = self.persist_directory / f"{collection_name}.manifest.json"
+        self.vectors_file = self.persist_directory / f"{collection_name}.vectors.f32"
+        self.records_file = self.persist_directory / f"{collection_name}.records.jsonl"
+        self.offsets_file = self.persist_directory / f"{collection_name}.offsets.i64"
+
+        manifest = self._read_manifest()
+        self._manifest = manifest
+        recorded = manifest.get('storage')
+        if recorded is None and self.db_file.exists():
+            recorded = STORAGE_MEMORY
+        self.storage = recorded or storage or STORAGE_MEMORY
+        if self.storage not in (STORAGE_MEMORY, STORAGE_MMAP):
+            raise ValueError(f"Unknown storage mode: {self.storage}")
+        # An existing JSON collection moves to out-of-core storage on request
+        self._migrate_to_mmap = storage == STORAGE_MMAP and recorded == STORAGE_MEMORY
+        if self._migrate_to_mmap:
+            self.storage = STORAGE_MMAP
+        self.block_size = int(block_size or manifest.get('block_size') or DEFAULT_BLOCK_SIZE)
+        self.dimension: Optional[int] = manifest.get('dimension')
 
-        # In-memory storage
+        # Serializes writers; readers never take it
+        self._lock = threading.RLock()
+        # Open batch_writes() blocks and whether they left writes unsaved
+        self._batch_depth = 0
+        self._unsaved = False
+
+        # Writer-side storage (memory mode): vector buffer with spare
+        # capacity and append-only row lists
+        self._buffer = np.zeros((0, self.dimension or 0), dtype=np.float32)
         self.documents: List[str] = []
-        self.embeddings: List[List[float]] = []
         self.metadatas: List[Dict] = []
         self.ids: List[str] = []
+        self._id_rows: Optional[Dict[str, List[int]]] = {}
+
+        self.ivf: Optional[IVFIndex] = None
+
+        # Row count recorded in the manifest (mmap mode)
+        self._recorded_count = int(manifest.get('count', 0)) if recorded == STORAGE_MMAP else 0
+        self._snapshot = self._empty_snapshot()
+        self._loaded = False
 
-        # Load existing data
-        self._load()
+        # Optional IVF index
+        self.index = index or manifest.get('index') or INDEX_FLAT
+        if self.index not in (INDEX_FLAT, INDEX_IVF):
+            raise ValueError(f"Unknown index type: {self.index}")
+        self.index_params = {
+            key: value
+            for key, value in (index_params or manifest.get('index_params') or {}).items()
+            if key in IVF_PARAMS and value is not None
+        }
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Vectors of the current snapshot."""
+        return self.snapshot().vectors
+
+    def snapshot(self) -> Snapshot:
+        """Get the current immutable snapshot of the collection."""
+        self._ensure_loaded()
+        return self._snapshot
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Describe the collection without loading its data.
+
+        Returns:
+            Dictionary with storage, index, dimension, count and size on disk
+        """
+        return {
+            'name': self.collection_name,
+            'storage': self.storage,
+            'index': self.index,
+            'dimension': self.dimension,
+            'count': self.count(),
+            'size_bytes': self._size_on_disk(),
+            'loaded': self._loaded
+        }
 
     def add(
         self,
@@ -46,37 +218,183 @@ class SimpleVectorDB:
         """
         Add documents to collection.
 
+        The batch becomes visible to queries atomically, after all of its
+        rows (and their IVF assignments) have been written.
+
         Args:
             embeddings: List of embeddings
             documents: List of document texts
             metadatas: List of metadata dicts
             ids: List of IDs
         """
-        self.embeddings.extend(embeddings)
-        self.documents.extend(documents)
-        self.metadatas.extend(metadatas)
-        self.ids.extend(ids)
+        if len(embeddings) == 0:
+            return
 
-        self._save()
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError("Embeddings must be a list of vectors")
+
+        self._ensure_loaded()
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+                self._buffer = self._buffer.reshape(0, self.dimension)
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match "
+                    f"collection dimension {self.dimension}"
+                )
+
+            start_row = self._snapshot.count
+            if self.storage == STORAGE_MMAP:
+                self._append_rows(vectors, documents, metadatas, ids)
+            else:
+                self._append_memory(vectors, documents, metadatas, ids)
+            count = start_row + len(vectors)
+
+            if self.ivf is not None:
+                if self.ivf.trained:
+                    self.ivf.add(vectors, start_row)
+                    if self.ivf.needs_retrain():
+                        had_lists = self.ivf.state.has_lists
+                        self.ivf.train(self._vectors_view(count))
+                        if had_lists:
+                            # Queries are being served: rebuild cells before publishing
+                            self.ivf.build_lists(self._vectors_view(count))
+                elif count >= self.ivf.min_train_size:
+                    self.ivf.train(self._vectors_view(count))
+
+            self._publish(count)
+
+            self._persist()
+
+    @contextmanager
+    def batch_writes(self) -> Iterator['SimpleVectorDB']:
+        """
+        Save the collection once for all writes made inside the block.
+
+        ``add`` and ``delete`` still publish their rows to queries right
+        away; only the memory-mode JSON file is written once, on exit
+        (also when the block raises). mmap mode appends to its files and
+        is unaffected.
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._unsaved:
+                    self._save()
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Get rows by ID and/or metadata filter.
+
+        Args:
+            ids: IDs to fetch (all rows if None)
+            where: Metadata filter (optional)
+            include: Fields to return besides IDs ("embeddings",
+                "documents", "metadatas"); defaults to documents and
+                metadatas
+
+        Returns:
+            Dictionary of parallel lists in collection order
+        """
+        include = include if include is not None else ['documents', 'metadatas']
+        snapshot = self.snapshot()
+        if ids and snapshot.id_rows is None:
+            snapshot = self._index_ids()
+        rows = np.flatnonzero(self._select_rows(snapshot, ids, where)) if snapshot.count else []
+
+        records = self._read_records(snapshot, rows)
+        result: Dict[str, Any] = {'ids': [record['id'] for record in records]}
+        if 'embeddings' in include:
+            result['embeddings'] = np.asarray(snapshot.vectors[rows], dtype=np.float32).tolist()
+        if 'documents' in include:
+            result['documents'] = [record['document'] for record in records]
+        if 'metadatas' in include:
+            result['metadatas'] = [record['metadata'] for record in records]
+        return result
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict] = None
+    ) -> None:
+        """
+        Delete rows by ID and/or metadata filter.
+
+        When both are given, only rows matching both are deleted. The
+        remaining rows are compacted into a new buffer (memory mode) or
+        into new files swapped in with ``os.replace`` (mmap mode), so
+        queries holding an older snapshot keep reading the old data.
+
+        Args:
+            ids: IDs to delete
+            where: Metadata filter selecting rows to delete
+        """
+        if not ids and not where:
+            return
+
+        self._ensure_loaded()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot.count == 0:
+                return
+            if ids and snapshot.id_rows is None:
+                snapshot = self._index_ids()
+
+            keep = ~self._select_rows(snapshot, ids, where)
+            if keep.all():
+                return
+
+            count = int(keep.sum())
+            if self.storage == STORAGE_MMAP:
+                self._compact_rows(snapshot, keep)
+            else:
+                self._compact_memory(snapshot, keep)
+            if snapshot.id_rows is not None:
+                self._id_rows = self._remap_id_rows(snapshot, keep)
+
+            if self.ivf is not None and self.ivf.trained:
+                self.ivf.remove_rows(keep, self._vectors_view(count) if count else None)
+
+            self._publish(count)
+
+            self._persist()
 
     def query(
         self,
         query_embeddings: List[List[float]],
         n_results: int = 5,
-        where: Optional[Dict] = None
+        where: Optional[Dict] = None,
+        nprobe: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Query similar documents.
 
+        Safe to call from many threads while another thread adds rows.
+
         Args:
             query_embeddings: Query embedding vectors
             n_results: Number of results
-            where: Metadata filter (optional)
+            where: Metadata filter (optional). Filtered queries always use
+                an exact scan.
+            nprobe: IVF cells to score (optional, IVF index only)
 
         Returns:
             Query results
         """
-        if not self.embeddings:
+        snapshot = self.snapshot()
+
+        if snapshot.count == 0 or n_results <= 0:
             return {
                 'documents': [[]],
                 'metadatas': [[]],
@@ -84,136 +402,664 @@ class SimpleVectorDB:
                 'ids': [[]]
             }
 
-        query_embedding = query_embeddings[0]
+        query_embedding = np.asarray(query_embeddings[0], dtype=np.float32)
 
-        # Calculate cosine similarities
-        similarities = []
-        for idx, doc_embedding in enumerate(self.embeddings):
-            # Filter by metadata if provided
-            if where:
-                match = all(
-                    self.metadatas[idx].get(key) == value
-                    for key, value in where.items()
-                )
-                if not match:
-                    continue
-
-            similarity = self._cosine_similarity(query_embedding, doc_embedding)
-            similarities.append((idx, similarity))
+        if self.ivf is not None and not where:
+            if snapshot.ivf is None or not snapshot.ivf.has_lists:
+                snapshot = self._prepare_ivf(snapshot)
 
-        # Sort by similarity (higher is better)
-        similarities.sort(key=lambda x: x[1], reverse=True)
+        if self.ivf is not None and not where and snapshot.ivf is not None:
+            top = self.ivf.search(snapshot.ivf, query_embedding, n_results, nprobe)
+        else:
+            block_mask = self._records_mask if self.storage == STORAGE_MMAP else self._metadata_mask
+            top = self._blocked_top_k(
+                snapshot.vectors,
+                query_embedding,
+                n_results,
+                (lambda start, end: block_mask(snapshot, start, end, where)) if where else None
+            )
 
-        # Get top N results
-        top_indices = [idx for idx, _ in similarities[:n_results]]
+        # Fetch documents and metadata only for the final top-k
+        records = self._read_records(snapshot, [idx for idx, _ in top])
 
         # Format results
         results = {
-            'documents': [[self.documents[idx] for idx in top_indices]],
-            'metadatas': [[self.metadatas[idx] for idx in top_indices]],
-            'distances': [[1.0 - sim for _, sim in similarities[:n_results]]],  # Convert to distance
-            'ids': [[self.ids[idx] for idx in top_indices]]
+            'documents': [[record['document'] for record in records]],
+            'metadatas': [[record['metadata'] for record in records]],
+            'distances': [[1.0 - sim for _, sim in top]],  # Convert to distance
+            'ids': [[record['id'] for record in records]]
         }
 
         return results
 
     def count(self) -> int:
         """Get number of documents."""
-        return len(self.documents)
+        if not self._loaded:
+            count = self._manifest.get('count')
+            if count is not None:
+                return int(count)
+            # Collection written before manifests existed
+            self._ensure_loaded()
+        return self._snapshot.count
+
+    def _ensure_loaded(self) -> None:
+        """Load data and the IVF index on first use."""
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+
+            self._load()
+
+            if self.index == INDEX_IVF:
+                self.ivf = IVFIndex(
+                    centroids_file=self.persist_directory / f"{self.collection_name}.ivf.centroids.npy",
+                    assignments_file=self.persist_directory / f"{self.collection_name}.ivf.assign.i32",
+                    lists_file=self.persist_directory / f"{self.collection_name}.ivf.lists.f32",
+                    **self.index_params
+                )
+                if self._snapshot.count:
+                    self.ivf.reconcile(self._snapshot.vectors)
+                self._publish(self._snapshot.count)
+
+            if self._snapshot.count or self._manifest:
+                self._write_manifest()
+            self._loaded = True
+
+    def _size_on_disk(self) -> int:
+        """Total size of collection files in bytes."""
+        total = 0
+        for suffix in COLLECTION_FILES:
+            path = self.persist_directory / f"{self.collection_name}{suffix}"
+            if path.exists():
+                total += path.stat().st_size
+        return total
+
+    def _prepare_ivf(self, snapshot: Snapshot) -> Snapshot:
+        """
+        Train the IVF index or gather its cell blocks on first use.
+
+        Takes the writer lock once; later queries read the published state.
+
+        Returns:
+            Snapshot to query (its ``ivf`` is None while the collection is
+            too small to train)
+        """
+        if snapshot.ivf is None and snapshot.count < self.ivf.min_train_size:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if not self.ivf.trained and snapshot.count >= self.ivf.min_train_size:
+                self.ivf.train(snapshot.vectors)
+            if self.ivf.trained and not self.ivf.state.has_lists:
+                self.ivf.build_lists(snapshot.vectors)
+            self._publish(snapshot.count)
+            return self._snapshot
+
+    def _publish(self, count: int) -> None:
+        """Publish a new snapshot covering the first ``count`` rows."""
+        if count == 0:
+            self._snapshot = self._empty_snapshot()
+            return
+        self._snapshot = Snapshot(
+            count=count,
+            vectors=self._vectors_view(count),
+            documents=self.documents,
+            metadatas=self.metadatas,
+            ids=self.ids,
+            offsets=self._open_offsets(count) if self.storage == STORAGE_MMAP else None,
+            records=self._open_records() if self.storage == STORAGE_MMAP else None,
+            id_rows=self._id_rows,
+            ivf=self.ivf.state if self.ivf is not None else None
+        )
+
+    def _empty_snapshot(self) -> Snapshot:
+        """Snapshot of an empty collection."""
+        return Snapshot(
+            count=0,
+            vectors=np.zeros((0, self.dimension or 0), dtype=np.float32),
+            documents=self.documents,
+            metadatas=self.metadatas,
+            ids=self.ids,
+            offsets=None,
+            records=None,
+            id_rows=self._id_rows,
+            ivf=None
+        )
+
+    def _vectors_view(self, count: int) -> np.ndarray:
+        """First ``count`` vectors (buffer view or memmap)."""
+        if self.storage == STORAGE_MMAP:
+            return np.memmap(
+                self.vectors_file,
+                dtype=np.float32,
+                mode='r',
+                shape=(count, self.dimension)
+            )
+        return self._buffer[:count]
 
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
+    def _blocked_top_k(
+        self,
+        vectors: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        block_mask: Optional[Callable[[int, int], np.ndarray]] = None
+    ) -> List[Tuple[int, float]]:
         """
-        Calculate cosine similarity between two vectors.
+        Score vectors block by block, keeping a running top-k heap.
 
         Args:
-            vec1: First vector
-            vec2: Second vector
+            vectors: Row matrix (in-memory array or memmap)
+            query: Query vector
+            k: Number of results
+            block_mask: Optional callable returning a boolean mask of rows
+                in [start, end) that pass the metadata filter
+
+        Returns:
+            List of (row index, cosine similarity), best first
+        """
+        if k <= 0:
+            return []
+
+        query_norm = float(np.linalg.norm(query))
+        heap: List[Tuple[float, int]] = []
+
+        for start in range(0, vectors.shape[0], self.block_size):
+            end = min(start + self.block_size, vectors.shape[0])
+            block = np.asarray(vectors[start:end], dtype=np.float32)
+
+            norms = np.linalg.norm(block, axis=1) * query_norm
+            scores = np.zeros(end - start, dtype=np.float32)
+            np.divide(block @ query, norms, out=scores, where=norms > 0)
+
+            candidates = np.arange(end - start)
+            if block_mask is not None:
+                candidates = candidates[block_mask(start, end)]
+            if len(candidates) > k:
+                best = np.argpartition(scores[candidates], -k)[-k:]
+                candidates = candidates[best]
+
+            for local_idx in candidates:
+                item = (float(scores[local_idx]), start + int(local_idx))
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item > heap[0]:
+                    heapq.heapreplace(heap, item)
+
+        # Sort by similarity (higher is better)
+        return [(idx, sim) for sim, idx in sorted(heap, reverse=True)]
+
+    def _metadata_mask(self, snapshot: Snapshot, start: int, end: int, where: Dict) -> np.ndarray:
+        """Boolean mask of in-memory rows matching a metadata filter."""
+        return np.fromiter(
+            (self._matches(snapshot.metadatas[idx], where) for idx in range(start, end)),
+            dtype=bool,
+            count=end - start
+        )
+
+    def _records_mask(self, snapshot: Snapshot, start: int, end: int, where: Dict) -> np.ndarray:
+        """Boolean mask of on-disk rows matching a metadata filter."""
+        return np.fromiter(
+            (
+                self._matches(record['metadata'], where)
+                for record in self._iter_records(snapshot, start, end)
+            ),
+            dtype=bool,
+            count=end - start
+        )
+
+    def _select_rows(
+        self,
+        snapshot: Snapshot,
+        ids: Optional[List[str]],
+        where: Optional[Dict]
+    ) -> np.ndarray:
+        """
+        Boolean mask of rows matching the given IDs and metadata filter.
+
+        With IDs only the rows found in the snapshot's ID map are read;
+        a metadata filter alone scans all records.
+        """
+        if ids:
+            rows = sorted(
+                row
+                for doc_id in set(ids)
+                for row in snapshot.id_rows.get(doc_id, ())
+                if row < snapshot.count
+            )
+            if where:
+                records = self._read_records(snapshot, rows)
+                rows = [row for row, record in zip(rows, records) if self._matches(record['metadata'], where)]
+            mask = np.zeros(snapshot.count, dtype=bool)
+            mask[rows] = True
+            return mask
+
+        mask = np.empty(snapshot.count, dtype=bool)
+        for start in range(0, snapshot.count, self.block_size):
+            end = min(start + self.block_size, snapshot.count)
+            mask[start:end] = [
+                not where or self._matches(record['metadata'], where)
+                for record in self._iter_records(snapshot, start, end)
+            ]
+        return mask
+
+    def _index_ids(self) -> Snapshot:
+        """
+        Build the ID map from the records on disk (mmap mode).
+
+        Done once, on the first lookup by ID; afterwards appends and
+        deletes keep the map up to date.
 
         Returns:
-            Cosine similarity (0-1)
+            Current snapshot, carrying the ID map
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot.id_rows is None:
+                id_rows: Dict[str, List[int]] = {}
+                for row, record in enumerate(self._iter_records(snapshot, 0, snapshot.count)):
+                    id_rows.setdefault(record['id'], []).append(row)
+                self._id_rows = id_rows
+                self._publish(snapshot.count)
+            return self._snapshot
+
+    def _map_ids(self, ids: List[str], start_row: int) -> None:
+        """Record rows of IDs appended at ``start_row`` in the ID map."""
+        if self._id_rows is None:
+            return
+        for row, doc_id in enumerate(ids, start_row):
+            self._id_rows.setdefault(doc_id, []).append(row)
+
+    @staticmethod
+    def _remap_id_rows(snapshot: Snapshot, keep: np.ndarray) -> Dict[str, List[int]]:
+        """
+        New ID map for the rows kept by a compaction.
+
+        A new dictionary is built, so older snapshots keep their own map.
+        """
+        new_rows = np.cumsum(keep) - 1
+        id_rows: Dict[str, List[int]] = {}
+        for doc_id, rows in snapshot.id_rows.items():
+            kept = [int(new_rows[row]) for row in rows if row < snapshot.count and keep[row]]
+            if kept:
+                id_rows[doc_id] = kept
+        return id_rows
+
+    @staticmethod
+    def _matches(metadata: Dict, where: Dict) -> bool:
+        """
+        Check whether metadata matches all filter conditions.
+
+        A condition is either a plain value (equality) or a dict with one
+        of the operators ``$eq``, ``$ne``, ``$in`` and ``$nin``.
+        """
+        for key, condition in where.items():
+            value = metadata.get(key)
+            if isinstance(condition, dict):
+                for operator, operand in condition.items():
+                    if operator not in WHERE_OPERATORS:
+                        raise ValueError(f"Unsupported filter operator: {operator}")
+                    if not WHERE_OPERATORS[operator](value, operand):
+                        return False
+            elif value != condition:
+                return False
+        return True
+
+    def _append_memory(
+        self,
+        vectors: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: List[str]
+    ) -> None:
         """
-        # Convert to numpy for easier calculation
-        v1 = np.array(vec1)
-        v2 = np.array(vec2)
+        Append rows to the in-memory buffer (memory mode).
 
-        # Cosine similarity
-        dot_product = np.dot(v1, v2)
-        norm1 = np.linalg.norm(v1)
-        norm2 = np.linalg.norm(v2)
+        Rows are written past the end of the published snapshot; when the
+        buffer is full a larger copy is made, leaving the old one intact
+        for readers that still hold it.
+        """
+        count = self._snapshot.count
+        needed = count + len(vectors)
+        if needed > len(self._buffer):
+            buffer = np.empty((max(needed, 2 * len(self._buffer), 1024), self.dimension), dtype=np.float32)
+            buffer[:count] = self._buffer[:count]
+            self._buffer = buffer
+        self._buffer[count:needed] = vectors
 
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self.ids.extend(ids)
+        self._map_ids(ids, count)
 
-        return float(dot_product / (norm1 * norm2))
+    def _compact_memory(self, snapshot: Snapshot, keep: np.ndarray) -> None:
+        """
+        Keep only the masked rows in fresh buffers (memory mode).
+
+        New lists and a new vector buffer are created, so older snapshots
+        keep their own.
+        """
+        rows = np.flatnonzero(keep)
+        self._buffer = np.ascontiguousarray(snapshot.vectors[rows], dtype=np.float32)
+        self.documents = [snapshot.documents[row] for row in rows]
+        self.metadatas = [snapshot.metadatas[row] for row in rows]
+        self.ids = [snapshot.ids[row] for row in rows]
+
+    def _compact_rows(self, snapshot: Snapshot, keep: np.ndarray) -> None:
+        """
+        Rewrite the on-disk files with only the masked rows (mmap mode).
+
+        New files are written next to the old ones and swapped in with
+        ``os.replace``; memory maps held by older snapshots keep the old
+        files alive until they are dropped.
+        """
+        tmp_files = {
+            path: path.with_suffix('.tmp')
+            for path in (self.vectors_file, self.records_file, self.offsets_file)
+        }
+        offsets = [0]
+        with open(tmp_files[self.vectors_file], 'wb') as vectors_out, \
+                open(tmp_files[self.records_file], 'wb') as records_out:
+            for start in range(0, snapshot.count, self.block_size):
+                end = min(start + self.block_size, snapshot.count)
+                rows = np.flatnonzero(keep[start:end]) + start
+                vectors_out.write(np.ascontiguousarray(snapshot.vectors[rows], dtype=np.float32).tobytes())
+                for row in rows:
+                    data = snapshot.records[snapshot.offsets[row]:snapshot.offsets[row + 1]].tobytes()
+                    records_out.write(data)
+                    offsets.append(offsets[-1] + len(data))
+        np.asarray(offsets, dtype=np.int64).tofile(tmp_files[self.offsets_file])
+
+        for path, tmp_file in tmp_files.items():
+            os.replace(tmp_file, path)
+
+    def _append_rows(
+        self,
+        vectors: np.ndarray,
+        documents: List[str],
+        metadatas: List[Dict],
+        ids: List[str]
+    ) -> None:
+        """
+        Append rows to the on-disk files (mmap mode).
+
+        Files are only ever appended to, so memory maps held by existing
+        snapshots stay valid. The manifest count is written last, so a
+        crash mid-append leaves trailing bytes that are ignored and
+        truncated on the next load (or, when nothing was recorded yet,
+        on the next append).
+        """
+        snapshot = self._snapshot
+        if snapshot.count == 0:
+            # Drop bytes of a first append that never reached the manifest
+            for path in (self.vectors_file, self.records_file, self.offsets_file):
+                if path.exists():
+                    with open(path, 'r+b') as f:
+                        f.truncate(0)
+        self._map_ids(ids, snapshot.count)
+        offset = int(snapshot.offsets[-1]) if snapshot.count else 0
+        offsets = []
+        with open(self.records_file, 'ab') as f:
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                line = json.dumps({'id': doc_id, 'document': document, 'metadata': metadata})
+                data = (line + '\n').encode('utf-8')
+                offsets.append(offset)
+                f.write(data)
+                offset += len(data)
+            offsets.append(offset)
+
+        with open(self.vectors_file, 'ab') as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        # Offsets file holds count + 1 entries: the last one is the end of
+        # records and doubles as the start of the next appended record
+        with open(self.offsets_file, 'ab') as f:
+            if snapshot.count:
+                offsets = offsets[1:]
+            f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+
+    def _open_offsets(self, count: int) -> np.ndarray:
+        """Memory-map the record offsets file (mmap mode)."""
+        return np.memmap(self.offsets_file, dtype=np.int64, mode='r', shape=(count + 1,))
+
+    def _open_records(self) -> np.ndarray:
+        """Memory-map the records file as bytes (mmap mode)."""
+        return np.memmap(self.records_file, dtype=np.uint8, mode='r')
+
+    def _iter_records(self, snapshot: Snapshot, start: int, end: int):
+        """Stream records for rows in [start, end) (from disk in mmap mode)."""
+        if self.storage != STORAGE_MMAP:
+            for row in range(start, end):
+                yield {'id': snapshot.ids[row], 'document': snapshot.documents[row], 'metadata': snapshot.metadatas[row]}
+            return
+
+        offsets = snapshot.offsets
+        data = snapshot.records[int(offsets[start]):int(offsets[end])].tobytes()
+        for line in data.splitlines():
+            yield json.loads(line)
+
+    def _read_records(self, snapshot: Snapshot, rows: List[int]) -> List[Dict]:
+        """Read records by row index (from disk in mmap mode)."""
+        if self.storage != STORAGE_MMAP:
+            return [
+                {'id': snapshot.ids[row], 'document': snapshot.documents[row], 'metadata': snapshot.metadatas[row]}
+                for row in rows
+            ]
+
+        offsets = snapshot.offsets
+        return [
+            json.loads(snapshot.records[int(offsets[row]):int(offsets[row + 1])].tobytes())
+            for row in rows
+        ]
+
+    def _read_manifest(self) -> Dict:
+        """Read collection manifest, if any."""
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not read manifest: {e}")
+        return {}
+
+    def _write_manifest(self) -> None:
+        """Atomically write collection manifest."""
+        manifest = {
+            'storage': self.storage,
+            'dimension': self.dimension,
+            'count': self._snapshot.count,
+            'block_size': self.block_size,
+            'index': self.index,
+            'index_params': self.index_params,
+            'size_bytes': self._size_on_disk()
+        }
+        tmp_file = self.manifest_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_file, self.manifest_file)
+        self._manifest = manifest
+
+    def _persist(self) -> None:
+        """Persist a write, or mark it unsaved inside ``batch_writes()``."""
+        if self.storage == STORAGE_MMAP:
+            self._write_manifest()
+        elif self._batch_depth:
+            self._unsaved = True
+        else:
+            self._save()
 
     def _save(self) -> None:
         """Save data to disk."""
+        count = self._snapshot.count
         data = {
-            'documents': self.documents,
-            'embeddings': self.embeddings,
-            'metadatas': self.metadatas,
-            'ids': self.ids
+            'documents': self.documents[:count],
+            'embeddings': self._buffer[:count].tolist(),
+            'metadatas': self.metadatas[:count],
+            'ids': self.ids[:count]
         }
 
         with open(self.db_file, 'w') as f:
             json.dump(data, f)
 
+        self._write_manifest()
+        self._unsaved = False
+
     def _load(self) -> None:
         """Load data from disk."""
+        if self.storage == STORAGE_MMAP:
+            self._load_mmap()
+            return
+
         if self.db_file.exists():
             try:
                 with open(self.db_file, 'r') as f:
                     data = json.load(f)
 
-                self.documents = data.get('documents', [])
-                self.embeddings = data.get('embeddings', [])
-                self.metadatas = data.get('metadatas', [])
-                self.ids = data.get('ids', [])
+                self.documents.extend(data.get('documents', []))
+                self.metadatas.extend(data.get('metadatas', []))
+                self.ids.extend(data.get('ids', []))
+                self._map_ids(self.ids, 0)
+                embeddings = data.get('embeddings', [])
+                if embeddings:
+                    self._buffer = np.asarray(embeddings, dtype=np.float32)
+                    self.dimension = int(self._buffer.shape[1])
+                self._publish(len(self.ids))
             except Exception as e:
                 print(f"Warning: Could not load existing data: {e}")
 
+    def _load_mmap(self) -> None:
+        """Open on-disk files (mmap mode), migrating a JSON collection if present."""
+        count = self._recorded_count
+        if count and self.dimension:
+            # The ID map is built from the records on first lookup by ID
+            self._id_rows = None
+            # Drop trailing bytes of an append that never reached the manifest
+            records_end = int(self._open_offsets(count)[count])
+            for path, size in (
+                (self.vectors_file, count * self.dimension * 4),
+                (self.offsets_file, (count + 1) * 8),
+                (self.records_file, records_end),
+            ):
+                if path.stat().st_size > size:
+                    with open(path, 'r+b') as f:
+                        f.truncate(size)
+            self._publish(count)
+
+        if self._migrate_to_mmap:
+            # Move an existing in-memory collection to out-of-core storage
+            legacy = SimpleVectorDB(self.persist_directory, self.collection_name, STORAGE_MEMORY)
+            legacy._ensure_loaded()
+            if legacy.count() > 0:
+                self.dimension = legacy.dimension
+                self._append_rows(legacy.vectors, legacy.documents, legacy.metadatas, legacy.ids)
+                self._publish(legacy.count())
+            self.db_file.unlink()
+
 
 class SimpleVectorDBClient:
-    """Client wrapper for SimpleVectorDB."""
+    """
+    Client wrapper for SimpleVectorDB.
+
+    Collection objects are shared by all clients in a process that point
+    at the same directory, so an indexer and a retriever see the same
+    data and it is loaded (lazily) only once.
+    """
 
     def __init__(self, path: str, settings=None):
         """Initialize client."""
-        self.path = Path(path)
-        self.collections: Dict[str, SimpleVectorDB] = {}
+        self.path = Path(path).resolve()
 
     def get_or_create_collection(self, name: str, metadata=None) -> SimpleVectorDB:
-        """Get or create collection."""
-        if name not in self.collections:
-            self.collections[name] = SimpleVectorDB(
-                persist_directory=self.path,
-                collection_name=name
-            )
-        return self.collections[name]
+        """
+        Get or create collection.
+
+        Recognized metadata keys: ``storage`` ("memory" or "mmap"),
+        ``block_size``, ``index`` ("flat" or "ivf") and the IVF parameters
+        ``n_lists``, ``nprobe``, ``sample_size``, ``imbalance_factor``,
+        ``retrain_growth`` and ``min_train_size``. Other keys are ignored.
+        They take effect when the collection is first opened in this
+        process.
+        """
+        key = (self.path, name)
+        with _shared_lock:
+            if key not in _shared_collections:
+                metadata = metadata or {}
+                _shared_collections[key] = SimpleVectorDB(
+                    persist_directory=self.path,
+                    collection_name=name,
+                    storage=metadata.get('storage'),
+                    block_size=metadata.get('block_size'),
+                    index=metadata.get('index'),
+                    index_params={key: metadata[key] for key in IVF_PARAMS if key in metadata} or None
+                )
+            return _shared_collections[key]
 
     def get_collection(self, name: str) -> SimpleVectorDB:
-        """Get existing collection."""
-        if name not in self.collections:
-            # Try to load from disk
-            db = SimpleVectorDB(
-                persist_directory=self.path,
-                collection_name=name
-            )
-            if db.count() > 0:
-                self.collections[name] = db
-            else:
-                raise ValueError(f"Collection '{name}' not found")
+        """Get existing collection (checked via its manifest, data loads lazily)."""
+        key = (self.path, name)
+        with _shared_lock:
+            if key not in _shared_collections:
+                db = SimpleVectorDB(
+                    persist_directory=self.path,
+                    collection_name=name
+                )
+                if db.count() == 0:
+                    raise ValueError(f"Collection '{name}' not found")
+                _shared_collections[key] = db
+
+            return _shared_collections[key]
+
+    def release_collection(self, name: str) -> None:
+        """
+        Forget the shared collection object.
+
+        The next ``get_collection`` reopens it from disk, picking up writes
+        made by other processes. Existing references keep working on the
+        data they loaded.
+        """
+        with _shared_lock:
+            _shared_collections.pop((self.path, name), None)
 
-        return self.collections[name]
+    def list_collections(self) -> List[Dict[str, Any]]:
+        """
+        Catalog of collections in this directory, read from manifests only.
+
+        Returns:
+            List of dictionaries with name, storage, index, dimension,
+            count and size_bytes
+        """
+        catalog = []
+        for manifest_file in sorted(self.path.glob('*.manifest.json')):
+            name = manifest_file.name[:-len('.manifest.json')]
+            try:
+                with open(manifest_file, 'r') as f:
+                    manifest = json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not read manifest {manifest_file}: {e}")
+                continue
+            catalog.append({
+                'name': name,
+                'storage': manifest.get('storage'),
+                'index': manifest.get('index'),
+                'dimension': manifest.get('dimension'),
+                'count': manifest.get('count'),
+                'size_bytes': manifest.get('size_bytes')
+            })
+        return catalog
 
     def delete_collection(self, name: str) -> None:
         """Delete collection."""
-        if name in self.collections:
-            del self.collections[name]
+        with _shared_lock:
+            _shared_collections.pop((self.path, name), None)
 
-        # Delete file
-        db_file = self.path / f"{name}.json"
-        if db_file.exists():
-            db_file.unlink()
+        # Delete files
+        for suffix in COLLECTION_FILES:
+            db_file = self.path / f"{name}{suffix}"
+            if db_file.exists():
+                db_file.unlink()
 
 
 def PersistentClient(path: str, settings=None):
@@ -0,0 +1,36 @@
+"""Vector database client: ChromaDB if installed, simple fallback otherwise."""
+
+from functools import lru_cache
+from pathlib import Path
+
+
+@lru_cache(maxsize=None)
+def _backend():
+    """
+    Pick the vector database backend once per process.
+
+    Returns:
+        Callable creating a persistent client for a directory
+    """
+    try:
+        import chromadb
+        from chromadb.config import Settings
+    except Exception as e:
+        print(f"ChromaDB not available ({e}), using simple fallback vector DB")
+        from .simple_vectordb import PersistentClient
+        return lambda path: PersistentClient(path=path)
+
+    return lambda path: chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False))
+
+
+def get_client(persist_directory: Path):
+    """
+    Open a persistent vector database client.
+
+    Args:
+        persist_directory: Directory with data
+
+    Returns:
+        ChromaDB ``PersistentClient`` or the ``SimpleVectorDB`` fallback
+    """
+    return _backend()(str(persist_directory))
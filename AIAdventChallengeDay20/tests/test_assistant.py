@@ -0,0 +1,88 @@
+"""Tests for DevelopmentAssistant answer generation."""
+
+import time
+
+from src.assistant.assistant import DevelopmentAssistant
+from src.assistant.stub_client import StubAnthropicClient
+
+
+class SlowRetriever:
+    def get_context_for_query(self, query):
+        time.sleep(0.3)
+        return f"[Source 1: docs/API.md]\nDocs for {query}"
+
+
+class SlowMCPServer:
+    def get_context(self, deadline=None):
+        time.sleep(0.3)
+        return {"branch": {"name": "feature/auth"}, "status": {}, "recent_commits": []}
+
+
+def _assistant(client):
+    assistant = DevelopmentAssistant(api_key="test")
+    assistant.client = client
+    assistant.retriever = SlowRetriever()
+    assistant.mcp_server = SlowMCPServer()
+    return assistant
+
+
+def test_context_is_gathered_in_parallel_and_answer_streamed():
+    assistant = _assistant(StubAnthropicClient(answer="Auth uses JWT."))
+    timings = {}
+
+    stream = assistant.stream_help("How does auth work?", timings)
+    assert next(stream) == "Auth "
+    assert list(stream) == ["uses ", "JWT."]
+
+    # Both context stages ran concurrently
+    assert timings["rag_context"] >= 0.3 and timings["git_context"] >= 0.3
+    assert timings["context"] < timings["rag_context"] + timings["git_context"] - 0.1
+    assert timings["first_token"] <= timings["answer"] <= timings["total"]
+
+    blocks = assistant.client.requests[0]["messages"][0]["content"]
+    assert "feature/auth" in blocks[0]["text"]
+    assert "Docs for How does auth work?" in blocks[1]["text"]
+
+
+def test_help_joins_streamed_answer():
+    assistant = _assistant(StubAnthropicClient(answer="a b c"))
+    assert assistant.help("question") == "a b c"
+    assert assistant.help(None).startswith("# Development Assistant")
+    # General help does not call the API
+    assert len(assistant.client.requests) == 1
+
+
+def test_stable_prefix_is_cached_across_questions():
+    client = StubAnthropicClient(min_cacheable_tokens=100)
+    assistant = _assistant(client)
+    # Long enough system prompt + git context to pass the cache minimum
+    assistant.system_prompt += "\n" + "Project conventions. " * 40
+
+    first, second = {}, {}
+    assistant.help("How does auth work?")
+    list(assistant.stream_help("Where are the API endpoints?", usage=first))
+    list(assistant.stream_help("What is the DB schema?", usage=second))
+
+    request = client.requests[0]
+    # Breakpoints after the system prompt and after the git context;
+    # the documentation and question come last, uncached
+    assert "cache_control" in request["system"][-1]
+    content = request["messages"][0]["content"]
+    assert "cache_control" in content[0] and "cache_control" not in content[1]
+    assert content[1]["text"].index("Docs for") < content[1]["text"].index("Question:")
+
+    assert first["cache_read_input_tokens"] > 0 and first["cache_creation_input_tokens"] == 0
+    assert second["cache_read_input_tokens"] == first["cache_read_input_tokens"]
+    assert second["input_tokens"] < second["cache_read_input_tokens"]
+
+    stats = assistant.usage_stats()
+    assert stats["requests"] == 3
+    assert stats["cache_creation_input_tokens"] == first["cache_read_input_tokens"]
+    assert 0.5 < stats["cache_hit_rate"] < 1.0
+
+    # A changed git context only reuses the system prompt prefix
+    assistant.mcp_server.get_context = lambda deadline=None: {"branch": {"name": "main"}}
+    usage = {}
+    list(assistant.stream_help("Anything new?", usage=usage))
+    assert 0 < usage["cache_read_input_tokens"] < first["cache_read_input_tokens"]
+    assert usage["cache_creation_input_tokens"] > 0
@@ -0,0 +1,28 @@
+"""Tests that CLI startup stays lazy."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def _loaded_modules(code):
+    script = f"import json, sys; {code}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+def test_cli_import_does_not_load_heavy_modules():
+    modules = _loaded_modules("import src.assistant.cli")
+    assert not modules & {"anthropic", "voyageai", "chromadb", "git", "numpy", "rich.markdown"}
+    assert not any(name.startswith(("src.rag.", "src.mcp.")) for name in modules - {"src.rag.config"})
+
+
+def test_git_context_does_not_touch_rag_stack():
+    modules = _loaded_modules(
+        "from src.assistant.assistant import DevelopmentAssistant; DevelopmentAssistant().get_git_context()"
+    )
+    assert "src.mcp.git_tools" in modules
+    assert not modules & {"anthropic", "voyageai", "numpy", "src.rag.retriever", "src.rag.indexer"}
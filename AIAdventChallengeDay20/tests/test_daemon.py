@@ -0,0 +1,61 @@
+"""Tests for the background assistant daemon."""
+
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from src.assistant.daemon import AssistantDaemon, DaemonUnavailable, is_running, request
+from src.rag.config import RAGConfig
+from src.rag.indexer import DocumentIndexer
+
+
+def test_daemon_serves_commands_and_follows_the_index(tmp_path, monkeypatch):
+    # Default data paths are relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(RAGConfig, "EMBEDDING_BACKEND", "local")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "auth.md").write_text("Authentication uses JWT tokens and refresh tokens.")
+    DocumentIndexer().index_directory(docs)
+
+    socket_path = tmp_path / "assistant.sock"
+    with pytest.raises(DaemonUnavailable):
+        request("ping", socket_path)
+
+    daemon = AssistantDaemon(socket_path)
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not is_running(socket_path):
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+    assert "auth.md" in request("files", socket_path, query="JWT authentication")
+    loaded = daemon.loaded_version
+
+    # Re-indexing bumps the index version: the daemon reopens the retriever
+    (docs / "cache.md").write_text("Redis caches sessions for ten minutes.")
+    DocumentIndexer().index_directory(docs)
+    assert "cache.md" in request("search", socket_path, query="redis session cache", limit=1)
+    assert daemon.loaded_version > loaded
+
+    with pytest.raises(RuntimeError, match="Unknown command"):
+        request("reindex", socket_path)
+
+    # Malformed requests get an error instead of no answer
+    assert socket_path.stat().st_mode & 0o077 == 0
+    for raw in (b"not json\n", b"[1, 2]\n"):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(5)
+            sock.connect(str(socket_path))
+            sock.sendall(raw)
+            response = json.loads(sock.makefile("rb").readline())
+        assert response["ok"] is False and "Malformed request" in response["error"]
+
+    assert request("shutdown", socket_path) == "stopping"
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert not socket_path.exists()
@@ -0,0 +1,90 @@
+"""Tests for the persistent embedding cache."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.rag.embedding_cache import EmbeddingCache
+from src.rag.embeddings import EmbeddingGenerator
+
+
+class FakeVoyageClient:
+    """Records the texts sent to the API."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts, model, input_type):
+        self.calls.append((list(texts), input_type))
+        offset = 1000.0 if input_type == "query" else 0.0
+        return SimpleNamespace(embeddings=[[float(len(text)) + offset, 1.0] for text in texts])
+
+
+def _generator(cache_path):
+    generator = EmbeddingGenerator(backend="local")
+    generator.client = FakeVoyageClient()
+    generator.cache = EmbeddingCache(cache_path, max_bytes=1 << 20)
+    return generator
+
+
+def test_only_misses_are_sent_and_keys_include_input_type(tmp_path):
+    generator = _generator(tmp_path / "cache.sqlite3")
+
+    first = generator.embed_batch(["alpha", "beta", "alpha"])
+    assert generator.client.calls == [(["alpha", "beta"], "document")]
+
+    second = generator.embed_batch(["beta", "gamma", "alpha"])
+    assert generator.client.calls[-1] == (["gamma"], "document")
+    assert second[0] == first[1] and second[2] == first[0]
+
+    # Same text as a query is a different key
+    assert generator.generate_query_embedding("alpha") == [1005.0, 1.0]
+    assert generator.client.calls[-1] == (["alpha"], "query")
+
+    # The cache survives a restart
+    reopened = _generator(tmp_path / "cache.sqlite3")
+    reopened.generate(["alpha", "beta", "gamma"])
+    assert reopened.client.calls == []
+
+    stats = generator.cache_stats()
+    assert (stats["hits"], stats["misses"]) == (2, 5)
+    assert stats["entries"] == 4
+
+
+def test_embedding_errors_are_raised(tmp_path):
+    generator = _generator(tmp_path / "cache.sqlite3")
+
+    def unavailable(texts, model, input_type):
+        raise ConnectionError("Voyage AI unavailable")
+    generator.client.embed = unavailable
+
+    with pytest.raises(ConnectionError):
+        generator.generate_query_embedding("alpha")
+    with pytest.raises(ConnectionError):
+        generator.generate(["alpha"])
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # Each 2-dim float32 vector is 8 bytes: room for 10 entries
+    cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=80)
+    cache.put_many("m", "document", [f"t{i}" for i in range(8)], [[float(i), 0.0] for i in range(8)])
+    cache.get_many("m", "document", ["t0"])  # refresh t0
+
+    cache.put_many("m", "document", [f"u{i}" for i in range(4)], [[1.0, 1.0]] * 4)
+
+    stats = cache.stats()
+    assert stats["size_bytes"] <= 72
+    assert cache.get_many("m", "document", ["t0", "t1", "u3"]) == [[0.0, 0.0], None, [1.0, 1.0]]
+
+
+def test_indexer_stats_report_cache(tmp_path):
+    from src.rag.indexer import DocumentIndexer
+
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=tmp_path / "db")
+    indexer.embedder.client = FakeVoyageClient()
+    indexer.embedder.cache = EmbeddingCache(tmp_path / "cache.sqlite3", max_bytes=1 << 20)
+    indexer.index_text("some text to index", doc_id="doc")
+    indexer.index_text("some text to index", doc_id="doc")
+
+    cache = indexer.get_stats()["embedding_cache"]
+    assert (cache["hits"], cache["misses"]) == (1, 1)
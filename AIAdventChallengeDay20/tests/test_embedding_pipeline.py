@@ -0,0 +1,90 @@
+"""Tests for the batched embedding pipeline."""
+
+import threading
+
+import pytest
+
+from src.rag.embedding_pipeline import EmbeddingError, EmbeddingPipeline
+
+
+class FlakyEmbedder:
+    """Embedder that fails every ``fail_every``-th call."""
+
+    def __init__(self, fail_every: int = 0):
+        self.fail_every = fail_every
+        self.calls = 0
+        self.batch_sizes = []
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self.batch_sizes.append(len(texts))
+        if self.fail_every and call % self.fail_every == 0:
+            raise RuntimeError("rate limited")
+        return [[float(len(text))] for text in texts]
+
+
+def _pipeline(embedder, **kwargs):
+    options = dict(
+        batch_size=10, max_batch_tokens=10_000, concurrency=3,
+        requests_per_minute=0, tokens_per_minute=0, max_retries=3, backoff_seconds=0.001
+    )
+    options.update(kwargs)
+    return EmbeddingPipeline(embedder, **options)
+
+
+def test_batches_respect_count_and_token_limits():
+    pipeline = _pipeline(FlakyEmbedder(), batch_size=4, max_batch_tokens=20)
+    texts = ["x" * 40] * 3 + ["y"] * 9  # 10 tokens each, then 1 token each
+
+    batches = pipeline.make_batches(texts)
+
+    assert [(b["start"], b["end"]) for b in batches] == [(0, 2), (2, 6), (6, 10), (10, 12)]
+
+
+def test_failed_batches_are_retried_individually():
+    embedder = FlakyEmbedder(fail_every=3)
+    texts = [f"text {i}" * (i % 5 + 1) for i in range(95)]
+    embeddings = {}
+
+    def collect(batch):
+        for row, vector in zip(range(batch["start"], batch["end"]), batch["embeddings"]):
+            embeddings[row] = vector
+
+    stats = _pipeline(embedder).run(texts, on_batch=collect)
+
+    assert stats["batches"] == 10
+    assert stats["texts"] == 95
+    assert stats["retries"] > 0
+    assert [embeddings[i][0] for i in range(95)] == [float(len(t)) for t in texts]
+
+
+def test_batch_failing_all_retries_raises():
+    with pytest.raises(EmbeddingError):
+        _pipeline(FlakyEmbedder(fail_every=1), max_retries=1).run(["a", "b"])
+
+
+def test_stream_is_consumed_as_batches_complete():
+    embedder = FlakyEmbedder()
+    pipeline = _pipeline(embedder, batch_size=5, concurrency=2)
+    produced = []
+    consumed_at_first_batch = []
+
+    def items():
+        for i in range(200):
+            produced.append(i)
+            yield f"text {i}", i
+
+    def on_batch(batch):
+        if not consumed_at_first_batch:
+            consumed_at_first_batch.append(len(produced))
+        assert batch["payloads"] == list(range(batch["start"], batch["end"]))
+        assert batch["total"] is None
+
+    stats = pipeline.run_stream(items(), on_batch=on_batch)
+
+    assert stats["texts"] == 200 and stats["batches"] == 40
+    # At most 2 * concurrency batches in flight before the first one is stored
+    assert consumed_at_first_batch[0] <= 5 * 4 + 1
@@ -0,0 +1,65 @@
+"""Tests for the file-level vector index."""
+
+import numpy as np
+import pytest
+
+from src.rag.config import RAGConfig
+from src.rag.file_index import FileVectorIndex
+from src.rag.indexer import DocumentIndexer
+from src.rag.retriever import DocumentRetriever
+
+
+@pytest.fixture
+def local_backend(monkeypatch):
+    monkeypatch.setattr(RAGConfig, "EMBEDDING_BACKEND", "local")
+
+
+def _write_docs(docs):
+    docs.mkdir()
+    # One long file dominates chunk-level matches for "vector database"
+    (docs / "vectors.md").write_text(" ".join(f"vector database index search part{i}" for i in range(600)))
+    (docs / "db.md").write_text("The vector database stores embeddings on disk.")
+    (docs / "git.md").write_text("Git tools show the current branch and recent commits.")
+    (docs / "chunks.md").write_text("The chunker splits markdown files into overlapping chunks.")
+
+
+def test_related_files_returns_distinct_files(tmp_path, local_backend):
+    docs = tmp_path / "docs"
+    _write_docs(docs)
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=tmp_path / "db")
+    indexer.index_directory(docs)
+    assert len(indexer.file_index) == 4
+
+    retriever = DocumentRetriever(collection_name="docs", persist_directory=tmp_path / "db")
+    for refine in (False, True):
+        files = retriever.get_related_files("vector database", limit=3, refine=refine)
+        assert len(files) == 3 == len(set(files))
+        assert set(files[:2]) == {str(docs / "vectors.md"), str(docs / "db.md")}
+    assert retriever.get_related_files("which git branch", limit=1, pooling="mean") == [str(docs / "git.md")]
+
+
+def test_file_index_follows_incremental_changes(tmp_path, local_backend):
+    docs = tmp_path / "docs"
+    _write_docs(docs)
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=tmp_path / "db")
+    indexer.index_directory(docs)
+    before = dict(zip(indexer.file_index.sources, indexer.file_index.mean))
+
+    (docs / "git.md").write_text("Branches, tags and commit history.")
+    (docs / "chunks.md").unlink()
+    indexer.index_directory(docs)
+
+    file_index = FileVectorIndex(RAGConfig.file_index_path(tmp_path / "db", "docs"))
+    after = dict(zip(file_index.sources, file_index.mean))
+    assert set(after) == {str(docs / name) for name in ("vectors.md", "db.md", "git.md")}
+    assert np.array_equal(after[str(docs / "db.md")], before[str(docs / "db.md")])
+    assert not np.array_equal(after[str(docs / "git.md")], before[str(docs / "git.md")])
+
+    # A lost file index is rebuilt from stored embeddings on the next sync
+    file_index.clear()
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=tmp_path / "db")
+    assert indexer.index_directory(docs) == 0
+    assert set(indexer.file_index.sources) == set(after)
+
+    indexer.clear_collection()
+    assert len(indexer.file_index) == 0
@@ -0,0 +1,200 @@
+"""Tests for git tools."""
+
+import time
+
+import git
+import pytest
+
+from src.mcp.git_tools import GitTools
+from src.mcp.server import MCPServer
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    (tmp_path / "a.txt").write_text("a\n")
+    repo.index.add(["a.txt"])
+    repo.index.commit("first")
+    return repo
+
+
+def _commit(repo, name, message):
+    path = f"{repo.working_tree_dir}/{name}"
+    with open(path, "w") as f:
+        f.write(message)
+    repo.git.add(name)
+    repo.git.commit("-m", message)
+
+
+def test_results_are_reused_until_the_repository_changes(repo):
+    tools = GitTools(repo.working_tree_dir)
+    commits = tools.get_recent_commits(limit=3)
+    assert [c["message"] for c in commits] == ["first"]
+    tools.get_current_branch()
+    assert tools.cache_stats()["misses"] == 2
+
+    assert tools.get_recent_commits(limit=3) == commits
+    tools.get_current_branch()
+    assert tools.cache_stats()["hits"] == 2
+
+    # Returned results are copies
+    commits[0]["message"] = "changed"
+    assert tools.get_recent_commits(limit=3)[0]["message"] == "first"
+
+    _commit(repo, "b.txt", "second")
+    assert [c["message"] for c in tools.get_recent_commits(limit=3)] == ["second", "first"]
+
+    repo.git.checkout("-b", "feature")
+    assert tools.get_current_branch()["name"] == "feature"
+    assert "feature" in tools.get_branches()
+
+
+def test_working_tree_results_expire(repo):
+    tools = GitTools(repo.working_tree_dir, worktree_ttl=60)
+    assert tools.get_status()["untracked"] == []
+
+    # Within the TTL the untracked scan is not repeated...
+    open(f"{repo.working_tree_dir}/new.txt", "w").close()
+    assert tools.get_status()["untracked"] == []
+    assert tools.cache_stats()["hits"] == 1
+
+    # ...but staging changes the index and invalidates it
+    repo.git.add("new.txt")
+    status = tools.get_status()
+    assert status["staged"] == ["new.txt"] and status["is_dirty"]
+
+    tools = GitTools(repo.working_tree_dir, worktree_ttl=0)
+    tools.get_status()
+    open(f"{repo.working_tree_dir}/other.txt", "w").close()
+    assert tools.get_status()["untracked"] == ["other.txt"]
+
+
+def test_commit_stats_are_batched_and_cached_on_disk(repo, monkeypatch):
+    _commit(repo, "b.txt", "one\ntwo\n")
+    repo.git.checkout("-b", "side")
+    _commit(repo, "c.txt", "side")
+    repo.git.checkout("master")
+    _commit(repo, "a.txt", "changed")
+    repo.git.merge("--no-ff", "-m", "merge", "side")
+
+    tools = GitTools(repo.working_tree_dir)
+    commits = list(repo.iter_commits())
+    stats = tools.get_commit_stats([c.hexsha for c in commits])
+    for commit in commits:
+        expected = commit.stats.total
+        assert stats[commit.hexsha] == {
+            "files": expected["files"], "insertions": expected["insertions"], "deletions": expected["deletions"]
+        }
+
+    assert "files_changed" not in tools.get_recent_commits(limit=2, with_stats=False)[0]
+    assert tools.get_recent_commits(limit=1)[0]["files_changed"] == 1
+
+    # A new process reads the stats from disk without running git
+    tools = GitTools(repo.working_tree_dir)
+    monkeypatch.setattr(git.cmd.Git, "log", None, raising=False)
+    assert tools.get_commit_stats([c.hexsha for c in commits]) == stats
+
+
+def test_status_matches_gitpython(repo, tmp_path):
+    clone = git.Repo.clone_from(repo.working_tree_dir, tmp_path / "clone")
+    with clone.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    root = clone.working_tree_dir
+    _commit(clone, "b c.txt", "ahead")
+    open(f"{root}/a.txt", "w").write("modified")
+    clone.git.mv("b c.txt", "renamed.txt")
+    (tmp_path / "clone" / "dir").mkdir()
+    open(f"{root}/dir/new.txt", "w").close()
+
+    status = GitTools(root).get_status()
+    assert status["branch"] == "master" and status["upstream"] == "origin/master"
+    assert (status["ahead"], status["behind"]) == (1, 0)
+    assert status["modified"] == [item.a_path for item in clone.index.diff(None)] == ["a.txt"]
+    assert status["staged"] == ["renamed.txt"]
+    assert status["untracked"] == clone.untracked_files == ["dir/new.txt"]
+    assert status["is_dirty"] == clone.is_dirty()
+
+    clone.git.checkout("--detach")
+    assert GitTools(root).get_status()["branch"] is None
+
+
+def test_file_history_follows_renames_and_new_commits(repo):
+    _commit(repo, "b.txt", "b")
+    repo.git.mv("a.txt", "moved.txt")
+    repo.git.commit("-m", "rename")
+    _commit(repo, "moved.txt", "edit moved")
+
+    tools = GitTools(repo.working_tree_dir)
+    assert [c["message"] for c in tools.get_file_history("moved.txt")] == ["edit moved", "rename", "first"]
+    assert [c["message"] for c in tools.get_file_history("moved.txt", limit=2)] == ["edit moved", "rename"]
+    assert [c["message"] for c in tools.get_file_history("b.txt")] == ["b"]
+
+    # Only new commits are indexed; a new process reuses the stored index
+    _commit(repo, "b.txt", "b again")
+    tools = GitTools(repo.working_tree_dir)
+    assert tools.path_index.update() == 1
+    assert [c["message"] for c in tools.get_file_history("b.txt")] == ["b again", "b"]
+
+    # Rewritten history is reindexed from scratch
+    repo.git.reset("--hard", "HEAD~2")
+    assert [c["message"] for c in tools.get_file_history("b.txt")] == ["b"]
+    assert len(tools.path_index.shas) == 3
+
+
+def test_diff_pages_cover_all_files(repo):
+    root = repo.working_tree_dir
+    for i in range(5):
+        _commit(repo, f"f{i}.txt", f"line {i}\n")
+    for i in range(5):
+        open(f"{root}/f{i}.txt", "a").write("more\n")
+    open(f"{root}/a.txt", "w").write("".join(f"long line {i}\n" for i in range(1000)))
+
+    tools = GitTools(root)
+    full = tools.get_diff(max_files=100, max_bytes=10**9)
+    assert full["cursor"] is None
+    assert [f["path"] for f in full["files"]] == ["a.txt"] + [f"f{i}.txt" for i in range(5)]
+
+    # Pages of at most two files; the large file comes alone and cut
+    pages, cursor = [], 0
+    while cursor is not None:
+        page = tools.get_diff(cursor=cursor, max_files=2, max_bytes=1000)
+        pages.append(page["files"])
+        cursor = page["cursor"]
+    assert [[f["path"] for f in files] for files in pages] == [["a.txt"], ["f0.txt", "f1.txt"], ["f2.txt", "f3.txt"], ["f4.txt"]]
+    assert pages[0][0]["truncated"] and len(pages[0][0]["diff"]) <= 1000
+    assert full["files"][0]["diff"].startswith(pages[0][0]["diff"])
+    assert pages[1] == full["files"][1:3]
+
+    stats = tools.get_diff(stat_only=True, paths=["f1.txt", "a.txt"])
+    assert stats == {"files": [
+        {"path": "a.txt", "insertions": 1000, "deletions": 1},
+        {"path": "f1.txt", "insertions": 1, "deletions": 0},
+    ], "cursor": None}
+
+    repo.git.mv("f0.txt", "renamed.txt")
+    staged = tools.get_diff(cached=True, stat_only=True)["files"]
+    assert staged == [{"path": "renamed.txt", "old_path": "f0.txt", "insertions": 0, "deletions": 0}]
+    assert [f["path"] for f in tools.get_diff(cached=True)["files"]] == ["renamed.txt"]
+
+
+def test_context_parts_run_in_parallel_within_deadline(repo, monkeypatch):
+    server = MCPServer(repo.working_tree_dir)
+    slow = lambda *args, **kwargs: time.sleep(0.3) or []
+    monkeypatch.setattr(server.git_tools, "get_recent_commits", slow)
+    monkeypatch.setattr(server.git_tools, "get_remote_info", lambda: time.sleep(0.3) or {})
+
+    start = time.monotonic()
+    context = server.get_context(deadline=5)
+    assert time.monotonic() - start < 0.5
+    assert context["timed_out"] == [] and context["status"]["is_dirty"] is False
+
+    monkeypatch.setattr(server.git_tools, "get_remote_info", lambda: time.sleep(2) or {})
+    start = time.monotonic()
+    context = server.get_context(deadline=0.5)
+    assert time.monotonic() - start < 1
+    assert context["timed_out"] == ["remotes"] and context["remotes"]["timed_out"]
+    assert context["recent_commits"] == [] and context["branch"]["commit_message"] == "first"
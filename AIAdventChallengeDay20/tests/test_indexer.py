@@ -0,0 +1,253 @@
+"""Tests for incremental document indexing."""
+
+import os
+import threading
+
+import pytest
+
+from src.rag.indexer import DocumentIndexer
+
+
+class CountingEmbedder:
+    """Embedder that records every text it embeds."""
+
+    def __init__(self):
+        self.texts = []
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts):
+        with self._lock:
+            self.texts.extend(texts)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97), 1.0] for text in texts]
+
+
+def _indexer(persist_dir):
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=persist_dir)
+    indexer.pipeline.embedder = CountingEmbedder()
+    return indexer
+
+
+def _ids(indexer):
+    snapshot = indexer.collection.snapshot()
+    return sorted(record["id"] for record in indexer.collection._read_records(snapshot, range(snapshot.count)))
+
+
+def test_reindex_embeds_only_changed_files(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.md").write_text(" ".join(f"{name}{i}" for i in range(700)))
+
+    indexer = _indexer(tmp_path / "db")
+    first = indexer.index_directory(docs)
+    ids_after_first = _ids(indexer)
+    assert first == len(ids_after_first) > 3
+
+    # Unchanged tree: no embedding calls, even with a fresh mtime
+    os.utime(docs / "a.md")
+    indexer.pipeline.embedder = CountingEmbedder()
+    assert indexer.index_directory(docs) == 0
+    assert indexer.pipeline.embedder.texts == []
+    assert _ids(indexer) == ids_after_first
+
+    # Change the tail of one file, delete another, add a new one
+    (docs / "b.md").write_text(" ".join(f"b{i}" for i in range(650)) + " changed tail")
+    (docs / "c.md").unlink()
+    (docs / "d.md").write_text("brand new file")
+
+    indexer = _indexer(tmp_path / "db")
+    indexer.index_directory(docs)
+
+    stats = indexer.last_sync_stats
+    assert (stats["added"], stats["changed"], stats["unchanged"], stats["deleted"]) == (1, 1, 1, 1)
+    # Only the last chunk of b.md and the new file were embedded
+    assert len(indexer.pipeline.embedder.texts) == 2
+    ids = _ids(indexer)
+    assert not any(i.startswith(str(docs / "c.md")) for i in ids)
+    assert len([i for i in ids if i.startswith(str(docs / "b.md"))]) == len(
+        [i for i in ids_after_first if i.startswith(str(docs / "b.md"))]
+    )
+    assert indexer.collection.count() == len(ids)
+
+
+def test_parallel_chunking_matches_sequential(tmp_path, monkeypatch):
+    from src.rag.config import RAGConfig
+
+    docs = tmp_path / "docs"
+    for i in range(12):
+        (docs / f"dir{i % 3}").mkdir(parents=True, exist_ok=True)
+        (docs / f"dir{i % 3}" / f"f{i}.md").write_text(" ".join(f"w{i}_{j}" for j in range(400 + i)))
+
+    sequential = _indexer(tmp_path / "seq")
+    sequential.index_directory(docs)
+
+    monkeypatch.setattr(RAGConfig, "CHUNK_PARALLEL_MIN_FILES", 1)
+    monkeypatch.setattr(RAGConfig, "CHUNK_WORKERS", 2)
+    monkeypatch.setattr(RAGConfig, "INDEX_QUEUE_SIZE", 2)
+    parallel = _indexer(tmp_path / "par")
+    parallel.index_directory(docs)
+
+    assert _ids(parallel) == _ids(sequential)
+    assert len(parallel.pipeline.embedder.texts) == len(_ids(sequential))
+
+
+def test_memory_collection_is_saved_once_per_run(tmp_path):
+    from src.rag.simple_vectordb import SimpleVectorDB
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(20):
+        (docs / f"f{i}.md").write_text(" ".join(f"w{i}_{j}" for j in range(300)))
+
+    indexer = _indexer(tmp_path / "db")
+    assert indexer.collection.storage == "memory"
+    indexer.pipeline.batch_size = 2
+    saves = []
+    save = indexer.collection._save
+    indexer.collection._save = lambda: (saves.append(1), save())
+
+    indexer.index_directory(docs)
+    assert indexer.last_run_stats["batches"] >= 10
+    assert len(saves) == 1
+
+    (docs / "f0.md").write_text("rewritten")
+    (docs / "f1.md").unlink()
+    indexer.index_directory(docs)
+    assert len(saves) == 2
+
+    # Re-keying a rename is part of the same single save
+    (docs / "f2.md").rename(docs / "moved.md")
+    indexer._sync_files(sorted(docs.glob("*.md")), docs, renamed=[(docs / "f2.md", docs / "moved.md")])
+    assert indexer.last_sync_stats["renamed"] == 1
+    assert len(saves) == 3
+
+    on_disk = SimpleVectorDB(tmp_path / "db", "docs")
+    assert on_disk.count() == indexer.collection.count()
+    assert sorted(on_disk.get()["ids"]) == _ids(indexer)
+
+
+def test_local_document_frequencies_drop_removed_chunks(tmp_path, monkeypatch):
+    from src.rag.config import RAGConfig
+
+    monkeypatch.setattr(RAGConfig, "EMBEDDING_BACKEND", "local")
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.md").write_text(" ".join(f"{name}{i}" for i in range(700)))
+
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=tmp_path / "db")
+    indexer.index_directory(docs)
+    (docs / "b.md").write_text(" ".join(f"b{i}" for i in range(650)) + " changed tail")
+    (docs / "c.md").unlink()
+    indexer.index_directory(docs)
+    indexer._rekey_files(indexer._load_files_manifest()["files"], [(docs / "a.md", docs / "moved.md")])
+
+    # Same statistics as indexing the final tree from scratch
+    fresh = DocumentIndexer(collection_name="docs", persist_directory=tmp_path / "fresh")
+    fresh.index_directory(docs)
+    assert indexer.embedder.local.document_count == fresh.embedder.local.document_count == indexer.collection.count()
+    assert (indexer.embedder.local.document_frequencies == fresh.embedder.local.document_frequencies).all()
+
+
+def test_since_last_reindexes_git_changes_and_rekeys_renames(tmp_path, capsys):
+    git = pytest.importorskip("git")
+    from src.mcp.git_tools import GitTools
+
+    repo_dir = tmp_path / "repo"
+    docs = repo_dir / "docs"
+    docs.mkdir(parents=True)
+    repo = git.Repo.init(repo_dir)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    for name in ("a", "b", "c"):
+        (docs / f"{name}.md").write_text(" ".join(f"{name}{i}" for i in range(300)))
+    repo.index.add(["docs/a.md", "docs/b.md", "docs/c.md"])
+    repo.index.commit("docs")
+
+    git_tools = GitTools(repo_dir)
+    indexer = _indexer(tmp_path / "db")
+    indexer.index_directory(docs)
+    indexer.record_commit(git_tools.get_head_commit())
+    ids_before = _ids(indexer)
+
+    repo.git.mv("docs/a.md", "docs/renamed.md")
+    (docs / "b.md").write_text("rewritten")
+    repo.index.remove(["docs/c.md"], working_tree=True)
+    repo.index.commit("rename, edit, delete")
+    (docs / "new.md").write_text("untracked file")
+
+    changes = git_tools.get_changed_files(indexer.indexed_commit)
+    assert changes["renamed"] == [["docs/a.md", "docs/renamed.md"]]
+
+    indexer.pipeline.embedder = CountingEmbedder()
+    capsys.readouterr()
+    indexer.index_changes(docs, changes)
+    # c.md is deleted in git and gone from disk, a.md was renamed: neither counts twice
+    assert "2 changed, 1 deleted, 1 renamed" in capsys.readouterr().out
+
+    # Only the edited and the new file were embedded
+    assert sorted(indexer.pipeline.embedder.texts) == ["rewritten", "untracked file"]
+    stats = indexer.last_sync_stats
+    assert (stats["renamed"], stats["deleted"]) == (1, 1)
+
+    ids = _ids(indexer)
+    a_ids = [i for i in ids_before if i.startswith(str(docs / "a.md"))]
+    assert sorted(i.replace("a.md", "renamed.md", 1) for i in a_ids) == [
+        i for i in ids if i.startswith(str(docs / "renamed.md"))
+    ]
+    assert not any(i.startswith((str(docs / "a.md"), str(docs / "c.md"))) for i in ids)
+    record = indexer.collection.get(ids=[ids[-1]])
+    assert record["metadatas"][0]["source"] == ids[-1].split("#")[0]
+
+    # A full scan afterwards finds nothing to do
+    indexer.pipeline.embedder = CountingEmbedder()
+    assert indexer.index_directory(docs) == 0
+
+
+def test_since_last_rechecks_uncommitted_files(tmp_path):
+    git = pytest.importorskip("git")
+    from src.mcp.git_tools import GitTools
+
+    repo_dir = tmp_path / "repo"
+    docs = repo_dir / "docs"
+    docs.mkdir(parents=True)
+    repo = git.Repo.init(repo_dir)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    (docs / "a.md").write_text("committed text")
+    repo.index.add(["docs/a.md"])
+    repo.index.commit("docs")
+
+    # Indexed while dirty: an edited tracked file and two untracked files
+    (docs / "a.md").write_text("uncommitted edit")
+    (docs / "scratch.md").write_text("scratch notes")
+    (docs / "keep.md").write_text("kept untracked notes")
+    git_tools = GitTools(repo_dir)
+    indexer = _indexer(tmp_path / "db")
+    indexer.index_directory(docs)
+    head = git_tools.get_head_commit()
+    indexer.record_commit(head, indexer.uncommitted_files(docs, git_tools.get_changed_files(head)))
+
+    # Revert the edit and delete an untracked file: the diff is empty
+    repo.git.checkout("--", "docs/a.md")
+    (docs / "scratch.md").unlink()
+    changes = git_tools.get_changed_files(indexer.indexed_commit)
+    assert changes["added"] == changes["modified"] == changes["deleted"] == []
+
+    chunked = []
+    iter_file_chunks = indexer.chunker.iter_file_chunks
+    indexer.chunker.iter_file_chunks = lambda paths, hashes: (chunked.extend(paths), iter_file_chunks(paths, hashes))[1]
+    indexer.pipeline.embedder = CountingEmbedder()
+    indexer.index_changes(docs, changes)
+
+    # Only the reverted file is read again; the unchanged untracked one is not
+    assert chunked == [docs / "a.md"]
+    assert indexer.pipeline.embedder.texts == ["committed text"]
+    assert indexer.last_sync_stats["deleted"] == 1
+    assert {record.split("#")[0] for record in _ids(indexer)} == {str(docs / "a.md"), str(docs / "keep.md")}
+    assert indexer.collection.get(where={"source": str(docs / "a.md")})["documents"] == ["committed text"]
+
+    indexer.record_commit(head, indexer.uncommitted_files(docs, git_tools.get_changed_files(head)))
+    assert indexer._load_files_manifest()["uncommitted"] == [str(docs / "keep.md")]
@@ -0,0 +1,55 @@
+"""Tests for the offline embedding backend."""
+
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from src.rag.local_embeddings import LocalEmbedder
+
+DOCS = [
+    "The retriever returns the top k chunks from the vector database",
+    "Git tools show the current branch and recent commits",
+    "Embeddings are generated with Voyage AI or the local backend",
+    "The indexer splits markdown files into overlapping chunks",
+]
+
+
+def test_embeddings_are_identical_across_processes(tmp_path):
+    script = (
+        "import json, sys; sys.path.insert(0, '.');"
+        "from src.rag.local_embeddings import LocalEmbedder;"
+        f"print(json.dumps(LocalEmbedder(256).embed_documents({DOCS!r})))"
+    )
+    outputs = [
+        subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True, text=True, check=True,
+            env={**os.environ, "PYTHONHASHSEED": seed}
+        ).stdout.splitlines()[-1]
+        for seed in ("1", "2")
+    ]
+    assert outputs[0] == outputs[1]
+    assert np.allclose(json.loads(outputs[0]), LocalEmbedder(256).embed_documents(DOCS))
+
+
+def test_queries_rank_relevant_documents_first(tmp_path):
+    embedder = LocalEmbedder(stats_path=tmp_path / "df.npy")
+    documents = np.array(embedder.embed_documents(DOCS))
+
+    for query, expected in [
+        ("which git branch am I on", 1),
+        ("top results from the vector database", 0),
+        ("how are markdown files chunked", 3),
+    ]:
+        assert int(np.argmax(documents @ np.array(embedder.embed_query(query)))) == expected
+
+    # IDF statistics are shared through the stats file
+    reopened = LocalEmbedder(stats_path=tmp_path / "df.npy")
+    assert reopened.document_count == len(DOCS)
+    assert reopened.embed_query("git branch") == embedder.embed_query("git branch")
+
+    reopened.reset_statistics()
+    assert not (tmp_path / "df.npy").exists()
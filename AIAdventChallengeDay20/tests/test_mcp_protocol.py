@@ -0,0 +1,122 @@
+"""Tests for the JSON-RPC MCP transport."""
+
+import io
+import json
+import threading
+import time
+import urllib.request
+
+import git
+import pytest
+
+from src.mcp.protocol import MCPProtocol, make_http_server, serve_stdio
+from src.mcp.server import MCPServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    repo = git.Repo.init(tmp_path)
+    (tmp_path / "a.txt").write_text("a\n")
+    repo.index.add(["a.txt"])
+    repo.index.commit("first")
+    server = MCPServer(tmp_path)
+    server.tools["sleep"] = lambda seconds: time.sleep(seconds) or "slept"
+    return server
+
+
+@pytest.fixture
+def protocol(server):
+    protocol = MCPProtocol(server, workers=4, tool_timeouts={"sleep": 1.0})
+    yield protocol
+    protocol.close()
+
+
+def _call(request_id, name, **arguments):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+
+
+def test_handshake_and_tool_listing(protocol):
+    init = protocol.handle({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {"protocolVersion": "2024-11-05"}})
+    assert init["result"]["protocolVersion"] == "2024-11-05"
+    assert protocol.handle({"jsonrpc": "2.0", "method": "notifications/initialized"}) is None
+
+    tools = {tool["name"]: tool for tool in protocol.handle({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})["result"]["tools"]}
+    assert tools["get_file_history"]["inputSchema"]["required"] == ["file_path"]
+    assert tools["get_diff"]["inputSchema"]["required"] == []
+
+    result = protocol.handle(_call(3, "get_current_branch"))["result"]
+    assert not result["isError"] and json.loads(result["content"][0]["text"])["commit_message"] == "first"
+    assert protocol.handle(_call(4, "missing"))["error"]["code"] == -32602
+    assert protocol.handle({"jsonrpc": "2.0", "id": 5, "method": "missing"})["error"]["code"] == -32601
+    assert protocol.handle([])["error"]["code"] == -32600
+
+
+def test_batch_runs_tools_concurrently_with_timeouts(protocol):
+    start = time.monotonic()
+    responses = protocol.handle([_call(i, "sleep", seconds=0.3) for i in range(4)] + [_call(9, "sleep", seconds=5)])
+    assert time.monotonic() - start < 1.5
+    assert [r["id"] for r in responses] == [0, 1, 2, 3, 9]
+    assert all(r["result"]["content"][0]["text"] == "slept" for r in responses[:4])
+    assert responses[4]["result"]["isError"] and "timed out" in responses[4]["result"]["content"][0]["text"]
+
+    bad = protocol.handle(_call(10, "sleep", wrong=1))["result"]
+    assert bad["isError"] and "TypeError" in bad["content"][0]["text"]
+
+    metrics = protocol.handle({"jsonrpc": "2.0", "id": 11, "method": "server/metrics"})["result"]["sleep"]
+    assert (metrics["calls"], metrics["ok"], metrics["timeout"], metrics["error"]) == (6, 4, 1, 1)
+    assert 250 < metrics["p50_ms"] < 1000
+
+
+def test_cancelled_call_is_not_answered(protocol):
+    responses = []
+    worker = threading.Thread(target=lambda: responses.append(protocol.handle(_call("slow", "sleep", seconds=0.5), "s1")))
+    worker.start()
+    time.sleep(0.1)
+    # Same id in another session is a different request
+    protocol.handle({"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": "slow"}}, "s2")
+    protocol.handle({"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": "slow"}}, "s1")
+    worker.join()
+    assert responses == [None]
+    assert protocol.metrics.snapshot()["sleep"]["cancelled"] == 1
+
+
+def test_stdio_transport(protocol):
+    lines = [
+        json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}),
+        "not json",
+        json.dumps([_call(2, "get_branches"), {"jsonrpc": "2.0", "method": "notifications/initialized"}]),
+    ]
+    output = io.StringIO()
+    serve_stdio(protocol, io.StringIO("\n".join(lines) + "\n"), output)
+    responses = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert {"jsonrpc": "2.0", "id": 1, "result": {}} in responses
+    assert any(r.get("error", {}).get("code") == -32700 for r in responses if isinstance(r, dict))
+    batch = next(r for r in responses if isinstance(r, list))
+    assert len(batch) == 1 and batch[0]["id"] == 2 and not batch[0]["result"]["isError"]
+
+
+def test_http_transport(protocol):
+    server = make_http_server(protocol, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/mcp"
+
+    def post(message, headers=None):
+        request = urllib.request.Request(url, json.dumps(message).encode(), {"Content-Type": "application/json", **(headers or {})})
+        return urllib.request.urlopen(request)
+
+    try:
+        with post({"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}) as response:
+            session = response.headers["Mcp-Session-Id"]
+            assert session and json.loads(response.read())["result"]["serverInfo"]["name"] == MCPServer.NAME
+        with post({"jsonrpc": "2.0", "method": "notifications/initialized"}, {"Mcp-Session-Id": session}) as response:
+            assert response.status == 202
+        with post([_call(2, "get_branches"), _call(3, "sleep", seconds=0.01)], {"Mcp-Session-Id": session}) as response:
+            assert [r["id"] for r in json.loads(response.read())] == [2, 3]
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics") as response:
+            assert json.loads(response.read())["get_branches"]["calls"] == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post({"jsonrpc": "2.0", "id": 4, "method": "ping"}, {"Origin": "http://evil.example"})
+        assert error.value.code == 403
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,81 @@
+"""Tests for the versioned query result cache."""
+
+from src.rag.indexer import DocumentIndexer
+from src.rag.query_cache import QueryCache
+from src.rag.retriever import DocumentRetriever
+
+
+class FakeEmbedder:
+    """Embedder with a fixed 3-dimensional space that counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_batch(self, texts):
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+    def generate_query_embedding(self, text):
+        self.calls += 1
+        return [float(len(text)), 1.0, 0.0]
+
+
+def _retriever(persist_dir, **kwargs):
+    retriever = DocumentRetriever(collection_name="docs", persist_directory=persist_dir, **kwargs)
+    retriever.embedder = FakeEmbedder()
+    return retriever
+
+
+def test_cache_hits_until_index_changes(tmp_path):
+    indexer = DocumentIndexer(collection_name="docs", persist_directory=tmp_path)
+    indexer.pipeline.embedder = FakeEmbedder()
+    indexer.index_text("first document", {"source": "a.md"})
+
+    retriever = _retriever(tmp_path)
+    first = retriever.search("Auth  Flow", top_k=2)
+    # Case and whitespace are normalized
+    assert retriever.search("auth flow", top_k=2) == first
+    assert retriever.embedder.calls == 1
+    # A different top_k or filter is a different entry
+    retriever.search("auth flow", top_k=1)
+    retriever.search("auth flow", top_k=2, filter_metadata={"source": "a.md"})
+    assert retriever.embedder.calls == 3
+
+    # Any index write invalidates cached results
+    indexer.index_text("second document", {"source": "b.md"})
+    second = retriever.search("auth flow", top_k=2)
+    assert retriever.embedder.calls == 4
+    assert len(second) == 2 != len(first)
+
+    stats = retriever.cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 4)
+    assert stats["index_version"] == indexer.version.read()
+
+
+def test_persisted_cache_is_shared_across_instances(tmp_path):
+    DocumentIndexer(collection_name="docs", persist_directory=tmp_path).version.bump()
+
+    retriever = _retriever(tmp_path, persist_cache=True)
+    results = retriever.search("query", top_k=3)
+
+    other = _retriever(tmp_path, persist_cache=True)
+    assert other.search("query", top_k=3) == results
+    assert other.embedder.calls == 0
+
+    # Disabled cache stores nothing
+    disabled = _retriever(tmp_path, cache_size=0)
+    disabled.search("query", top_k=3)
+    disabled.search("query", top_k=3)
+    assert disabled.embedder.calls == 2
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 0, [1])
+    cache.put("b", 0, [2])
+    assert cache.get("a", 0) == [1]
+    cache.put("c", 0, [3])
+
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == [1]
+    assert cache.get("c", 1) is None
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,359 @@
+"""Tests for the simple vector DB fallback."""
+
+import numpy as np
+import pytest
+
+from src.rag.simple_vectordb import SimpleVectorDB, PersistentClient
+
+
+def _rows(n: int, dim: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    documents = [f"doc {i}" for i in range(n)]
+    metadatas = [{"source": f"file_{i % 7}.md", "n": i} for i in range(n)]
+    ids = [f"id_{i}" for i in range(n)]
+    return vectors, documents, metadatas, ids
+
+
+def _brute_force(vectors, query, k, mask=None):
+    sims = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    order = [i for i in np.argsort(-sims) if mask is None or mask[i]]
+    return [f"id_{i}" for i in order[:k]]
+
+
+@pytest.mark.parametrize("storage", ["memory", "mmap"])
+def test_query_matches_brute_force(tmp_path, storage):
+    vectors, documents, metadatas, ids = _rows(1000)
+    db = SimpleVectorDB(tmp_path, "docs", storage=storage, block_size=64)
+    db.add(vectors.tolist(), documents, metadatas, ids)
+
+    query = vectors[3] + 0.1
+    result = db.query([query.tolist()], n_results=10)
+
+    assert result["ids"][0] == _brute_force(vectors, query, 10)
+    assert result["documents"][0][0] == "doc 3"
+    assert result["distances"][0] == sorted(result["distances"][0])
+
+
+@pytest.mark.parametrize("storage", ["memory", "mmap"])
+def test_where_filter(tmp_path, storage):
+    vectors, documents, metadatas, ids = _rows(500)
+    db = SimpleVectorDB(tmp_path, "docs", storage=storage, block_size=50)
+    db.add(vectors.tolist(), documents, metadatas, ids)
+
+    query = vectors[10]
+    result = db.query([query.tolist()], n_results=5, where={"source": "file_3.md"})
+
+    mask = [m["source"] == "file_3.md" for m in metadatas]
+    assert result["ids"][0] == _brute_force(vectors, query, 5, mask)
+    assert all(m["source"] == "file_3.md" for m in result["metadatas"][0])
+
+
+@pytest.mark.parametrize("storage,index", [("memory", "flat"), ("mmap", "ivf")])
+def test_query_without_results(tmp_path, storage, index):
+    vectors, documents, metadatas, ids = _rows(600)
+    db = SimpleVectorDB(tmp_path, "docs", storage=storage, index=index, index_params={"min_train_size": 500})
+    db.add(vectors.tolist(), documents, metadatas, ids)
+
+    for n_results in (0, -1):
+        result = db.query([vectors[0].tolist()], n_results=n_results)
+        assert result == {"documents": [[]], "metadatas": [[]], "distances": [[]], "ids": [[]]}
+    assert db._blocked_top_k(db.vectors, vectors[0], 0) == []
+
+
+def test_mmap_persists_across_batches_and_reopen(tmp_path):
+    vectors, documents, metadatas, ids = _rows(300)
+    db = SimpleVectorDB(tmp_path, "docs", storage="mmap", block_size=32)
+    for start in range(0, 300, 100):
+        end = start + 100
+        db.add(vectors[start:end].tolist(), documents[start:end], metadatas[start:end], ids[start:end])
+
+    # Storage mode is recorded in the manifest
+    reopened = PersistentClient(str(tmp_path)).get_collection("docs")
+    assert reopened.storage == "mmap"
+    assert reopened.count() == 300
+
+    query = vectors[250]
+    result = reopened.query([query.tolist()], n_results=3)
+    assert result["ids"][0] == _brute_force(vectors, query, 3)
+    assert result["metadatas"][0][0] == metadatas[250]
+
+
+def test_mmap_recovers_from_partial_first_append(tmp_path):
+    vectors, documents, metadatas, ids = _rows(3, dim=4)
+    db = SimpleVectorDB(tmp_path, "docs", storage="mmap")
+    db._write_manifest()
+    # A first append that crashed before the manifest recorded any rows
+    db.records_file.write_text('{"id": "x", "document": "GARBAGE", "metadata": {}}\n')
+    db.vectors_file.write_bytes(np.ones(4, dtype=np.float32).tobytes())
+    db.offsets_file.write_bytes(np.array([0, 50], dtype=np.int64).tobytes())
+
+    reopened = SimpleVectorDB(tmp_path, "docs")
+    assert reopened.count() == 0
+    reopened.add(vectors[:2].tolist(), documents[:2], metadatas[:2], ["a", "b"])
+
+    for db in (reopened, SimpleVectorDB(tmp_path, "docs")):
+        result = db.get(ids=["a", "b", "x"])
+        assert result["ids"] == ["a", "b"]
+        assert result["documents"] == documents[:2]
+        assert db.query([vectors[0].tolist()], n_results=5)["ids"][0][0] == "a"
+        assert db.count() == 2
+
+
+def test_mmap_migrates_json_collection(tmp_path):
+    vectors, documents, metadatas, ids = _rows(50)
+    SimpleVectorDB(tmp_path, "docs").add(vectors.tolist(), documents, metadatas, ids)
+
+    db = SimpleVectorDB(tmp_path, "docs", storage="mmap")
+
+    assert db.count() == 50
+    assert db.query([vectors[7].tolist()], n_results=1)["ids"][0] == ["id_7"]
+    assert not (tmp_path / "docs.json").exists()
+
+
+def _clustered_rows(n: int, dim: int = 32, clusters: int = 20, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    labels = rng.integers(0, clusters, size=n)
+    vectors = (centers[labels] + 0.05 * rng.normal(size=(n, dim))).astype(np.float32)
+    return vectors, [f"doc {i}" for i in range(n)], [{"n": i} for i in range(n)], [f"id_{i}" for i in range(n)]
+
+
+IVF_METADATA = {"index": "ivf", "n_lists": 20, "nprobe": 4, "min_train_size": 500}
+
+
+@pytest.mark.parametrize("storage", ["memory", "mmap"])
+def test_ivf_index_recall(tmp_path, storage):
+    vectors, documents, metadatas, ids = _clustered_rows(2000)
+    db = PersistentClient(str(tmp_path)).get_or_create_collection(
+        "docs", metadata={**IVF_METADATA, "storage": storage}
+    )
+    for start in range(0, 2000, 400):
+        end = start + 400
+        db.add(vectors[start:end].tolist(), documents[start:end], metadatas[start:end], ids[start:end])
+
+    assert db.ivf.trained
+    assert int(db.ivf.sizes.sum()) == 2000
+
+    hits = 0
+    for row in range(0, 2000, 97):
+        result = db.query([vectors[row].tolist()], n_results=10)
+        hits += len(set(result["ids"][0]) & set(_brute_force(vectors, vectors[row], 10)))
+    assert hits / (10 * len(range(0, 2000, 97))) > 0.9
+
+    # Probing every cell is exact
+    query = vectors[5]
+    assert db.query([query.tolist()], n_results=10, nprobe=20)["ids"][0] == _brute_force(vectors, query, 10)
+
+
+def test_ivf_index_reloads_and_assigns_new_rows(tmp_path):
+    vectors, documents, metadatas, ids = _clustered_rows(1200)
+    db = SimpleVectorDB(tmp_path, "docs", index="ivf", index_params={"n_lists": 10, "min_train_size": 500})
+    db.add(vectors[:1000].tolist(), documents[:1000], metadatas[:1000], ids[:1000])
+
+    reopened = SimpleVectorDB(tmp_path, "docs")
+    assert reopened.index == "ivf"
+
+    reopened.query([vectors[0].tolist()], n_results=1)  # loads and builds cell blocks
+    assert reopened.ivf.n_lists == 10
+    reopened.add(vectors[1000:].tolist(), documents[1000:], metadatas[1000:], ids[1000:])
+
+    assert int(reopened.ivf.sizes.sum()) == 1200
+    assert sum(len(rows) for rows in reopened.snapshot().ivf.list_rows) == 1200
+    assert reopened.query([vectors[1100].tolist()], n_results=1, nprobe=10)["ids"][0] == ["id_1100"]
+
+
+def test_ivf_retrains_when_unbalanced(tmp_path):
+    vectors, documents, metadatas, ids = _clustered_rows(600, clusters=10)
+    db = SimpleVectorDB(
+        tmp_path, "docs", index="ivf",
+        index_params={"n_lists": 10, "min_train_size": 500, "imbalance_factor": 2.0}
+    )
+    db.add(vectors.tolist(), documents, metadatas, ids)
+    before = db.ivf.centroids.copy()
+
+    # A burst of rows around one point overloads a single cell
+    burst = np.repeat(vectors[:1], 1000, axis=0) + 0.01
+    db.add(burst.tolist(), ["burst"] * 1000, [{}] * 1000, [f"burst_{i}" for i in range(1000)])
+
+    assert not np.array_equal(before, db.ivf.centroids)
+    assert int(db.ivf.sizes.sum()) == 1600
+
+
+def test_ivf_clustered_data_does_not_retrain_on_every_add(tmp_path, monkeypatch):
+    # Half the rows in one tight cluster: cells stay unbalanced after training
+    dense, documents, metadatas, ids = _clustered_rows(1200, clusters=1, seed=3)
+    spread, _, _, _ = _clustered_rows(1200, clusters=40, seed=4)
+    vectors = np.concatenate([dense[:600], spread[:600]])
+    vectors = vectors[np.random.default_rng(5).permutation(1200)]
+    db = SimpleVectorDB(
+        tmp_path, "docs", index="ivf",
+        index_params={"n_lists": 10, "min_train_size": 500, "imbalance_factor": 2.0, "retrain_growth": 0.5}
+    )
+    db.add(vectors[:600].tolist(), documents[:600], metadatas[:600], ids[:600])
+    db.query([vectors[0].tolist()], n_results=1)
+    assert db.ivf.sizes.max() > 2.0 * db.ivf.sizes.mean()
+
+    trainings = []
+    train = db.ivf.train
+    monkeypatch.setattr(db.ivf, "train", lambda v: (trainings.append(len(v)), train(v)))
+    for start in range(600, 1200, 30):
+        end = start + 30
+        db.add(vectors[start:end].tolist(), documents[start:end], metadatas[start:end], ids[start:end])
+
+    # One retrain once the collection grew by half, not one per batch
+    assert trainings == [900]
+    assert db.ivf.lists_file.exists()
+    assert sum(len(rows) for rows in db.snapshot().ivf.list_rows) == 1200
+    assert db.query([vectors[1100].tolist()], n_results=1, nprobe=10)["ids"][0] == ["id_1100"]
+
+
+@pytest.mark.parametrize("storage,index", [("memory", "flat"), ("mmap", "flat"), ("mmap", "ivf")])
+def test_delete_by_ids_and_where(tmp_path, storage, index):
+    vectors, documents, metadatas, ids = _rows(700)
+    db = SimpleVectorDB(
+        tmp_path, "docs", storage=storage, block_size=64, index=index,
+        index_params={"n_lists": 8, "min_train_size": 300}
+    )
+    db.add(vectors.tolist(), documents, metadatas, ids)
+    query = vectors[10]
+    db.query([query.tolist()], n_results=5)  # builds IVF cells before deleting
+    old_snapshot = db.snapshot()
+
+    db.delete(ids=["id_10", "id_11"])
+    db.delete(where={"source": {"$in": ["file_1.md", "file_2.md"]}})
+
+    keep = np.array([
+        i not in (10, 11) and metadatas[i]["source"] not in ("file_1.md", "file_2.md")
+        for i in range(700)
+    ])
+    assert db.count() == int(keep.sum())
+    expected = [i for i in _brute_force(vectors, query, 700) if keep[int(i[3:])]][:10]
+    assert db.query([query.tolist()], n_results=10, nprobe=8)["ids"][0] == expected
+
+    # Readers holding the old snapshot still see the old rows
+    assert db._read_records(old_snapshot, [10])[0]["id"] == "id_10"
+
+    reopened = SimpleVectorDB(tmp_path, "docs")
+    reopened._ensure_loaded()
+    assert reopened.count() == int(keep.sum())
+    assert reopened.query([query.tolist()], n_results=10, nprobe=8)["ids"][0] == expected
+
+
+@pytest.mark.parametrize("storage", ["memory", "mmap"])
+def test_id_lookups_use_id_map(tmp_path, storage):
+    vectors, documents, metadatas, ids = _rows(400)
+    SimpleVectorDB(tmp_path, "docs", storage=storage).add(vectors.tolist(), documents, metadatas, ids)
+
+    db = SimpleVectorDB(tmp_path, "docs")
+    assert db.get(ids=["id_5", "id_3", "missing"])["ids"] == ["id_3", "id_5"]
+
+    # Once the map exists, lookups by ID never scan the records
+    def no_scan(*args):
+        raise AssertionError("full scan")
+    db._iter_records = no_scan
+
+    db.delete(ids=["id_3", "id_100"])
+    db.add(vectors[:2].tolist(), ["new 0", "new 1"], metadatas[:2], ["id_100", "id_400"])
+    result = db.get(ids=["id_3", "id_100", "id_400", "id_399"], where={"n": {"$ne": 399}})
+    assert result["ids"] == ["id_100", "id_400"]
+    assert result["documents"] == ["new 0", "new 1"]
+    assert db.get(ids=["id_4"], include=["embeddings"])["embeddings"] == [vectors[4].tolist()]
+    assert db.count() == 400
+
+
+@pytest.mark.parametrize("storage,index", [("memory", "flat"), ("mmap", "flat"), ("memory", "ivf"), ("mmap", "ivf")])
+def test_concurrent_readers_and_writer(tmp_path, storage, index):
+    import threading
+
+    batch_size, batches, dim = 50, 24, 16
+    rng = np.random.default_rng(2)
+    db = SimpleVectorDB(
+        tmp_path, "docs", storage=storage, block_size=64,
+        index=index, index_params={"n_lists": 8, "min_train_size": 300}
+    )
+    errors = []
+    done = threading.Event()
+
+    def writer():
+        try:
+            for batch in range(batches):
+                vectors = rng.normal(size=(batch_size, dim)).astype(np.float32)
+                ids = [f"b{batch}-{i}" for i in range(batch_size)]
+                metadatas = [{"batch": batch} for _ in range(batch_size)]
+                db.add(vectors.tolist(), ids, metadatas, ids)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            done.set()
+
+    def reader(seed):
+        local_rng = np.random.default_rng(seed)
+        try:
+            while not done.is_set():
+                snapshot = db.snapshot()
+                # Batches are published whole
+                assert snapshot.count % batch_size == 0
+
+                query = local_rng.normal(size=dim).tolist()
+                result = db.query([query], n_results=10)
+                # Documents, metadata and ids come from the same rows
+                for doc_id, document, metadata in zip(
+                    result["ids"][0], result["documents"][0], result["metadatas"][0]
+                ):
+                    assert doc_id == document
+                    assert doc_id.startswith(f"b{metadata['batch']}-")
+
+                if snapshot.count:
+                    last = snapshot.count // batch_size - 1
+                    filtered = db.query([query], n_results=batch_size, where={"batch": last})
+                    assert len(filtered["ids"][0]) == batch_size
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader, args=(seed,)) for seed in range(4)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not errors, errors
+    assert db.count() == batch_size * batches
+
+    reopened = SimpleVectorDB(tmp_path, "docs")
+    assert reopened.count() == batch_size * batches
+
+
+def test_client_catalog_and_lazy_shared_collections(tmp_path):
+    vectors, documents, metadatas, ids = _rows(120)
+    writer = PersistentClient(str(tmp_path)).get_or_create_collection("docs", metadata={"storage": "mmap"})
+    writer.add(vectors.tolist(), documents, metadatas, ids)
+    SimpleVectorDB(tmp_path, "empty")
+
+    # A fresh process sees the catalog without loading any data
+    from src.rag import simple_vectordb
+    simple_vectordb._shared_collections.clear()
+    client = PersistentClient(str(tmp_path))
+
+    catalog = client.list_collections()
+    assert [entry["name"] for entry in catalog] == ["docs"]
+    assert catalog[0]["count"] == 120
+    assert catalog[0]["dimension"] == 16
+    assert catalog[0]["size_bytes"] > 120 * 16 * 4
+
+    retriever_side = client.get_collection("docs")
+    assert retriever_side.count() == 120
+    assert not retriever_side.info()["loaded"]
+
+    # Clients in the same process share one collection object
+    indexer_side = PersistentClient(str(tmp_path)).get_or_create_collection("docs")
+    assert indexer_side is retriever_side
+
+    indexer_side.add([vectors[0].tolist()], ["late"], [{}], ["late"])
+    result = retriever_side.query([vectors[0].tolist()], n_results=2)
+    assert set(result["ids"][0]) == {"id_0", "late"}
+    assert retriever_side.info()["loaded"]
+
+    with pytest.raises(ValueError):
+        client.get_collection("empty")
@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 """Простой консольный чат с Ollama (без внешних зависимостей)."""
 
-import json
-import urllib.request
-import urllib.error
+import sys
+from pathlib import Path
+
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError  # noqa: E402
 
 
 def chat(model: str = "qwen2.5"):
     """Запуск чата с локальной моделью Ollama."""
-    url = "http://localhost:11434/api/chat"
+    client = OllamaClient("http://localhost:11434")
 
     # Системный промпт для ответов на русском языке
     messages = [{
@@ -35,34 +39,17 @@ def chat(model: str = "qwen2.5"):
         messages.append({"role": "user", "content": user_input})
 
         try:
-            data = json.dumps({
-                "model": model,
-                "messages": messages,
-                "stream": True,
-                "options": {"temperature": 0.3}
-            }).encode("utf-8")
-
-            req = urllib.request.Request(
-                url,
-                data=data,
-                headers={"Content-Type": "application/json"}
-            )
-
             print("Ассистент: ", end="", flush=True)
 
             full_response = ""
-            with urllib.request.urlopen(req) as response:
-                for line in response:
-                    if line:
-                        chunk_data = json.loads(line.decode("utf-8"))
-                        chunk = chunk_data.get("message", {}).get("content", "")
-                        print(chunk, end="", flush=True)
-                        full_response += chunk
+            for chunk in client.stream_chat(model, messages, options={"temperature": 0.3}):
+                print(chunk, end="", flush=True)
+                full_response += chunk
 
             print("\n")
             messages.append({"role": "assistant", "content": full_response})
 
-        except urllib.error.URLError:
+        except OllamaConnectionError:
             print("Ошибка: Не удалось подключиться к Ollama. Убедитесь, что Ollama запущена.")
             messages.pop()
         except Exception as e:
@@ -71,6 +58,5 @@ def chat(model: str = "qwen2.5"):
 
 
 if __name__ == "__main__":
-    import sys
     model = sys.argv[1] if len(sys.argv) > 1 else "qwen2.5"
     chat(model)
@@ -6,9 +6,18 @@
 import argparse
 import os
 from pathlib import Path
-import requests
 import sys
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import (  # noqa: E402
+    OllamaClient,
+    OllamaConnectionError,
+    OllamaHTTPError,
+    OllamaTimeoutError,
+)
+
 
 def load_env():
     """Загрузить переменные из .env файла."""
@@ -35,48 +44,28 @@ def mask_url(url: str) -> str:
     return re.sub(r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}", "***.***.***.***", url)
 
 
-def check_connection(base_url: str) -> bool:
+def check_connection(client: OllamaClient) -> bool:
     """Проверка доступности сервера."""
-    try:
-        response = requests.get(f"{base_url}/api/tags", timeout=5)
-        return response.status_code == 200
-    except requests.RequestException:
-        return False
+    return client.ping(timeout=5)
 
 
-def list_models(base_url: str) -> list[str]:
+def list_models(client: OllamaClient) -> list[str]:
     """Получить список доступных моделей."""
     try:
-        response = requests.get(f"{base_url}/api/tags", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            return [m["name"] for m in data.get("models", [])]
-    except requests.RequestException:
-        pass
-    return []
+        return client.list_models(timeout=5)
+    except ConnectionError:
+        return []
 
 
-def chat(base_url: str, model: str, messages: list[dict]) -> str:
+def chat(client: OllamaClient, model: str, messages: list[dict]) -> str:
     """Отправить сообщение и получить ответ."""
     try:
-        response = requests.post(
-            f"{base_url}/api/chat",
-            json={
-                "model": model,
-                "messages": messages,
-                "stream": False,
-            },
-            timeout=120,
-        )
-
-        if response.status_code == 200:
-            return response.json().get("message", {}).get("content", "")
-        else:
-            return f"[Ошибка {response.status_code}]: {response.text}"
-
-    except requests.Timeout:
+        return client.chat(model, messages, timeout=120)
+    except OllamaHTTPError as e:
+        return f"[Ошибка {e.status}]: {e.message}"
+    except OllamaTimeoutError:
         return "[Ошибка]: Превышено время ожидания ответа"
-    except requests.RequestException as e:
+    except OllamaConnectionError as e:
         return f"[Ошибка соединения]: {e}"
 
 
@@ -88,11 +77,12 @@ def main():
     args = parser.parse_args()
 
     base_url = f"http://{args.host}:{args.port}"
+    client = OllamaClient(base_url)
     model = args.model
 
     print(f"Подключение к {mask_url(base_url)}...")
 
-    if not check_connection(base_url):
+    if not check_connection(client):
         print(f"Не удалось подключиться к серверу {mask_url(base_url)}")
         print("Проверьте:")
         print("  1. Сервер запущен: ollama serve")
@@ -100,7 +90,7 @@ def main():
         print("  3. Ollama слушает 0.0.0.0: OLLAMA_HOST=0.0.0.0:11434")
         sys.exit(1)
 
-    models = list_models(base_url)
+    models = list_models(client)
     if models:
         print(f"Доступные модели: {', '.join(models)}")
 
@@ -150,7 +140,7 @@ def main():
             print("\nАссистент: ", end="", flush=True)
 
             # Получаем ответ
-            response = chat(base_url, model, messages)
+            response = chat(client, model, messages)
             print(response)
 
             # Добавляем ответ в историю
@@ -14,11 +14,17 @@
 
 import json
 import re
+import sys
 import time
-import urllib.request
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient  # noqa: E402
+
 from prompts import (
     BASIC_SYSTEM, OPTIMIZED_SYSTEM,
     EXTRACTION_BASIC, EXTRACTION_STRUCTURED, EXTRACTION_COT,
@@ -26,9 +32,11 @@ from prompts import (
 )
 
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = "http://localhost:11434"
 DEFAULT_MODEL = "qwen2.5"
 
+client = OllamaClient(OLLAMA_URL)
+
 
 @dataclass
 class BenchmarkResult:
@@ -85,28 +93,10 @@ def query_ollama(
     options: dict | None = None
 ) -> tuple[str, float]:
     """Отправляет запрос к Ollama."""
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": options or {}
-    }
-
-    if system:
-        payload["system"] = system
-
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        OLLAMA_URL,
-        data=data,
-        headers={"Content-Type": "application/json"}
-    )
-
     start = time.time()
     try:
-        with urllib.request.urlopen(req, timeout=120) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            return result.get("response", ""), time.time() - start
+        response = client.generate(model, prompt, system=system, options=options, timeout=120)
+        return response, time.time() - start
     except Exception as e:
         return f"ERROR: {e}", 0.0
 
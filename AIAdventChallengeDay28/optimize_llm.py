@@ -21,12 +21,16 @@
     prompts   - сравнение prompt-шаблонов
 """
 
-import json
+import sys
 import time
-import urllib.request
-import urllib.error
+from pathlib import Path
 from typing import Any
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError  # noqa: E402
+
 from prompts import (
     BASIC_SYSTEM, OPTIMIZED_SYSTEM,
     EXTRACTION_BASIC, EXTRACTION_STRUCTURED, EXTRACTION_COT,
@@ -36,9 +40,11 @@ from prompts import (
 )
 
 
-OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = "http://localhost:11434"
 DEFAULT_MODEL = "qwen2.5"
 
+client = OllamaClient(OLLAMA_URL)
+
 
 def query_ollama(
     prompt: str,
@@ -48,31 +54,13 @@ def query_ollama(
 ) -> tuple[str, float]:
     """Отправляет запрос к Ollama и возвращает ответ с временем выполнения."""
 
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": options or {}
-    }
-
-    if system:
-        payload["system"] = system
-
-    data = json.dumps(payload).encode("utf-8")
-    req = urllib.request.Request(
-        OLLAMA_URL,
-        data=data,
-        headers={"Content-Type": "application/json"}
-    )
-
     start_time = time.time()
 
     try:
-        with urllib.request.urlopen(req, timeout=60) as response:
-            result = json.loads(response.read().decode("utf-8"))
-            elapsed = time.time() - start_time
-            return result.get("response", ""), elapsed
-    except urllib.error.URLError as e:
+        response = client.generate(model, prompt, system=system, options=options, timeout=60)
+        elapsed = time.time() - start_time
+        return response, elapsed
+    except OllamaConnectionError as e:
         return f"Ошибка подключения к Ollama: {e}", 0.0
     except Exception as e:
         return f"Ошибка: {e}", 0.0
@@ -11,19 +11,24 @@
     python3 analyst.py sample_data/user_funnel.json qwen2.5
 """
 
-import json
 import os
 import sys
-import urllib.request
-import urllib.error
+from pathlib import Path
+
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError  # noqa: E402
 
 from data_loader import load_file, format_statistics, format_full_data
 from prompts import ANALYST_SYSTEM, DATA_CONTEXT_TEMPLATE, WELCOME_TEMPLATE
 
 
-OLLAMA_URL = "http://localhost:11434/api/chat"
+OLLAMA_URL = "http://localhost:11434"
 DEFAULT_MODEL = "llama3"
 
+client = OllamaClient(OLLAMA_URL)
+
 
 def build_context(filepath, data_type, data, summary):
     """Собирает контекст с данными для LLM."""
@@ -47,30 +52,15 @@ def build_context(filepath, data_type, data, summary):
 
 def query_streaming(messages, model):
     """Отправляет запрос к Ollama со стримингом ответа."""
-    data = json.dumps({
-        "model": model,
-        "messages": messages,
-        "stream": True,
-        "options": {
-            "temperature": 0.2,
-            "num_ctx": 8192,
-        },
-    }).encode("utf-8")
-
-    req = urllib.request.Request(
-        OLLAMA_URL,
-        data=data,
-        headers={"Content-Type": "application/json"},
-    )
+    options = {
+        "temperature": 0.2,
+        "num_ctx": 8192,
+    }
 
     full_response = ""
-    with urllib.request.urlopen(req) as response:
-        for line in response:
-            if line:
-                chunk_data = json.loads(line.decode("utf-8"))
-                chunk = chunk_data.get("message", {}).get("content", "")
-                print(chunk, end="", flush=True)
-                full_response += chunk
+    for chunk in client.stream_chat(model, messages, options=options):
+        print(chunk, end="", flush=True)
+        full_response += chunk
 
     print("\n")
     return full_response
@@ -140,7 +130,7 @@ def main():
         try:
             response = query_streaming(messages, model)
             messages.append({"role": "assistant", "content": response})
-        except urllib.error.URLError:
+        except OllamaConnectionError:
             print("Ошибка: не удалось подключиться к Ollama. Убедитесь, что запущена: ollama serve")
             messages.pop()
         except Exception as e:
@@ -13,10 +13,13 @@
 """
 
 import argparse
-import json
 import sys
-import urllib.request
-import urllib.error
+from pathlib import Path
+
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError  # noqa: E402
 
 from user_profile import load_profile, build_system_prompt, display_profile
 from memory import (
@@ -26,37 +29,23 @@ from memory import (
 from prompts import WELCOME_TEMPLATE, FACT_EXTRACTION_PROMPT, FACT_REPHRASE_PROMPT
 
 
-OLLAMA_CHAT_URL = "http://localhost:11434/api/chat"
-OLLAMA_GENERATE_URL = "http://localhost:11434/api/generate"
+OLLAMA_URL = "http://localhost:11434"
 DEFAULT_MODEL = "qwen2.5"
 
+client = OllamaClient(OLLAMA_URL)
+
 
 def query_streaming(messages, model):
     """Отправляет запрос к Ollama со стримингом ответа."""
-    data = json.dumps({
-        "model": model,
-        "messages": messages,
-        "stream": True,
-        "options": {
-            "temperature": 0.7,
-            "num_ctx": 4096,
-        },
-    }).encode("utf-8")
-
-    req = urllib.request.Request(
-        OLLAMA_CHAT_URL,
-        data=data,
-        headers={"Content-Type": "application/json"},
-    )
+    options = {
+        "temperature": 0.7,
+        "num_ctx": 4096,
+    }
 
     full_response = ""
-    with urllib.request.urlopen(req) as response:
-        for line in response:
-            if line:
-                chunk_data = json.loads(line.decode("utf-8"))
-                chunk = chunk_data.get("message", {}).get("content", "")
-                print(chunk, end="", flush=True)
-                full_response += chunk
+    for chunk in client.stream_chat(model, messages, options=options):
+        print(chunk, end="", flush=True)
+        full_response += chunk
 
     print("\n")
     return full_response
@@ -64,22 +53,9 @@ def query_streaming(messages, model):
 
 def _query_generate(prompt, model, temperature=0.1, num_predict=60):
     """Отправляет короткий запрос к Ollama (без стриминга)."""
-    data = json.dumps({
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {"temperature": temperature, "num_predict": num_predict},
-    }).encode("utf-8")
-
-    req = urllib.request.Request(
-        OLLAMA_GENERATE_URL,
-        data=data,
-        headers={"Content-Type": "application/json"},
-    )
-
-    with urllib.request.urlopen(req, timeout=15) as response:
-        result = json.loads(response.read().decode("utf-8"))
-        return result.get("response", "").strip().strip('"\'')
+    options = {"temperature": temperature, "num_predict": num_predict}
+    response = client.generate(model, prompt, options=options, timeout=15)
+    return response.strip().strip('"\'')
 
 
 def try_extract_fact(user_message, model, user_name):
@@ -274,7 +250,7 @@ def main():
                         print(f"  [запомнил: {fact}]")
                         _rebuild_system(messages, profile, memory_facts)
 
-        except urllib.error.URLError:
+        except OllamaConnectionError:
             print("Ошибка: не удалось подключиться к Ollama.")
             print("Убедитесь, что запущена: ollama serve")
             messages.pop()
@@ -6,8 +6,13 @@
 
 import argparse
 import sys
+from pathlib import Path
 import speech_recognition as sr
-import requests
+
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient  # noqa: E402
 
 
 def listen_once() -> str:
@@ -29,18 +34,8 @@ def listen_once() -> str:
 
 def query_llm(text: str, model: str = "qwen2.5") -> str:
     """Отправляет запрос в LLM"""
-    url = "http://localhost:11434/api/generate"
-
-    payload = {
-        "model": model,
-        "prompt": text,
-        "stream": False
-    }
-
-    response = requests.post(url, json=payload, timeout=60)
-    response.raise_for_status()
-
-    return response.json().get("response", "").strip()
+    client = OllamaClient("http://localhost:11434")
+    return client.generate(model, text, timeout=60).strip()
 
 
 def main():
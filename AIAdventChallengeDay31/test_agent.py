@@ -4,36 +4,31 @@
 Симулирует голосовые запросы без использования микрофона
 """
 
-import requests
-import json
+import sys
+from pathlib import Path
 from typing import List, Tuple
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError, OllamaTimeoutError  # noqa: E402
+
 
 class AgentTester:
     """Тестер для голосового агента"""
 
     def __init__(self, model: str = "qwen2.5", host: str = "localhost", port: int = 11434):
         self.model = model
-        self.ollama_url = f"http://{host}:{port}/api/generate"
+        self.llm = OllamaClient(f"http://{host}:{port}")
 
     def query_llm(self, text: str) -> str:
         """Отправляет текст в LLM и возвращает ответ"""
         try:
-            payload = {
-                "model": self.model,
-                "prompt": text,
-                "stream": False
-            }
-
-            response = requests.post(self.ollama_url, json=payload, timeout=30)
-            response.raise_for_status()
-
-            result = response.json()
-            return result.get("response", "").strip()
+            return self.llm.generate(self.model, text, timeout=30).strip()
 
-        except requests.exceptions.ConnectionError:
+        except OllamaConnectionError:
             return "❌ Не удалось подключиться к Ollama"
-        except requests.exceptions.Timeout:
+        except OllamaTimeoutError:
             return "❌ Время ожидания истекло"
         except Exception as e:
             return f"❌ Ошибка: {e}"
@@ -13,11 +13,15 @@ import subprocess
 import platform
 from typing import Optional
 from datetime import datetime
+from pathlib import Path
 import speech_recognition as sr
-import requests
-import json
 from PIL import ImageGrab
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError, OllamaTimeoutError  # noqa: E402
+
 
 class VoiceAgent:
     """Голосовой агент с распознаванием речи и LLM"""
@@ -31,7 +35,7 @@ class VoiceAgent:
         language: str = "ru-RU"
     ):
         self.model = model
-        self.ollama_url = f"http://{host}:{port}/api/generate"
+        self.llm = OllamaClient(f"http://{host}:{port}")
         self.recognition_engine = recognition_engine
         self.language = language
         self.recognizer = sr.Recognizer()
@@ -216,27 +220,18 @@ class VoiceAgent:
             else:
                 system_prompt = "You are a helpful voice assistant. Answer briefly in English. Do not use Chinese."
 
-            payload = {
-                "model": self.model,
-                "prompt": text,
-                "system": system_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "num_ctx": 2048
-                }
+            options = {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "num_ctx": 2048
             }
 
-            response = requests.post(self.ollama_url, json=payload, timeout=30)
-            response.raise_for_status()
-
-            result = response.json()
-            return result.get("response", "").strip()
+            response = self.llm.generate(self.model, text, system=system_prompt, options=options, timeout=30)
+            return response.strip()
 
-        except requests.exceptions.ConnectionError:
+        except OllamaConnectionError:
             return "❌ Не удалось подключиться к Ollama. Убедитесь, что сервер запущен."
-        except requests.exceptions.Timeout:
+        except OllamaTimeoutError:
             return "❌ Время ожидания ответа истекло."
         except Exception as e:
             return f"❌ Ошибка при обращении к LLM: {e}"
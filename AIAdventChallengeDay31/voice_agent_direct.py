@@ -15,10 +15,16 @@ import sys
 import os
 import wave
 import tempfile
+from pathlib import Path
 from typing import Optional
 import pyaudio
 import requests
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ollama_async import OllamaClient, OllamaConnectionError, OllamaTimeoutError  # noqa: E402
+
 
 class DirectVoiceAgent:
     """Голосовой агент с прямой отправкой аудио в модель"""
@@ -35,7 +41,7 @@ class DirectVoiceAgent:
     ):
         self.llm_model = llm_model
         self.whisper_mode = whisper_mode
-        self.ollama_url = f"http://{host}:{port}/api/generate"
+        self.llm = OllamaClient(f"http://{host}:{port}")
         self.sample_rate = sample_rate
         self.chunk_size = chunk_size
         self.record_seconds = record_seconds
@@ -165,21 +171,11 @@ class DirectVoiceAgent:
     def query_llm(self, text: str) -> str:
         """Отправляет текст в LLM и возвращает ответ"""
         try:
-            payload = {
-                "model": self.llm_model,
-                "prompt": text,
-                "stream": False
-            }
-
-            response = requests.post(self.ollama_url, json=payload, timeout=30)
-            response.raise_for_status()
+            return self.llm.generate(self.llm_model, text, timeout=30).strip()
 
-            result = response.json()
-            return result.get("response", "").strip()
-
-        except requests.exceptions.ConnectionError:
+        except OllamaConnectionError:
             return "❌ Не удалось подключиться к Ollama"
-        except requests.exceptions.Timeout:
+        except OllamaTimeoutError:
             return "❌ Время ожидания ответа истекло"
         except Exception as e:
             return f"❌ Ошибка: {e}"
@@ -1,18 +1,29 @@
 """Клиент для работы с Ollama LLM."""
 
-import json
-import urllib.request
-import urllib.error
+import sys
+from pathlib import Path
 from typing import List, Dict, Optional
 
+# Общий клиент Ollama лежит в корне репозитория (ollama_async/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import ollama_async  # noqa: E402
+
 
 class OllamaClient:
     """Клиент для работы с Ollama API."""
 
     def __init__(self, host: str = "localhost", port: int = 11434, model: str = "qwen2.5"):
-        self.chat_url = f"http://{host}:{port}/api/chat"
-        self.generate_url = f"http://{host}:{port}/api/generate"
+        self.base_url = f"http://{host}:{port}"
+        self.chat_url = f"{self.base_url}/api/chat"
+        self.generate_url = f"{self.base_url}/api/generate"
         self.model = model
+        self._client = ollama_async.OllamaClient(self.base_url)
+
+    @property
+    def metrics(self) -> Dict[str, Dict]:
+        """Сводка по вызовам: TTFT, токены/с, время ответа."""
+        return self._client.metrics.snapshot()
 
     def chat_streaming(
         self,
@@ -21,34 +32,19 @@ class OllamaClient:
         num_ctx: int = 4096,
     ) -> str:
         """Отправляет запрос к Ollama chat API со стримингом."""
-        data = json.dumps({
-            "model": self.model,
-            "messages": messages,
-            "stream": True,
-            "options": {
-                "temperature": temperature,
-                "num_ctx": num_ctx,
-            },
-        }).encode("utf-8")
-
-        req = urllib.request.Request(
-            self.chat_url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
+        options = {
+            "temperature": temperature,
+            "num_ctx": num_ctx,
+        }
 
         full_response = ""
         try:
-            with urllib.request.urlopen(req, timeout=60) as response:
-                for line in response:
-                    if line:
-                        chunk_data = json.loads(line.decode("utf-8"))
-                        chunk = chunk_data.get("message", {}).get("content", "")
-                        print(chunk, end="", flush=True)
-                        full_response += chunk
+            for chunk in self._client.stream_chat(self.model, messages, options=options, timeout=60):
+                print(chunk, end="", flush=True)
+                full_response += chunk
             print()  # Новая строка после завершения
             return full_response
-        except urllib.error.URLError as e:
+        except ollama_async.OllamaError as e:
             raise ConnectionError(f"Не удалось подключиться к Ollama: {e}")
 
     def generate(
@@ -59,30 +55,13 @@ class OllamaClient:
         num_predict: int = 60,
     ) -> str:
         """Простой запрос к Ollama generate API без стриминга."""
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": num_predict,
-            },
+        options = {
+            "temperature": temperature,
+            "num_predict": num_predict,
         }
 
-        if system:
-            payload["system"] = system
-
-        data = json.dumps(payload).encode("utf-8")
-
-        req = urllib.request.Request(
-            self.generate_url,
-            data=data,
-            headers={"Content-Type": "application/json"},
-        )
-
         try:
-            with urllib.request.urlopen(req, timeout=30) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                return result.get("response", "").strip().strip('"\'')
-        except urllib.error.URLError as e:
+            response = self._client.generate(self.model, prompt, system=system, options=options, timeout=30)
+            return response.strip().strip('"\'')
+        except ollama_async.OllamaError as e:
             raise ConnectionError(f"Не удалось подключиться к Ollama: {e}")
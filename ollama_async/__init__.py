@@ -0,0 +1,29 @@
+"""
+Общий клиент Ollama для агентов репозитория.
+
+- AsyncOllamaClient — asyncio-клиент: chat / generate / embed, стриминг
+  через async-генераторы, пул keep-alive соединений, отмена, метрики
+  каждого вызова (TTFT, токены/с).
+- OllamaClient — синхронная обёртка с теми же методами для обычных скриптов.
+
+Только стандартная библиотека. Скрипты из папок AIAdventChallengeDayNN
+подключают пакет, добавляя корень репозитория в sys.path.
+"""
+
+from .client import DEFAULT_TIMEOUTS, DEFAULT_URL, AsyncOllamaClient
+from .errors import OllamaConnectionError, OllamaError, OllamaHTTPError, OllamaTimeoutError
+from .metrics import CallMetrics, MetricsRegistry
+from .sync import OllamaClient
+
+__all__ = [
+    "AsyncOllamaClient",
+    "OllamaClient",
+    "CallMetrics",
+    "MetricsRegistry",
+    "OllamaError",
+    "OllamaConnectionError",
+    "OllamaTimeoutError",
+    "OllamaHTTPError",
+    "DEFAULT_URL",
+    "DEFAULT_TIMEOUTS",
+]
@@ -0,0 +1,442 @@
+"""Асинхронный клиент Ollama на asyncio (только стандартная библиотека)."""
+
+import asyncio
+import contextlib
+import json
+import random
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .errors import OllamaConnectionError, OllamaError, OllamaHTTPError, OllamaTimeoutError
+from .metrics import CallMetrics, MetricsRegistry
+
+
+DEFAULT_URL = "http://localhost:11434"
+DEFAULT_MAX_CONNECTIONS = 4
+
+# Таймауты (сек): connect — на подключение, остальные — на ожидание очередной порции
+# данных от Ollama. Первая порция может ждать загрузки модели в память, поэтому
+# для генерации таймауты большие; стрим, который продолжает идти, не обрывается.
+DEFAULT_TIMEOUTS = {
+    "connect": 5,
+    "tags": 10,
+    "embed": 60,
+    "generate": 300,
+    "chat": 300,
+}
+
+# Повторяем только идемпотентные операции; генерацию не повторяем
+RETRY_OPS = {"embed", "tags"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RETRIES = 2
+BACKOFF_BASE_SEC = 0.5
+BACKOFF_MAX_SEC = 8.0
+
+READ_SIZE = 65536
+
+
+async def _wait(awaitable, timeout: float):
+    """await с таймаутом; asyncio.timeout (3.11+), в отличие от wait_for, не теряет отмену задачи."""
+    if hasattr(asyncio, "timeout"):
+        async with asyncio.timeout(timeout):
+            return await awaitable
+    return await asyncio.wait_for(awaitable, timeout)
+
+
+class _Connection:
+    """Keep-alive соединение с Ollama."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _Response:
+    """HTTP-ответ; тело читается по мере того, как его запрашивает потребитель."""
+
+    def __init__(self, conn: _Connection, status: int, headers: Dict[str, str], timeout: float):
+        self.conn = conn
+        self.status = status
+        self.timeout = timeout
+        self.chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+        length = headers.get("content-length")
+        self.length = int(length) if length is not None and not self.chunked else None
+        self.will_close = (headers.get("connection", "").lower() == "close"
+                           or (not self.chunked and self.length is None))
+        self.done = False
+        self.bytes_received = 0
+
+    async def _read(self, awaitable):
+        try:
+            return await _wait(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            raise OllamaTimeoutError(f"Ollama не прислала данные за {self.timeout} с")
+        except (OSError, asyncio.IncompleteReadError) as ex:
+            raise OllamaConnectionError(f"Соединение с Ollama оборвалось: {ex}") from ex
+
+    async def iter_raw(self) -> AsyncIterator[bytes]:
+        reader = self.conn.reader
+        if self.chunked:
+            while True:
+                size_line = await self._read(reader.readline())
+                if not size_line:
+                    raise OllamaConnectionError("Соединение с Ollama оборвалось посреди ответа")
+                size = int(size_line.split(b";")[0].strip(), 16)
+                if size == 0:
+                    # трейлеры до пустой строки
+                    while (await self._read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                data = await self._read(reader.readexactly(size + 2))
+                self.bytes_received += size
+                yield data[:-2]
+        elif self.length is not None:
+            remaining = self.length
+            while remaining:
+                data = await self._read(reader.read(min(remaining, READ_SIZE)))
+                if not data:
+                    raise OllamaConnectionError("Соединение с Ollama оборвалось посреди ответа")
+                remaining -= len(data)
+                self.bytes_received += len(data)
+                yield data
+        else:
+            while True:
+                data = await self._read(reader.read(READ_SIZE))
+                if not data:
+                    break
+                self.bytes_received += len(data)
+                yield data
+        self.done = True
+
+    async def read(self) -> bytes:
+        return b"".join([data async for data in self.iter_raw()])
+
+    async def iter_lines(self) -> AsyncIterator[bytes]:
+        """Строки NDJSON-стрима Ollama."""
+        buffer = b""
+        async for data in self.iter_raw():
+            buffer += data
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+
+
+def _http_error(status: int, body: bytes) -> OllamaHTTPError:
+    text = body.decode("utf-8", errors="replace")
+    try:
+        text = json.loads(text).get("error", text)
+    except (ValueError, AttributeError):
+        pass
+    return OllamaHTTPError(status, str(text)[:300])
+
+
+def _decode(line: bytes) -> Dict:
+    try:
+        data = json.loads(line)
+    except ValueError:
+        raise OllamaError(f"Не удалось разобрать JSON-ответ Ollama: {line[:200]!r}")
+    if isinstance(data, dict) and data.get("error"):
+        raise OllamaError(f"Ollama: {data['error']}")
+    return data
+
+
+class AsyncOllamaClient:
+    """
+    Асинхронный клиент Ollama: chat, generate и embed, стриминг через async-генераторы.
+
+    - Пул keep-alive соединений: не больше ``max_connections`` запросов одновременно,
+      остальные ждут свободный слот (время ожидания — ``CallMetrics.queued``).
+    - Стрим читается из сокета только когда потребитель просит следующий фрагмент,
+      поэтому медленный потребитель притормаживает Ollama, а не копит ответ в памяти.
+    - Отмена задачи или выход из цикла по стриму закрывает соединение, и Ollama
+      прекращает генерацию.
+    - Метрики каждого вызова (TTFT, токены/с, байты) — ``last_metrics``,
+      сводка по операциям — ``metrics.snapshot()``.
+
+    Клиент привязан к event loop, в котором выполняется; из синхронного кода
+    используйте ``OllamaClient``.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        *,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeouts: Optional[Dict[str, float]] = None,
+        retries: int = DEFAULT_RETRIES,
+        on_metrics: Optional[Callable[[CallMetrics], None]] = None,
+    ):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Некорректный URL Ollama: {base_url}")
+
+        self.base_url = base_url.rstrip("/")
+        self._ssl = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port or (443 if self._ssl else 80)
+        self._netloc = parts.netloc
+        self._prefix = parts.path
+
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retries = retries
+        self.on_metrics = on_metrics
+        self.metrics = MetricsRegistry()
+        self.last_metrics: Optional[CallMetrics] = None
+
+        self._slots = asyncio.Semaphore(max_connections)
+        self._idle: List[_Connection] = []
+        # /api/embed появился в Ollama 0.3; для старых версий запоминаем /api/embeddings
+        self._legacy_embed = False
+
+    async def __aenter__(self) -> "AsyncOllamaClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Закрыть простаивающие соединения."""
+        idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # --- API Ollama ---
+    async def chat(self, model: str, messages: List[Dict], *, options: Optional[Dict] = None,
+                   timeout: Optional[float] = None, **params) -> str:
+        """Ответ модели в диалоге (/api/chat без стриминга)."""
+        payload = {"model": model, "messages": messages, "stream": False, **_options(options), **params}
+        data = await self._call("chat", "POST", "/api/chat", payload, model, timeout)
+        return data.get("message", {}).get("content", "")
+
+    async def stream_chat(self, model: str, messages: List[Dict], *, options: Optional[Dict] = None,
+                          timeout: Optional[float] = None, **params) -> AsyncIterator[str]:
+        """Фрагменты ответа модели в диалоге по мере генерации."""
+        payload = {"model": model, "messages": messages, "stream": True, **_options(options), **params}
+        # aclosing: выход потребителя из стрима сразу закрывает соединение
+        async with contextlib.aclosing(self._stream("chat", "/api/chat", payload, model, timeout)) as chunks:
+            async for chunk in chunks:
+                piece = chunk.get("message", {}).get("content", "")
+                if piece:
+                    yield piece
+
+    async def generate(self, model: str, prompt: str, *, system: Optional[str] = None,
+                       options: Optional[Dict] = None, timeout: Optional[float] = None, **params) -> str:
+        """Ответ модели на промпт (/api/generate без стриминга)."""
+        payload = {"model": model, "prompt": prompt, "stream": False, **_system(system), **_options(options), **params}
+        data = await self._call("generate", "POST", "/api/generate", payload, model, timeout)
+        return data.get("response", "")
+
+    async def stream_generate(self, model: str, prompt: str, *, system: Optional[str] = None,
+                              options: Optional[Dict] = None, timeout: Optional[float] = None,
+                              **params) -> AsyncIterator[str]:
+        """Фрагменты ответа модели на промпт по мере генерации."""
+        payload = {"model": model, "prompt": prompt, "stream": True, **_system(system), **_options(options), **params}
+        async with contextlib.aclosing(self._stream("generate", "/api/generate", payload, model, timeout)) as chunks:
+            async for chunk in chunks:
+                piece = chunk.get("response", "")
+                if piece:
+                    yield piece
+
+    async def embed(self, model: str, input: Union[str, List[str]], *,
+                    timeout: Optional[float] = None, **params) -> List[List[float]]:
+        """Эмбеддинги текста или списка текстов."""
+        texts = [input] if isinstance(input, str) else list(input)
+        if not self._legacy_embed:
+            try:
+                data = await self._call("embed", "POST", "/api/embed",
+                                        {"model": model, "input": texts, **params}, model, timeout)
+                return data.get("embeddings", [])
+            except OllamaHTTPError as ex:
+                # 404 — нет endpoint'а (старая Ollama) или нет модели; разберётся старый endpoint
+                if ex.status != 404:
+                    raise
+
+        embeddings = []
+        for text in texts:
+            data = await self._call("embed", "POST", "/api/embeddings",
+                                    {"model": model, "prompt": text, **params}, model, timeout)
+            embeddings.append(data.get("embedding", []))
+        self._legacy_embed = True
+        return embeddings
+
+    async def list_models(self, *, timeout: Optional[float] = None) -> List[str]:
+        """Имена установленных моделей."""
+        data = await self._call("tags", "GET", "/api/tags", None, None, timeout)
+        return [m["name"] for m in data.get("models", []) if isinstance(m, dict) and "name" in m]
+
+    async def ping(self, *, timeout: Optional[float] = None) -> bool:
+        """Доступна ли Ollama."""
+        try:
+            await self.list_models(timeout=timeout)
+            return True
+        except OllamaError:
+            return False
+
+    # --- запросы ---
+    async def _call(self, op: str, method: str, path: str, payload: Optional[Dict],
+                    model: Optional[str], timeout: Optional[float]) -> Dict:
+        """Запрос с JSON-ответом; идемпотентные операции повторяются при временных сбоях."""
+        attempts = 1 + (self.retries if op in RETRY_OPS else 0)
+        for attempt in range(attempts):
+            if attempt:
+                await asyncio.sleep(random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** (attempt - 1))))
+            metrics = CallMetrics(op=op, model=model)
+            try:
+                async with self._open(method, path, payload, metrics, timeout or self.timeouts[op]) as response:
+                    body = await response.read()
+                metrics.bytes_received = response.bytes_received
+                if response.status >= 400:
+                    raise _http_error(response.status, body)
+                data = _decode(body)
+                metrics.finish(data)
+            except asyncio.CancelledError:
+                self._record(metrics, "cancelled")
+                raise
+            except OllamaError as ex:
+                self._record(metrics, "error", str(ex))
+                retryable = isinstance(ex, (OllamaConnectionError, OllamaTimeoutError)) or (
+                    isinstance(ex, OllamaHTTPError) and ex.status in RETRY_STATUSES)
+                if not retryable or attempt == attempts - 1:
+                    raise
+                continue
+            self._record(metrics)
+            return data
+        raise AssertionError("unreachable")
+
+    async def _stream(self, op: str, path: str, payload: Dict, model: str,
+                      timeout: Optional[float]) -> AsyncIterator[Dict]:
+        """NDJSON-стрим: объекты ответа по одному, по мере чтения из сокета."""
+        metrics = CallMetrics(op=op, model=model, stream=True)
+        status, error = "ok", None
+        response = None
+        try:
+            async with self._open("POST", path, payload, metrics, timeout or self.timeouts[op]) as response:
+                if response.status >= 400:
+                    raise _http_error(response.status, await response.read())
+                async for line in response.iter_lines():
+                    chunk = _decode(line)
+                    metrics.chunks += 1
+                    if chunk.get("message", {}).get("content") or chunk.get("response"):
+                        metrics.first_token()
+                    if chunk.get("done"):
+                        metrics.finish(chunk)
+                    yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            # задачу отменили или потребитель перестал читать стрим
+            status = "cancelled"
+            raise
+        except Exception as ex:
+            status, error = "error", str(ex)
+            raise
+        finally:
+            if response is not None:
+                metrics.bytes_received = response.bytes_received
+            self._record(metrics, status, error)
+
+    @contextlib.asynccontextmanager
+    async def _open(self, method: str, path: str, payload: Optional[Dict],
+                    metrics: CallMetrics, timeout: float) -> AsyncIterator[_Response]:
+        """
+        Занять слот пула, отправить запрос и отдать ответ.
+
+        Соединение возвращается в пул, только если ответ дочитан до конца;
+        при ошибке, отмене или недочитанном стриме оно закрывается.
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {self._prefix}{path} HTTP/1.1\r\n"
+            f"Host: {self._netloc}\r\n"
+            "Accept: application/json\r\n"
+            + ("Content-Type: application/json\r\n" if payload is not None else "")
+            + f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("latin-1")
+        request = head + body
+
+        waiting = asyncio.get_running_loop().time()
+        async with self._slots:
+            metrics.queued = asyncio.get_running_loop().time() - waiting
+            conn, response = await self._send(request, timeout)
+            metrics.bytes_sent = len(request)
+            try:
+                yield response
+            except BaseException:
+                conn.close()
+                raise
+            if response.done and not response.will_close:
+                conn.reused = True
+                self._idle.append(conn)
+            else:
+                conn.close()
+
+    async def _send(self, request: bytes, timeout: float) -> Tuple[_Connection, _Response]:
+        while True:
+            conn = self._idle.pop() if self._idle else await self._connect()
+            try:
+                conn.writer.write(request)
+                await conn.writer.drain()
+                response = await self._read_head(conn, timeout)
+                return conn, response
+            except OllamaConnectionError:
+                conn.close()
+                if not conn.reused:
+                    raise
+                # сервер закрыл простаивавшее соединение — берём следующее
+            except BaseException:
+                conn.close()
+                raise
+
+    async def _connect(self) -> _Connection:
+        try:
+            reader, writer = await _wait(
+                asyncio.open_connection(self._host, self._port, ssl=self._ssl or None),
+                self.timeouts["connect"],
+            )
+        except asyncio.TimeoutError:
+            raise OllamaTimeoutError(f"Таймаут подключения к Ollama ({self.base_url})")
+        except OSError as ex:
+            raise OllamaConnectionError(f"Не удалось подключиться к Ollama ({self.base_url}): {ex}") from ex
+        return _Connection(reader, writer)
+
+    async def _read_head(self, conn: _Connection, timeout: float) -> _Response:
+        try:
+            status_line = await _wait(conn.reader.readline(), timeout)
+            if not status_line:
+                raise OllamaConnectionError("Ollama закрыла соединение")
+            headers = {}
+            while True:
+                line = await _wait(conn.reader.readline(), timeout)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except asyncio.TimeoutError:
+            raise OllamaTimeoutError(f"Ollama не ответила за {timeout} с")
+        except OSError as ex:
+            raise OllamaConnectionError(f"Соединение с Ollama оборвалось: {ex}") from ex
+        try:
+            status = int(status_line.split(b" ", 2)[1])
+        except (IndexError, ValueError):
+            raise OllamaError(f"Некорректный ответ Ollama: {status_line[:100]!r}")
+        return _Response(conn, status, headers, timeout)
+
+    def _record(self, metrics: CallMetrics, status: str = "ok", error: Optional[str] = None) -> None:
+        metrics.close(status, error)
+        self.last_metrics = metrics
+        self.metrics.record(metrics)
+        if self.on_metrics:
+            self.on_metrics(metrics)
+
+
+def _options(options: Optional[Dict]) -> Dict:
+    return {"options": options} if options else {}
+
+
+def _system(system: Optional[str]) -> Dict:
+    return {"system": system} if system else {}
@@ -0,0 +1,22 @@
+"""Ошибки клиента Ollama."""
+
+
+class OllamaError(Exception):
+    """Базовая ошибка клиента Ollama."""
+
+
+class OllamaConnectionError(OllamaError, ConnectionError):
+    """Не удалось подключиться к Ollama или соединение оборвалось."""
+
+
+class OllamaTimeoutError(OllamaError, TimeoutError):
+    """Ollama не прислала данные за отведённое время."""
+
+
+class OllamaHTTPError(OllamaError):
+    """Ollama ответила HTTP-ошибкой."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
@@ -0,0 +1,135 @@
+"""Метрики вызовов Ollama: TTFT, токены в секунду, байты, ожидание слота."""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+
+# Сколько последних вызовов каждой операции хранить для перцентилей
+HISTORY_SIZE = 1000
+
+
+@dataclass
+class CallMetrics:
+    """Метрики одного вызова (время — в секундах)."""
+
+    op: str
+    model: Optional[str] = None
+    stream: bool = False
+    started: float = field(default_factory=time.perf_counter, repr=False)
+    # Ожидание свободного соединения в пуле
+    queued: float = 0.0
+    # До первого фрагмента ответа; для нестримовых вызовов — по таймингам Ollama
+    ttft: Optional[float] = None
+    total: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    tokens_per_sec: Optional[float] = None
+    chunks: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    status: str = "ok"  # ok | error | cancelled
+    error: Optional[str] = None
+
+    def first_token(self) -> None:
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self.started
+
+    def finish(self, data: Dict) -> None:
+        """Заполнить счётчики токенов из финального ответа Ollama (done=true)."""
+        self.prompt_tokens = data.get("prompt_eval_count", self.prompt_tokens)
+        self.completion_tokens = data.get("eval_count", self.completion_tokens)
+        eval_ns = data.get("eval_duration")
+        if self.completion_tokens and eval_ns:
+            self.tokens_per_sec = self.completion_tokens / (eval_ns / 1e9)
+        if not self.stream and self.ttft is None:
+            # Загрузка модели + обработка промпта — то, что стрим ждал бы до первого токена
+            before_first = (data.get("load_duration") or 0) + (data.get("prompt_eval_duration") or 0)
+            if before_first:
+                self.ttft = before_first / 1e9
+
+    def close(self, status: str = "ok", error: Optional[str] = None) -> None:
+        self.total = time.perf_counter() - self.started
+        self.status = status
+        self.error = error
+        if self.tokens_per_sec is None and self.stream and self.chunks > 1 and self.ttft is not None:
+            # Нет таймингов Ollama (стрим прерван): один фрагмент ~ один токен
+            generating = self.total - self.ttft
+            if generating > 0:
+                self.tokens_per_sec = (self.chunks - 1) / generating
+
+    def to_dict(self) -> Dict:
+        return {
+            "op": self.op,
+            "model": self.model,
+            "stream": self.stream,
+            "status": self.status,
+            "error": self.error,
+            "queued_ms": round(self.queued * 1000, 1),
+            "ttft_ms": round(self.ttft * 1000, 1) if self.ttft is not None else None,
+            "total_ms": round(self.total * 1000, 1) if self.total is not None else None,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_sec": round(self.tokens_per_sec, 1) if self.tokens_per_sec else None,
+            "chunks": self.chunks,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return round(value * 1000, 1) if value is not None else None
+
+
+class MetricsRegistry:
+    """Сводные метрики по операциям (потокобезопасно)."""
+
+    def __init__(self, history: int = HISTORY_SIZE):
+        self._history = history
+        self._calls: Dict[str, Deque[CallMetrics]] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics: CallMetrics) -> None:
+        with self._lock:
+            self._calls.setdefault(metrics.op, deque(maxlen=self._history)).append(metrics)
+            counts = self._counts.setdefault(metrics.op, {"calls": 0, "ok": 0, "error": 0, "cancelled": 0})
+            counts["calls"] += 1
+            counts[metrics.status] += 1
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """
+        Сводка по операциям: число вызовов по статусам и p50/p95 (мс)
+        ожидания слота, TTFT и полного времени, средняя скорость генерации.
+        """
+        with self._lock:
+            calls = {op: list(items) for op, items in self._calls.items()}
+            counts = {op: dict(c) for op, c in self._counts.items()}
+
+        result = {}
+        for op, items in calls.items():
+            ttft = [m.ttft for m in items if m.ttft is not None]
+            total = [m.total for m in items if m.total is not None and m.status == "ok"]
+            queued = [m.queued for m in items]
+            tps = [m.tokens_per_sec for m in items if m.tokens_per_sec]
+            result[op] = {
+                **counts[op],
+                "queued_p95_ms": _ms(_percentile(queued, 0.95)),
+                "ttft_p50_ms": _ms(_percentile(ttft, 0.5)),
+                "ttft_p95_ms": _ms(_percentile(ttft, 0.95)),
+                "total_p50_ms": _ms(_percentile(total, 0.5)),
+                "total_p95_ms": _ms(_percentile(total, 0.95)),
+                "tokens_per_sec": round(sum(tps) / len(tps), 1) if tps else None,
+                "bytes_sent": sum(m.bytes_sent for m in items),
+                "bytes_received": sum(m.bytes_received for m in items),
+            }
+        return result
@@ -0,0 +1,102 @@
+"""Синхронная обёртка над AsyncOllamaClient для существующих скриптов."""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Awaitable, Dict, Iterator, List, Optional, Union
+
+from .client import DEFAULT_URL, AsyncOllamaClient
+from .metrics import CallMetrics, MetricsRegistry
+
+
+class _LoopThread:
+    """Фоновый event loop, общий для всех синхронных клиентов процесса."""
+
+    _instance: Optional["_LoopThread"] = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="ollama-async", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls) -> "_LoopThread":
+        with cls._lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def run(self, coro: Awaitable) -> Any:
+        if threading.current_thread() is self.thread:
+            raise RuntimeError("Синхронный OllamaClient нельзя вызывать из его event loop — используйте AsyncOllamaClient")
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        try:
+            return future.result()
+        except KeyboardInterrupt:
+            # Ctrl+C: отменяем запрос, соединение закрывается и Ollama перестаёт генерировать
+            future.cancel()
+            raise
+
+
+async def _next(stream: AsyncIterator):
+    return await stream.__anext__()
+
+
+class OllamaClient:
+    """
+    Синхронный клиент Ollama с теми же методами, что и AsyncOllamaClient.
+
+    Запросы выполняются в общем фоновом event loop, поэтому пул соединений
+    переживает вызовы, а стрим — обычный генератор, который при выходе из
+    цикла (или Ctrl+C) обрывает генерацию.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_URL, **kwargs):
+        self._runner = _LoopThread.get()
+        self._client = AsyncOllamaClient(base_url, **kwargs)
+
+    @property
+    def base_url(self) -> str:
+        return self._client.base_url
+
+    @property
+    def metrics(self) -> MetricsRegistry:
+        return self._client.metrics
+
+    @property
+    def last_metrics(self) -> Optional[CallMetrics]:
+        return self._client.last_metrics
+
+    def chat(self, model: str, messages: List[Dict], **kwargs) -> str:
+        return self._runner.run(self._client.chat(model, messages, **kwargs))
+
+    def stream_chat(self, model: str, messages: List[Dict], **kwargs) -> Iterator[str]:
+        return self._iterate(self._client.stream_chat(model, messages, **kwargs))
+
+    def generate(self, model: str, prompt: str, **kwargs) -> str:
+        return self._runner.run(self._client.generate(model, prompt, **kwargs))
+
+    def stream_generate(self, model: str, prompt: str, **kwargs) -> Iterator[str]:
+        return self._iterate(self._client.stream_generate(model, prompt, **kwargs))
+
+    def embed(self, model: str, input: Union[str, List[str]], **kwargs) -> List[List[float]]:
+        return self._runner.run(self._client.embed(model, input, **kwargs))
+
+    def list_models(self, **kwargs) -> List[str]:
+        return self._runner.run(self._client.list_models(**kwargs))
+
+    def ping(self, **kwargs) -> bool:
+        return self._runner.run(self._client.ping(**kwargs))
+
+    def close(self) -> None:
+        self._runner.run(self._client.aclose())
+
+    def _iterate(self, stream: AsyncIterator[str]) -> Iterator[str]:
+        try:
+            while True:
+                try:
+                    yield self._runner.run(_next(stream))
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._runner.run(stream.aclose())
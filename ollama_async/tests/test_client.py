@@ -0,0 +1,175 @@
+"""Tests for the shared Ollama client against a fake Ollama server."""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ollama_async import (
+    AsyncOllamaClient,
+    OllamaClient,
+    OllamaConnectionError,
+    OllamaHTTPError,
+)
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.state["peers"].add(self.client_address)
+        self._json(200, {"models": [{"name": "tiny:latest"}]})
+
+    def do_POST(self):
+        state = self.state
+        state["peers"].add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with state["lock"]:
+            state["active"] += 1
+            state["max_active"] = max(state["max_active"], state["active"])
+        try:
+            if self.path == "/api/embed":
+                state["embed_calls"] += 1
+                if state["embed_calls"] == 1:
+                    return self._json(503, {"error": "busy"})
+                return self._json(200, {"embeddings": [[0.5, 0.5] for _ in payload["input"]]})
+            if payload["model"] == "missing":
+                return self._json(404, {"error": "model 'missing' not found"})
+            if not payload.get("stream"):
+                time.sleep(state["delay"])
+                return self._json(200, {"response": "pong", "done": True, "eval_count": 10,
+                                        "eval_duration": 500_000_000, "prompt_eval_count": 3})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            words = ["Привет", ", ", "мир"] * state["repeat"]
+            try:
+                for word in words:
+                    self._chunk({"message": {"content": word}, "done": False})
+                    time.sleep(0.01)
+                self._chunk({"message": {"content": ""}, "done": True, "eval_count": len(words),
+                             "eval_duration": 250_000_000})
+                self.wfile.write(b"0\r\n\r\n")
+                state["streams_finished"] += 1
+            except (BrokenPipeError, ConnectionResetError):
+                state["streams_aborted"] += 1
+                self.close_connection = True
+        finally:
+            with state["lock"]:
+                state["active"] -= 1
+
+    def _chunk(self, obj):
+        data = json.dumps(obj, ensure_ascii=False).encode() + b"\n"
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+@pytest.fixture
+def ollama():
+    state = {"peers": set(), "lock": threading.Lock(), "active": 0, "max_active": 0, "delay": 0.0,
+             "embed_calls": 0, "repeat": 1, "streams_finished": 0, "streams_aborted": 0}
+    handler = type("Handler", (FakeOllama,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_stream_and_calls_share_one_connection(ollama):
+    client = OllamaClient(ollama["url"])
+    pieces = list(client.stream_chat("tiny", [{"role": "user", "content": "hi"}], options={"temperature": 0.1}))
+    assert "".join(pieces) == "Привет, мир"
+    stream_metrics = client.last_metrics
+    assert stream_metrics.status == "ok" and stream_metrics.ttft is not None
+    assert stream_metrics.tokens_per_sec == pytest.approx(12.0)
+
+    assert client.generate("tiny", "ping", system="s") == "pong"
+    assert client.last_metrics.tokens_per_sec == pytest.approx(20.0)
+    assert client.list_models() == ["tiny:latest"]
+    assert len(ollama["peers"]) == 1
+
+    snapshot = client.metrics.snapshot()
+    assert snapshot["chat"]["ok"] == 1 and snapshot["generate"]["calls"] == 1
+    client.close()
+
+
+def test_concurrency_is_bounded_by_pool(ollama):
+    ollama["delay"] = 0.2
+
+    async def run():
+        async with AsyncOllamaClient(ollama["url"], max_connections=2) as client:
+            start = time.monotonic()
+            answers = await asyncio.gather(*(client.generate("tiny", str(i)) for i in range(6)))
+            return answers, time.monotonic() - start, client.metrics.snapshot()["generate"]
+
+    answers, elapsed, snapshot = asyncio.run(run())
+    assert answers == ["pong"] * 6
+    assert ollama["max_active"] == 2
+    assert 0.55 < elapsed < 1.5
+    assert snapshot["queued_p95_ms"] > 100
+
+
+def test_leaving_a_stream_aborts_generation(ollama):
+    ollama["repeat"] = 200
+    client = OllamaClient(ollama["url"])
+    for i, _ in enumerate(client.stream_chat("tiny", [])):
+        if i == 2:
+            break
+    assert client.last_metrics.status == "cancelled"
+
+    async def cancel_task():
+        async with AsyncOllamaClient(ollama["url"]) as async_client:
+            async def consume():
+                async for _ in async_client.stream_generate("tiny", "x"):
+                    pass
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return async_client.last_metrics
+
+    assert asyncio.run(cancel_task()).status == "cancelled"
+    time.sleep(0.3)
+    assert ollama["streams_aborted"] == 2 and ollama["streams_finished"] == 0
+
+    ollama["repeat"] = 1
+    assert "".join(client.stream_chat("tiny", [])) == "Привет, мир"
+
+
+def test_embed_retries_and_errors(ollama):
+    client = OllamaClient(ollama["url"])
+    assert client.embed("tiny", ["a", "b"]) == [[0.5, 0.5], [0.5, 0.5]]
+    assert client.metrics.snapshot()["embed"]["error"] == 1
+
+    with pytest.raises(OllamaHTTPError) as error:
+        client.chat("missing", [])
+    assert error.value.status == 404 and error.value.message == "model 'missing' not found"
+    assert client.metrics.snapshot()["chat"]["error"] == 1
+
+
+def test_connection_errors_are_connection_errors():
+    client = OllamaClient("http://127.0.0.1:9", retries=0)
+    with pytest.raises(ConnectionError) as error:
+        client.generate("tiny", "x")
+    assert isinstance(error.value, OllamaConnectionError)
+    assert client.ping() is False
@@ -0,0 +1,30 @@
+"""
+Синхронный HTTP-клиент Ollama для скриптов индексации и RAG (Day 16–17).
+
+- OllamaClient — keep-alive пул соединений на http.client, таймауты по
+  операциям, повторы идемпотентных запросов, статистика запросов.
+- get_client — один клиент (и пул) на адрес Ollama на весь процесс.
+
+Только стандартная библиотека. Скрипты из папок AIAdventChallengeDayNN
+подключают пакет, добавляя корень репозитория в sys.path.
+"""
+
+from .client import (
+    DEFAULT_TIMEOUTS,
+    OllamaClient,
+    OllamaError,
+    OllamaHTTPError,
+    OllamaUnavailableError,
+    format_stats,
+    get_client,
+)
+
+__all__ = [
+    "OllamaClient",
+    "OllamaError",
+    "OllamaUnavailableError",
+    "OllamaHTTPError",
+    "DEFAULT_TIMEOUTS",
+    "format_stats",
+    "get_client",
+]
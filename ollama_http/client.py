@@ -0,0 +1,370 @@
+"""
+Общий HTTP-клиент Ollama для build_index.py (Day 16–17) и rag_agent.py (Day 17).
+
+Только стандартная библиотека (http.client):
+- keep-alive пул соединений (одно TCP-соединение на все чанки вместо нового на каждый запрос)
+- свои таймауты для каждого типа операции (health / tags / embed / generate)
+- повторы с экспоненциальной задержкой и джиттером — только для идемпотентных операций
+- счётчики: запросы, ошибки, повторы, байты и гистограмма задержек по операциям
+"""
+
+import http.client
+import json
+import queue
+import random
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# ----------------------------
+# Настройки
+# ----------------------------
+# Таймауты (сек) по типу операции
+DEFAULT_TIMEOUTS = {
+    "health": 5,
+    "tags": 10,
+    "embed": 60,
+    "generate": 300,
+}
+
+# Повторяем только идемпотентные операции: эмбеддинг того же текста даёт тот же результат,
+# а повтор генерации — это ещё несколько минут работы модели
+RETRY_OPS = {"embed", "tags"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RETRIES = 3
+BACKOFF_BASE_SEC = 0.5
+BACKOFF_MAX_SEC = 8.0
+
+DEFAULT_POOL_SIZE = 4
+
+# Верхние границы корзин гистограммы задержек (мс); последняя — всё, что больше
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+# ----------------------------
+# Ошибки
+# ----------------------------
+class OllamaError(Exception):
+    """Базовая ошибка клиента Ollama."""
+
+
+class OllamaUnavailableError(OllamaError):
+    """Не удалось подключиться / соединение оборвалось / таймаут."""
+
+
+class OllamaHTTPError(OllamaError):
+    def __init__(self, status: int, url: str, body: str):
+        super().__init__(f"HTTP {status} на {url}: {body[:300]}")
+        self.status = status
+        self.url = url
+        self.body = body
+
+
+# Ошибки переиспользованного keep-alive соединения, которое сервер уже закрыл:
+# запрос до Ollama не дошёл, его безопасно отправить заново по новому соединению
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+# ----------------------------
+# Статистика
+# ----------------------------
+class _OpStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency_ms_total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, latency_ms: float) -> None:
+        self.latency_ms_total += latency_ms
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Верхняя граница корзины, в которую попадает q-квантиль (оценка по гистограмме)."""
+        total = sum(self.buckets)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> Dict:
+        observed = sum(self.buckets)
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "avg_ms": round(self.latency_ms_total / observed, 1) if observed else None,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+# ----------------------------
+# Клиент
+# ----------------------------
+class OllamaClient:
+    """
+    Потокобезопасный клиент Ollama с пулом keep-alive соединений.
+
+    Соединения берутся из пула на время одного запроса и возвращаются обратно,
+    если сервер не попросил закрыть их. Пул ограничивает число одновременных
+    соединений: лишние запросы ждут свободное.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeouts: Optional[Dict[str, float]] = None,
+        retries: int = DEFAULT_RETRIES,
+    ):
+        parts = urlsplit(base_url.rstrip("/"))
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Некорректный URL Ollama: {base_url}")
+
+        self.base_url = base_url.rstrip("/")
+        self._conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path
+
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retries = retries
+
+        # None — свободный слот без соединения (откроем при первой надобности)
+        self._pool: "queue.LifoQueue[Optional[http.client.HTTPConnection]]" = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+        self._stats: Dict[str, _OpStats] = {}
+        self._stats_lock = threading.Lock()
+        self._connections_opened = 0
+
+        # /api/embed появился в Ollama 0.3; для старых версий запоминаем /api/embeddings
+        self._legacy_embed = False
+
+    # --- низкий уровень ---
+    def request(self, method: str, path: str, payload: Optional[Dict] = None, op: str = "generate") -> bytes:
+        """
+        Выполнить запрос и вернуть тело ответа.
+
+        Ошибки: OllamaHTTPError (ответ не 2xx), OllamaUnavailableError (сеть / таймаут).
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        attempts = 1 + (self.retries if op in RETRY_OPS else 0)
+
+        for attempt in range(attempts):
+            if attempt:
+                self._count(op, retries=1)
+                time.sleep(random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** (attempt - 1))))
+            try:
+                return self._send(method, path, body, headers, op)
+            except OllamaHTTPError as ex:
+                if ex.status not in RETRY_STATUSES or attempt == attempts - 1:
+                    raise
+            except OllamaUnavailableError:
+                if attempt == attempts - 1:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _send(self, method: str, path: str, body: Optional[bytes], headers: Dict, op: str) -> bytes:
+        url = self.base_url + path
+        timeout = self.timeouts.get(op, DEFAULT_TIMEOUTS["generate"])
+        conn = self._pool.get()
+        started = time.perf_counter()
+        try:
+            try:
+                conn = self._prepare(conn, timeout)
+                resp = self._roundtrip(conn, method, path, body, headers)
+            except _STALE_ERRORS:
+                if not conn.reused:
+                    raise
+                # сервер закрыл простаивавшее соединение — один раз пробуем с новым
+                conn.close()
+                conn = self._prepare(None, timeout)
+                resp = self._roundtrip(conn, method, path, body, headers)
+        except (OSError, http.client.HTTPException) as ex:
+            if conn is not None:
+                conn.close()
+            self._pool.put(None)
+            self._count(op, requests=1, errors=1, sent=len(body or b""))
+            if isinstance(ex, socket.timeout):
+                raise OllamaUnavailableError(f"Таймаут {timeout} с при запросе к {url}") from ex
+            raise OllamaUnavailableError(f"Не удалось подключиться к Ollama по адресу {url}. Детали: {ex}") from ex
+
+        status, data, will_close = resp
+        if will_close:
+            conn.close()
+            self._pool.put(None)
+        else:
+            conn.reused = True
+            self._pool.put(conn)
+        self._count(op, requests=1, errors=int(status >= 300), sent=len(body or b""),
+                    received=len(data), latency_ms=(time.perf_counter() - started) * 1000)
+
+        if status >= 300:
+            raise OllamaHTTPError(status, url, data.decode("utf-8", errors="replace"))
+        return data
+
+    def _prepare(self, conn: Optional[http.client.HTTPConnection], timeout: float) -> http.client.HTTPConnection:
+        if conn is None:
+            conn = self._conn_class(self._host, self._port, timeout=timeout)
+            conn.reused = False
+            with self._stats_lock:
+                self._connections_opened += 1
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def _roundtrip(self, conn: http.client.HTTPConnection, method: str, path: str,
+                   body: Optional[bytes], headers: Dict) -> Tuple[int, bytes, bool]:
+        conn.request(method, self._prefix + path, body=body, headers=headers)
+        resp = conn.getresponse()
+        # тело нужно дочитать до конца, иначе соединение нельзя переиспользовать
+        data = resp.read()
+        return resp.status, data, resp.will_close
+
+    def _count(self, op: str, requests: int = 0, errors: int = 0, retries: int = 0,
+               sent: int = 0, received: int = 0, latency_ms: Optional[float] = None) -> None:
+        with self._stats_lock:
+            s = self._stats.setdefault(op, _OpStats())
+            s.requests += requests
+            s.errors += errors
+            s.retries += retries
+            s.bytes_sent += sent
+            s.bytes_received += received
+            if latency_ms is not None:
+                s.observe(latency_ms)
+
+    # --- JSON ---
+    def get_json(self, path: str, op: str) -> Dict:
+        return self._decode(self.request("GET", path, op=op), path)
+
+    def post_json(self, path: str, payload: Dict, op: str) -> Dict:
+        return self._decode(self.request("POST", path, payload, op=op), path)
+
+    def _decode(self, data: bytes, path: str) -> Dict:
+        try:
+            return json.loads(data.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise OllamaError(f"Не удалось разобрать JSON-ответ от Ollama ({path}).")
+
+    # --- API Ollama ---
+    def ping(self) -> None:
+        """Health-check: GET / (Ollama отвечает "Ollama is running")."""
+        self.request("GET", "/", op="health")
+
+    def list_models(self) -> List[str]:
+        data = self.get_json("/api/tags", op="tags")
+        models = data.get("models") if isinstance(data, dict) else None
+        if not isinstance(models, list):
+            return []
+        return [str(m["name"]) for m in models if isinstance(m, dict) and "name" in m]
+
+    def embed(self, model: str, text: str) -> List[float]:
+        """
+        Эмбеддинг текста: /api/embed, для старых версий Ollama — /api/embeddings.
+        """
+        if not self._legacy_embed:
+            try:
+                data = self.post_json("/api/embed", {"model": model, "input": text}, op="embed")
+                embeddings = data.get("embeddings")
+                if isinstance(embeddings, list) and embeddings and _is_vector(embeddings[0]):
+                    return embeddings[0]
+            except OllamaHTTPError as ex:
+                # 404 — либо нет endpoint'а (старая Ollama), либо нет модели; разберётся старый endpoint
+                if ex.status != 404:
+                    raise
+
+        data = self.post_json("/api/embeddings", {"model": model, "prompt": text}, op="embed")
+        embedding = data.get("embedding")
+        if _is_vector(embedding):
+            self._legacy_embed = True
+            return embedding
+        raise OllamaError("Ollama вернула неожиданный формат ответа для embeddings.")
+
+    def generate(self, model: str, prompt: str) -> str:
+        data = self.post_json("/api/generate", {"model": model, "prompt": prompt, "stream": False}, op="generate")
+        # обычно: {"response": "..."}
+        return str(data.get("response", ""))
+
+    # --- служебное ---
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            ops = {op: s.snapshot() for op, s in self._stats.items()}
+            connections = self._connections_opened
+        return {
+            "requests": sum(s["requests"] for s in ops.values()),
+            "errors": sum(s["errors"] for s in ops.values()),
+            "retries": sum(s["retries"] for s in ops.values()),
+            "bytes_sent": sum(s["bytes_sent"] for s in ops.values()),
+            "bytes_received": sum(s["bytes_received"] for s in ops.values()),
+            "connections_opened": connections,
+            "ops": ops,
+        }
+
+    def close(self) -> None:
+        """Закрыть простаивающие соединения."""
+        slots = []
+        while True:
+            try:
+                slots.append(self._pool.get_nowait())
+            except queue.Empty:
+                break
+        for conn in slots:
+            if conn is not None:
+                conn.close()
+            self._pool.put(None)
+
+
+def _is_vector(value) -> bool:
+    return isinstance(value, list) and bool(value) and isinstance(value[0], (int, float))
+
+
+def format_stats(stats: Dict) -> str:
+    """Короткая сводка для вывода в консоль."""
+    lines = [
+        f"Ollama: {stats['requests']} запросов, соединений открыто: {stats['connections_opened']}, "
+        f"ошибок: {stats['errors']}, повторов: {stats['retries']}, "
+        f"отправлено {stats['bytes_sent'] / 1024:.1f} KB, получено {stats['bytes_received'] / 1024:.1f} KB"
+    ]
+    for op, s in stats["ops"].items():
+        if s["avg_ms"] is not None:
+            lines.append(f"  {op:9} {s['requests']:5} запросов, avg {s['avg_ms']} ms, "
+                         f"p50 ≤ {s['p50_ms']:g} ms, p95 ≤ {s['p95_ms']:g} ms")
+    return "\n".join(lines)
+
+
+# Один клиент (и пул) на адрес Ollama на весь процесс
+_clients: Dict[str, OllamaClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: str) -> OllamaClient:
+    key = base_url.rstrip("/")
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = OllamaClient(key)
+        return _clients[key]
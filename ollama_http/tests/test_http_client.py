@@ -0,0 +1,112 @@
+"""Tests for the shared HTTP Ollama client against a fake Ollama server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ollama_http import OllamaClient, OllamaHTTPError, OllamaUnavailableError, format_stats
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, *args):
+        pass
+
+    def _json(self, status, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.state["peers"].add(self.client_address)
+        if self.path == "/":
+            body = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self._json(200, {"models": [{"name": "nomic-embed-text:latest"}]})
+
+    def do_POST(self):
+        state = self.state
+        state["peers"].add(self.client_address)
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        state["paths"].append(self.path)
+        if state["busy"]:
+            state["busy"] -= 1
+            return self._json(503, {"error": "busy"})
+        if self.path == "/api/embed":
+            if state["legacy"]:
+                return self._json(404, {"error": "404 page not found"})
+            return self._json(200, {"embeddings": [[float(len(payload["input"])), 1.0]]})
+        if self.path == "/api/embeddings":
+            return self._json(200, {"embedding": [float(len(payload["prompt"])), 2.0]})
+        return self._json(200, {"response": " answer ", "done": True})
+
+
+@pytest.fixture
+def ollama():
+    state = {"peers": set(), "paths": [], "busy": 0, "legacy": False}
+    handler = type("Handler", (FakeOllama,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{server.server_port}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_reuse_one_keep_alive_connection(ollama):
+    client = OllamaClient(ollama["url"])
+    client.ping()
+    assert client.list_models() == ["nomic-embed-text:latest"]
+    vectors = [client.embed("nomic-embed-text", "chunk " * i) for i in range(1, 6)]
+    assert vectors[0] == [6.0, 1.0]
+    assert client.generate("qwen2.5", "q") == " answer "
+
+    stats = client.stats()
+    assert stats["requests"] == 8 and stats["errors"] == 0
+    assert stats["connections_opened"] == 1
+    assert len(ollama["peers"]) == 1
+    assert "8 запросов" in format_stats(stats)
+    client.close()
+
+
+def test_embed_is_retried_on_503_and_generate_is_not(ollama):
+    client = OllamaClient(ollama["url"])
+    ollama["busy"] = 2
+    assert client.embed("nomic-embed-text", "text") == [4.0, 1.0]
+    assert ollama["paths"] == ["/api/embed"] * 3
+    embed_stats = client.stats()["ops"]["embed"]
+    assert (embed_stats["requests"], embed_stats["errors"], embed_stats["retries"]) == (3, 2, 2)
+
+    ollama["busy"] = 1
+    with pytest.raises(OllamaHTTPError) as error:
+        client.generate("qwen2.5", "q")
+    assert error.value.status == 503
+    assert client.stats()["ops"]["generate"]["requests"] == 1
+
+
+def test_legacy_embeddings_endpoint_is_remembered(ollama):
+    ollama["legacy"] = True
+    client = OllamaClient(ollama["url"])
+    assert client.embed("nomic-embed-text", "abc") == [3.0, 2.0]
+    assert client.embed("nomic-embed-text", "abcd") == [4.0, 2.0]
+    # /api/embed is tried once; afterwards requests go to /api/embeddings directly
+    assert ollama["paths"] == ["/api/embed", "/api/embeddings", "/api/embeddings"]
+
+
+def test_unreachable_server():
+    client = OllamaClient("http://127.0.0.1:9", retries=0)
+    with pytest.raises(OllamaUnavailableError):
+        client.ping()
+    assert client.stats()["errors"] == 1